@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Анализ неоднозначности алиасов и прореживание каталогов
+
+Рантайм ищет товар линейным проходом и берёт первое совпадение. Поэтому
+алиас, который указывает на несколько товаров или содержит алиас другого
+товара, стоящего раньше, выдаёт не тот товар или вообще недостижим.
+
+Анализатор строит мультиотображение алиас → товары по обоим каталогам
+(divans.json и matrasy.json) и находит:
+
+- коллизии — один алиас у нескольких товаров (бренды и модели отдельно);
+- пересечения — алиас одного товара входит подстрокой в алиас другого;
+- мёртвые алиасы — ни один запрос не найдёт по ним их товар: его раньше
+  находит более ранний товар;
+- избыточные алиасы — всякий запрос, который находит товар по ним,
+  находит его и по другому алиасу того же товара.
+
+Что считается мёртвым, зависит от того, как область сравнивается в
+рантайме (MATCH_*):
+
+- матрасы (MATCH_WORDS) — только query.includes(alias), первый этап целым
+  словом: алиас мёртв, если содержит по границам слов алиас более раннего
+  матраса или совпадает с ним, и избыточен, если так же содержит другой
+  свой алиас;
+- модели диванов внутри бренда (MATCH_BOTH) — проверяются и
+  query.includes(alias), и alias.includes(query) (divanSearch.js, проход
+  по бренду и проход только по модели). Запрос короче алиаса находит товар
+  через обратное вхождение, поэтому алиас, содержащий чужой, мёртвым не
+  считается: мёртв только повтор алиаса более раннего товара, а избыточен
+  алиас, который сам содержит свой более короткий алиас и входит в свой
+  более длинный (запросы с ним и запросы-подстроки ловят они);
+- бренды диванов (MATCH_QUERY) — бренд сам товар не выбирает (нужна ещё
+  модель), поэтому мёртвых нет, избыточен алиас, содержащий свой другой.
+
+С флагом --prune мёртвые и избыточные алиасы удаляются из каталогов, но
+только если прогон queryReplay.py (синтетический корпус или --corpus плюс
+фразы из самих удаляемых алиасов) до и после прореживания не меняет ни
+одного ответа — иначе каталоги не записываются.
+
+Вхождения ищутся автоматом Ахо-Корасик по всем алиасам области, так что
+время растёт почти линейно от суммарной длины алиасов (плюс число
+найденных вхождений). Эти правила — упрощение рантайма (транслитерация,
+служебные слова и пороги длины не учитываются), поэтому последнее слово
+за прогоном запросов.
+"""
+
+import copy
+import json
+import os
+import sys
+from collections import deque
+
+from catalogWriter import write_json, write_json_stream
+
+
+# Как область сравнивается с запросом в рантайме
+MATCH_QUERY = 'query'  # query.includes(alias), товар выбирает не алиас (бренды диванов)
+MATCH_WORDS = 'words'  # query.includes(alias) по границам слов, первый товар — ответ (матрасы)
+MATCH_BOTH = 'both'    # query.includes(alias) или alias.includes(query) (модели диванов)
+
+
+def normalize(alias):
+    return ' '.join(str(alias).lower().split())
+
+
+class AhoCorasick:
+    """
+    Автомат Ахо-Корасик: все вхождения набора строк в текст за один проход
+    """
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for pattern in patterns:
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append(pattern)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0) if state else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text):
+        """
+        Пары (начало, шаблон) всех вхождений
+        """
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for pattern in self.out[state]:
+                yield end - len(pattern), pattern
+
+
+def _word_bounded(text, start, pattern):
+    end = start + len(pattern)
+    return (start == 0 or text[start - 1] == ' ') and (end == len(text) or text[end] == ' ')
+
+
+def collect_aliases(divans, matrasy):
+    """
+    Вхождения алиасов: (пространство, область, товар, порядок, алиас, сравнение).
+    Пространство — для коллизий (бренды/модели каталога), область — для мёртвых
+    и избыточных алиасов (где рантайм действительно сравнивает товары по порядку)
+    """
+    entries = []
+    order = {}
+
+    def rank(entity):
+        return order.setdefault(entity, len(order))
+
+    for divan in divans:
+        brand = normalize(divan['brand'])
+        brand_entity = ('divans', 'brand', brand)
+        model_entity = ('divans', 'model', brand, normalize(divan['model']))
+        for alias in divan['brandAliases']:
+            entries.append(('divans:brand', 'divans:brand', brand_entity,
+                            rank(brand_entity), normalize(alias), MATCH_QUERY))
+        for alias in divan['modelAliases']:
+            entries.append(('divans:model', f"divans:model:{brand}", model_entity,
+                            rank(model_entity), normalize(alias), MATCH_BOTH))
+
+    for matras in matrasy:
+        entity = ('matrasy', matras['id'])
+        for alias in matras['aliases']:
+            entries.append(('matrasy', 'matrasy', entity, rank(entity), normalize(alias), MATCH_WORDS))
+
+    return entries
+
+
+def entity_label(entity):
+    if entity[0] == 'matrasy':
+        return f"matrasy:{entity[1]}"
+    if entity[1] == 'brand':
+        return f"divans:{entity[2] or '(без бренда)'}"
+    return f"divans:{entity[2]} {entity[3]}".strip()
+
+
+def analyze(divans, matrasy):
+    """
+    Отчёт о неоднозначности: коллизии, пересечения, мёртвые и избыточные алиасы
+    """
+    entries = collect_aliases(divans, matrasy)
+
+    # Мультиотображение алиас → товары в каждом пространстве
+    multimap = {}
+    for space, _, entity, position, alias, _ in entries:
+        multimap.setdefault(space, {}).setdefault(alias, {})
+        multimap[space][alias].setdefault(entity, position)
+
+    collisions = []
+    for space, aliases in multimap.items():
+        for alias, entities in aliases.items():
+            if len(entities) > 1:
+                ordered = sorted(entities, key=entities.get)
+                collisions.append({
+                    'space': space,
+                    'alias': alias,
+                    'products': [entity_label(entity) for entity in ordered],
+                })
+
+    # Товары каждого алиаса в области: алиас → {товар: порядок}
+    scopes = {}
+    matching = {}
+    for _, scope, entity, position, alias, match in entries:
+        if alias:
+            scopes.setdefault(scope, {}).setdefault(alias, {}).setdefault(entity, position)
+            matching[scope] = match
+
+    overlaps = []
+    dead = set()
+    # Алиас содержит свой более короткий / входит в свой более длинный
+    contains_own = set()
+    inside_own = set()
+    for scope, aliases in scopes.items():
+        match = matching[scope]
+        automaton = AhoCorasick(aliases)
+        for alias, owners in aliases.items():
+            for start, inner in automaton.find(alias):
+                if inner == alias:
+                    continue
+                if match == MATCH_WORDS and not _word_bounded(alias, start, inner):
+                    continue
+                for owner, position in owners.items():
+                    for other, other_position in aliases[inner].items():
+                        if other == owner:
+                            contains_own.add((scope, owner, alias))
+                            inside_own.add((scope, owner, inner))
+                            continue
+                        overlaps.append({
+                            'scope': scope,
+                            'alias': alias,
+                            'product': entity_label(owner),
+                            'contains': inner,
+                            'of': entity_label(other),
+                        })
+                        # У моделей диванов запрос-подстрока алиаса всё ещё
+                        # находит его товар (alias.includes(query))
+                        if match == MATCH_WORDS and other_position < position:
+                            dead.add((scope, owner, alias))
+            # Тот же алиас у более раннего товара: оба направления вхождения
+            # сначала находят тот товар
+            if len(owners) > 1 and match != MATCH_QUERY:
+                first = min(owners.values())
+                for owner, position in owners.items():
+                    if position > first:
+                        dead.add((scope, owner, alias))
+
+    redundant = {
+        key for key in contains_own
+        if matching[key[0]] != MATCH_BOTH or key in inside_own
+    } - dead
+    return {
+        'aliases': len(entries),
+        'unique': sum(len(aliases) for aliases in multimap.values()),
+        'collisions': collisions,
+        'overlaps': overlaps,
+        'dead': sorted((scope, entity_label(owner), alias) for scope, owner, alias in dead),
+        'redundant': sorted((scope, entity_label(owner), alias) for scope, owner, alias in redundant),
+        '_prune': {(owner, alias) for _, owner, alias in dead | redundant},
+    }
+
+
+def prune_catalogs(divans, matrasy, report):
+    """
+    Удаляет мёртвые и избыточные алиасы. Возвращает число удалённых
+    """
+    prune = report['_prune']
+    removed = 0
+
+    def keep(entity, aliases):
+        nonlocal removed
+        kept = [alias for alias in aliases if (entity, normalize(alias)) not in prune]
+        removed += len(aliases) - len(kept)
+        return kept
+
+    for divan in divans:
+        brand = normalize(divan['brand'])
+        divan['brandAliases'] = keep(('divans', 'brand', brand), divan['brandAliases'])
+        divan['modelAliases'] = keep(('divans', 'model', brand, normalize(divan['model'])),
+                                     divan['modelAliases'])
+    for matras in matrasy:
+        matras['aliases'] = keep(('matrasy', matras['id']), matras['aliases'])
+    return removed
+
+
+def prune_queries(report, divans):
+    """
+    Фразы для проверки прореживания: каждый удаляемый алиас отдельно,
+    а алиас модели дивана — ещё и с брендом
+    """
+    brands = {normalize(divan['brand']): divan['brand'] for divan in divans}
+    corpus = []
+    for entity, alias in sorted(report['_prune']):
+        collection = entity[0]
+        corpus.append({'query': alias, 'collection': collection, 'expected': None})
+        if collection == 'divans' and entity[1] == 'model' and entity[2]:
+            corpus.append({'query': f"{brands[entity[2]]} {alias}", 'collection': collection, 'expected': None})
+    return corpus
+
+
+def replay_changes(build, divans, matrasy, corpus):
+    """
+    Фразы корпуса, у которых queryReplay.py даёт другой ответ на
+    прореженных каталогах: [(фраза, коллекция, было, стало)]
+    """
+    from queryReplay import replay
+
+    pruned = dict(build, divans=divans, matrasy=matrasy)
+    before = replay(build, corpus)
+    after = replay(pruned, corpus)
+    return [
+        (old['query'], old['collection'], old['got'], new['got'])
+        for old, new in zip(before['outcomes'], after['outcomes'])
+        if old['got'] != new['got']
+    ]
+
+
+def print_report(report, limit=10):
+    print(f"📊 Алиасов: {report['aliases']} (уникальных по пространствам: {report['unique']})")
+    print(f"   Коллизий: {len(report['collisions'])}")
+    for item in report['collisions'][:limit]:
+        print(f"      '{item['alias']}' ({item['space']}): {', '.join(item['products'])}")
+    print(f"   Пересечений с другими товарами: {len(report['overlaps'])}")
+    for item in report['overlaps'][:limit]:
+        print(f"      '{item['alias']}' ({item['product']}) содержит '{item['contains']}' ({item['of']})")
+    print(f"   Мёртвых: {len(report['dead'])}")
+    for scope, product, alias in report['dead'][:limit]:
+        print(f"      '{alias}' ({product})")
+    print(f"   Избыточных: {len(report['redundant'])}")
+
+
+def write_report(report, report_path):
+    public = {key: value for key, value in report.items() if not key.startswith('_')}
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(public, f, ensure_ascii=False, indent=2)
+    print(f"📝 Отчёт: {report_path}")
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Анализ неоднозначности алиасов')
+    parser.add_argument('--prune', action='store_true',
+                        help='удалить мёртвые и избыточные алиасы из divans.json и matrasy.json')
+    parser.add_argument('--report', default=None,
+                        help='записать полный отчёт в JSON')
+    parser.add_argument('--corpus', default=None,
+                        help='корпус фраз queryReplay.py для проверки --prune (JSON Lines); '
+                             'без него — синтетический')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='seed синтетического корпуса')
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(os.path.dirname(script_dir), 'src', 'data')
+    divans_path = os.path.join(data_dir, 'divans.json')
+    matrasy_path = os.path.join(data_dir, 'matrasy.json')
+
+    with open(divans_path, 'r', encoding='utf-8') as f:
+        divans = json.load(f)['divans']
+    with open(matrasy_path, 'r', encoding='utf-8') as f:
+        matrasy = json.load(f)['matrasy']
+
+    print("🔎 Анализ алиасов\n")
+    started = time.perf_counter()
+    report = analyze(divans, matrasy)
+    print_report(report)
+    print(f"\n⏱️  Анализ: {(time.perf_counter() - started) * 1000:.1f} мс")
+
+    if args.report:
+        write_report(report, args.report)
+
+    if args.prune:
+        from queryReplay import load_build, load_corpus, synthetic_corpus
+
+        build = load_build(data_dir)
+        corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(build, args.seed)
+        corpus += prune_queries(report, divans)
+
+        pruned_divans = copy.deepcopy(divans)
+        pruned_matrasy = copy.deepcopy(matrasy)
+        removed = prune_catalogs(pruned_divans, pruned_matrasy, report)
+        changes = replay_changes(build, pruned_divans, pruned_matrasy, corpus)
+        print(f"\n🎙️  Проверка прогоном запросов: {len(corpus)} фраз, поменялся ответ: {len(changes)}")
+        if changes:
+            for query, collection, old, new in changes[:20]:
+                print(f"   '{query}' ({collection}): {old} → {new}")
+            print("❌ Прореживание меняет ответы, каталоги не записаны")
+            sys.exit(1)
+
+        write_json_stream(pruned_divans, divans_path, 'divans')
+        write_json({'matrasy': pruned_matrasy}, matrasy_path, ensure_ascii=False, indent=2)
+        print(f"✂️  Удалено алиасов: {removed}")
+
+    print("\n✨ Готово!")
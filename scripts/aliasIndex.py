@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Инвертированный индекс алиасов для divans.json и matrasy.json
+
+Нормализованный алиас (фраза из 1..N слов) → номера товаров, отдельно для
+брендов и моделей. Поиск по запросу перебирает только n-граммы слов запроса,
+а не все товары и все алиасы каталога.
+
+Формат файла (компактный JSON):
+{
+  "format": 1,
+  "source": {"file": "divans.json", "sha256": "..."},
+  "idField": "kod",
+  "ids": ["10091617", ...],
+  "maxNgram": 3,
+  "brand": {"elva": [0, 5, ...], ...},
+  "model": {"аспен": [0], ...}
+}
+
+Номера в списках — позиции в "ids" (и в исходном JSON).
+"""
+
+import hashlib
+import json
+import os
+
+from catalogWriter import atomic_write
+
+INDEX_FORMAT = 1
+
+
+def normalize_alias(text):
+    """
+    Нормализация алиаса и запроса: нижний регистр, одиночные пробелы
+    """
+    return ' '.join(str(text).lower().split())
+
+
+def index_path_for(json_path):
+    """
+    Путь индекса рядом с каталогом: divans.json → divans.index.json
+    """
+    root, ext = os.path.splitext(json_path)
+    return f"{root}.index{ext}"
+
+
+def _add_postings(postings, aliases, position):
+    for alias in aliases:
+        key = normalize_alias(alias)
+        if not key:
+            continue
+        bucket = postings.setdefault(key, [])
+        if not bucket or bucket[-1] != position:
+            bucket.append(position)
+
+
+def build_alias_index(records, id_field, brand_aliases, model_aliases):
+    """
+    Строит индекс по списку записей
+
+    brand_aliases / model_aliases — функции запись → список алиасов
+    """
+    ids = []
+    brand = {}
+    model = {}
+
+    for position, record in enumerate(records):
+        ids.append(str(record[id_field]))
+        _add_postings(brand, brand_aliases(record), position)
+        _add_postings(model, model_aliases(record), position)
+
+    max_ngram = max(
+        (len(key.split()) for key in list(brand) + list(model)),
+        default=1
+    )
+
+    return {
+        'format': INDEX_FORMAT,
+        'idField': id_field,
+        'ids': ids,
+        'maxNgram': max_ngram,
+        'brand': dict(sorted(brand.items())),
+        'model': dict(sorted(model.items())),
+    }
+
+
+def write_alias_index(json_path, collection_key, id_field, brand_aliases, model_aliases, index_path=None):
+    """
+    Читает готовый каталог, строит индекс и сохраняет его рядом.
+    Контрольная сумма считается по байтам каталога, поэтому индекс
+    привязан ровно к той сборке JSON, из которой он получен
+    """
+    with open(json_path, 'rb') as f:
+        raw = f.read()
+
+    records = json.loads(raw.decode('utf-8'))[collection_key]
+    index = build_alias_index(records, id_field, brand_aliases, model_aliases)
+    index['source'] = {
+        'file': os.path.basename(json_path),
+        'sha256': hashlib.sha256(raw).hexdigest(),
+    }
+
+    index_path = index_path or index_path_for(json_path)
+    with atomic_write(index_path) as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"🗂️  Индекс алиасов: {len(index['brand'])} ключей брендов, "
+          f"{len(index['model'])} ключей моделей → {index_path}")
+    return index
+
+
+def load_alias_index(index_path, json_path=None):
+    """
+    Загружает индекс; если передан json_path — проверяет, что индекс
+    построен именно из этого файла
+    """
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+
+    if index.get('format') != INDEX_FORMAT:
+        raise ValueError(f"Неподдерживаемый формат индекса: {index.get('format')}")
+
+    if json_path is not None:
+        with open(json_path, 'rb') as f:
+            checksum = hashlib.sha256(f.read()).hexdigest()
+        if checksum != index['source']['sha256']:
+            raise ValueError(f"Индекс {index_path} не соответствует {json_path}")
+
+    return index
+
+
+def query_ngrams(query, max_ngram):
+    """
+    Все n-граммы слов запроса длиной до max_ngram
+    """
+    words = normalize_alias(query).split()
+    for size in range(1, min(max_ngram, len(words)) + 1):
+        for start in range(len(words) - size + 1):
+            yield ' '.join(words[start:start + size])
+
+
+def lookup(index, query):
+    """
+    Эталонный поиск по индексу: возвращает (brand_hits, model_hits) —
+    множества позиций товаров, у которых совпал алиас бренда / модели
+    """
+    brand_hits = set()
+    model_hits = set()
+
+    for ngram in query_ngrams(query, index['maxNgram']):
+        brand_hits.update(index['brand'].get(ngram, ()))
+        model_hits.update(index['model'].get(ngram, ()))
+
+    return brand_hits, model_hits
+
+
+def lookup_ids(index, query):
+    """
+    Идентификаторы товаров по запросу: сначала совпадение бренда и модели,
+    иначе — только модели
+    """
+    brand_hits, model_hits = lookup(index, query)
+    positions = (brand_hits & model_hits) or model_hits
+    return [index['ids'][position] for position in sorted(positions)]
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Общий сервис генерации алиасов моделей для updateDivans.py и updateMatrasy.py
+
+Многие строки каталога — одна и та же модель в разных обивках, а генерация
+алиасов для каждой заново прогоняла фонетические варианты, специальные
+случаи TRANSLIT_MAP и обратный поиск латинского ключа перебором всего
+словаря (слова × размер TRANSLIT_MAP).
+
+AliasService:
+- держит обратный индекс транслитерации (кириллический вариант → латинские
+  ключи), построенный один раз;
+- кэширует готовые алиасы по нормализованной строке модели в LRU-кэше
+  ограниченного размера;
+- считает попадания и промахи кэша.
+
+Таблицы правил (TRANSLIT_MAP, PHONETIC_RULES) у каталогов разные и остаются
+в своих скриптах: сервис получает их при создании.
+"""
+
+import re
+from collections import OrderedDict
+
+CACHE_SIZE = 4096
+MIN_ALIAS_LENGTH = 3
+LATIN_LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def build_reverse_translit(translit_map):
+    """
+    Обратный индекс TRANSLIT_MAP: кириллический вариант → латинские ключи
+    (в порядке словаря). Однобуквенные записи-строки не входят
+    """
+    reverse = {}
+    for lat_key, cyr_variants in translit_map.items():
+        if isinstance(cyr_variants, list):
+            for variant in cyr_variants:
+                keys = reverse.setdefault(variant, [])
+                if lat_key not in keys:
+                    keys.append(lat_key)
+    return reverse
+
+
+class AliasService:
+    """
+    Генерация алиасов моделей с LRU-кэшем и обратным индексом транслитерации
+
+    translit_map — TRANSLIT_MAP каталога
+    engine       — PhoneticEngine каталога (смена его настроек сбрасывает кэш)
+    cache_size   — сколько моделей держать в кэше
+    """
+
+    def __init__(self, translit_map, engine, cache_size=CACHE_SIZE):
+        self.translit_map = translit_map
+        self.engine = engine
+        self.cache_size = cache_size
+        self.reset()
+
+    def reset(self):
+        """
+        Сбрасывает кэш и статистику, перестраивает обратный индекс
+        """
+        self.reverse_translit = build_reverse_translit(self.translit_map)
+        self._settings = self.engine.settings()
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def special(self, word):
+        """
+        Специальные варианты слова из TRANSLIT_MAP (только записи-списки)
+        """
+        variants = self.translit_map.get(word)
+        return variants if isinstance(variants, list) else []
+
+    def latin_keys(self, word):
+        return self.reverse_translit.get(word, [])
+
+    def _cached(self, key, generate):
+        if self.engine.settings() != self._settings:
+            self.reset()
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return list(cached)
+
+        self.misses += 1
+        result = tuple(generate())
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return list(result)
+
+    def model_aliases(self, model_name):
+        """
+        Алиасы модели дивана (generate_model_aliases)
+        """
+        if not model_name:
+            return []
+        model_lower = model_name.lower().strip()
+        return self._cached(('model', model_lower), lambda: self._model_aliases(model_lower))
+
+    def _model_aliases(self, model_lower):
+        variants_of = self.engine.variants
+        aliases = set()
+
+        # Добавляем оригинал
+        aliases.add(model_lower)
+
+        # Разбиваем на слова
+        words = model_lower.split()
+
+        # Для каждого слова генерируем фонетические варианты
+        for word in words:
+            other_words = [w for w in words if w != word]
+            for variant in variants_of(word):
+                aliases.add(variant)
+
+                # Добавляем с остальными словами
+                if other_words:
+                    aliases.add(' '.join([variant] + other_words))
+                    aliases.add(' '.join(other_words + [variant]))
+
+        # Для каждого слова проверяем специальные случаи из TRANSLIT_MAP
+        for word in words:
+            special = self.special(word)
+            other_words = [w for w in words if w != word]
+            for variant in special:
+                aliases.add(variant)
+
+                # Фонетические варианты специальных случаев
+                aliases.update(variants_of(variant))
+
+                # Также добавляем с остальными словами
+                if other_words:
+                    for variant_word in special:
+                        aliases.add(' '.join([variant_word] + other_words))
+                        aliases.add(' '.join(other_words + [variant_word]))
+
+        # Добавляем первое слово отдельно (основное название)
+        if words:
+            first_word = words[0]
+            aliases.add(first_word)
+            aliases.update(variants_of(first_word))
+            for variant in self.special(first_word):
+                aliases.add(variant)
+                aliases.update(variants_of(variant))
+
+        # Убираем суффиксы типа "-4", "-2" для поиска по базовому названию
+        for word in words:
+            base_word = re.sub(r'-?\d+$', '', word)
+            if base_word and base_word != word and len(base_word) >= 3:
+                aliases.add(base_word)
+                aliases.update(variants_of(base_word))
+                for variant in self.special(base_word):
+                    aliases.add(variant)
+                    aliases.update(variants_of(variant))
+
+        # Латинский ключ для кириллического слова — по обратному индексу
+        for word in words:
+            other_words = [w for w in words if w != word]
+            for lat_key in self.latin_keys(word):
+                aliases.add(lat_key)
+                if other_words:
+                    aliases.add(' '.join([lat_key] + other_words))
+                    aliases.add(' '.join(other_words + [lat_key]))
+
+        # Убираем слишком короткие алиасы
+        return sorted(a for a in aliases if len(a) >= MIN_ALIAS_LENGTH)
+
+    def matras_aliases(self, model_name, brand_name, brand_variants):
+        """
+        Алиасы модели матраса с комбинациями бренда (generate_model_aliases_enhanced).
+        brand_variants — BRAND_VARIANTS каталога матрасов
+        """
+        model_lower = model_name.lower().strip()
+        brand_lower = brand_name.lower().strip()
+        return self._cached(
+            ('matras', model_lower, brand_lower),
+            lambda: self._matras_aliases(model_lower, brand_lower, brand_variants.get(brand_lower, {})),
+        )
+
+    def _matras_aliases(self, model_lower, brand_lower, brand_variants):
+        variants_of = self.engine.variants
+        aliases = set()
+        special = self.special(model_lower)
+
+        # Добавляем оригинал и фонетические варианты модели
+        aliases.add(model_lower)
+        aliases.update(variants_of(model_lower))
+
+        # Специальные транслитерации и их фонетические варианты
+        for translit in special:
+            aliases.add(translit)
+            aliases.update(variants_of(translit))
+
+        # Латинский ключ для кириллического названия
+        aliases.update(self.latin_keys(model_lower))
+
+        # Комбинации с брендом (кириллица)
+        for brand_var in brand_variants.get('cyrillic', []):
+            aliases.add(f"{brand_var} {model_lower}")
+            for translit in special:
+                aliases.add(f"{brand_var} {translit}")
+
+        # Латинские комбинации с брендом (только латинские транслитерации)
+        for brand_lat in brand_variants.get('latin', []):
+            aliases.add(f"{brand_lat} {model_lower}")
+            for translit in special:
+                if any(c in LATIN_LETTERS for c in translit):
+                    aliases.add(f"{brand_lat} {translit}")
+
+        # Базовые латинские комбинации
+        aliases.add(f"{brand_lower} {model_lower}")
+
+        # Убираем слишком короткие алиасы
+        return sorted(a for a in aliases if len(a) >= MIN_ALIAS_LENGTH)
+
+    def report(self):
+        return {
+            'requests': self.hits + self.misses,
+            'cacheHits': self.hits,
+            'generated': self.misses,
+            'evictions': self.evictions,
+            'cached': len(self._cache),
+        }
+
+    def print_summary(self):
+        report = self.report()
+        print(f"\n♻️  Кэш алиасов моделей: {report['requests']} запросов, из кэша: {report['cacheHits']}, "
+              f"сгенерировано: {report['generated']}"
+              + (f", вытеснено: {report['evictions']}" if report['evictions'] else ''))
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Автомат для артикулов, произнесённых по цифрам
+
+Перечислять все произношения кода нельзя: у 8-значного кода их 3^8.
+Вместо этого при сборке компилируются два автомата:
+
+- words — префиксное дерево по буквам словаря цифр ("ноль/нуль",
+  "семь/семерка/сем", …, а также сами цифры "0"-"9"): слово → цифра;
+- codes — автомат Ахо–Корасик по цифрам всех артикулов каталога:
+  префиксное дерево (в каждом узле число артикулов с этим префиксом и
+  первый из них) со ссылками неудачи.
+
+Запрос ("код один ноль ноль девять один шесть один семь") разбирается за один
+проход по символам: буквы идут по words, на границе слова распознанная цифра
+делает шаг по codes. Числа ("код 10091617", "100 916 17") идут по codes
+цифра за цифрой, слова, не являющиеся цифрами, пропускаются. Если цифра
+уводит с дерева, автомат переходит по ссылке неудачи к самому длинному
+суффиксу уже прочитанных цифр, который является началом какого-то кода, —
+поэтому фальстарт ("один ноль ноль девять один ноль ноль девять один шесть
+один семь") не прячет настоящий код. Полный код предпочитается частичному;
+частичный код (цифры закончились раньше) возвращает все артикулы с этим
+префиксом.
+
+divans.articles.json:
+{
+  "format": 2,
+  "collection": "divans",
+  "ids": ["10091617", ...],
+  "words": [[{"н": 1, "о": 5, ...}, null], ..., [{}, "0"], ...],
+  "codes": [[{"1": 1, "8": 40}, [], 0, 108, 0], ...]
+}
+
+Состояние words — [переходы, цифра или null]. Узел codes —
+[переходы, номера артикулов, оканчивающихся здесь, первый номер под узлом,
+число артикулов под узлом, ссылка неудачи]. Номера — позиции в "ids".
+"""
+
+import json
+import os
+
+from catalogWriter import atomic_write
+
+ARTICLES_FORMAT = 2
+MIN_DIGITS = 4
+
+# Словарь произношения цифр: объединение таблиц generate_article_aliases
+# и рантайма (spokenDigitsToNumbers, convertWordsToDigits)
+DIGIT_NAMES = {
+    '0': ['ноль', 'нуль'],
+    '1': ['один', 'раз', 'адин', 'одна', 'единица'],
+    '2': ['два', 'двойка', 'две'],
+    '3': ['три', 'тройка'],
+    '4': ['четыре', 'четверка', 'читыре'],
+    '5': ['пять', 'пятерка', 'пьять'],
+    '6': ['шесть', 'шестерка', 'шэсть'],
+    '7': ['семь', 'семерка', 'сем'],
+    '8': ['восемь', 'восьмерка', 'восем'],
+    '9': ['девять', 'девятка', 'дивять'],
+}
+
+
+def articles_path_for(json_path):
+    """
+    divans.json → divans.articles.json
+    """
+    root, ext = os.path.splitext(json_path)
+    return f"{root}.articles{ext}"
+
+
+def article_digits(kod):
+    """
+    Цифры артикула; "8690508.0" (числовая ячейка Excel) → "8690508"
+    """
+    text = str(kod).strip()
+    if text.endswith('.0'):
+        text = text[:-2]
+    return ''.join(ch for ch in text if ch.isdigit())
+
+
+def compile_words(digit_names=DIGIT_NAMES):
+    """
+    Префиксное дерево по буквам: [[переходы, цифра или null], ...]
+    """
+    states = [[{}, None]]
+    for digit, names in digit_names.items():
+        for word in [digit] + [name.replace('ё', 'е') for name in names]:
+            state = 0
+            for ch in word:
+                transitions = states[state][0]
+                if ch not in transitions:
+                    transitions[ch] = len(states)
+                    states.append([{}, None])
+                state = transitions[ch]
+            states[state][1] = digit
+    return states
+
+
+def compile_codes(ids):
+    """
+    Автомат по цифрам артикулов: [[переходы, оканчивающиеся номера,
+    первый номер под узлом, число под узлом, ссылка неудачи], ...]
+    """
+    nodes = [[{}, [], None, 0]]
+    for position, kod in enumerate(ids):
+        digits = article_digits(kod)
+        if not digits:
+            continue
+        node = 0
+        path = [0]
+        for digit in digits:
+            transitions = nodes[node][0]
+            if digit not in transitions:
+                transitions[digit] = len(nodes)
+                nodes.append([{}, [], None, 0])
+            node = transitions[digit]
+            path.append(node)
+        nodes[node][1].append(position)
+        for visited in path:
+            if nodes[visited][2] is None:
+                nodes[visited][2] = position
+            nodes[visited][3] += 1
+    return link_failures(nodes)
+
+
+def link_failures(nodes):
+    """
+    Ссылки неудачи Ахо–Корасик (обход в ширину): узел → узел самого
+    длинного собственного суффикса его цифр, который есть в дереве
+    """
+    for node in nodes:
+        node.append(0)
+    queue = list(nodes[0][0].values())
+    for node in queue:
+        for digit, child in nodes[node][0].items():
+            fail = nodes[node][4]
+            while fail and digit not in nodes[fail][0]:
+                fail = nodes[fail][4]
+            target = nodes[fail][0].get(digit, 0)
+            nodes[child][4] = target if target != child else 0
+            queue.append(child)
+    return nodes
+
+
+def build_article_automaton(records, collection_key, id_field='kod'):
+    ids = [str(record[id_field]) for record in records]
+    return {
+        'format': ARTICLES_FORMAT,
+        'collection': collection_key,
+        'ids': ids,
+        'words': compile_words(),
+        'codes': compile_codes(ids),
+    }
+
+
+def write_article_automaton(json_path, collection_key, id_field='kod', articles_path=None):
+    """
+    Компилирует автомат по каталогу json_path и пишет его рядом (минифицированно)
+    """
+    articles_path = articles_path or articles_path_for(json_path)
+    with open(json_path, 'r', encoding='utf-8') as f:
+        records = json.load(f)[collection_key]
+
+    automaton = build_article_automaton(records, collection_key, id_field)
+    with atomic_write(articles_path) as f:
+        json.dump(automaton, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"🔢 Автомат артикулов: {len(automaton['ids'])} кодов, "
+          f"{len(automaton['codes'])} узлов кодов, {len(automaton['words'])} состояний слов, "
+          f"{os.path.getsize(articles_path)} байт → {articles_path}")
+    return articles_path
+
+
+class ArticleMatcher:
+    """
+    Эталонный поиск по автомату артикулов
+    """
+
+    def __init__(self, automaton):
+        if automaton.get('format') != ARTICLES_FORMAT:
+            raise ValueError(f"Неподдерживаемый формат автомата: {automaton.get('format')}")
+        self.ids = automaton['ids']
+        self.words = automaton['words']
+        self.codes = automaton['codes']
+        # Глубина узла — число цифр его префикса
+        self.depth = [0] * len(self.codes)
+        queue = [0]
+        for node in queue:
+            for child in self.codes[node][0].values():
+                self.depth[child] = self.depth[node] + 1
+                queue.append(child)
+
+    @classmethod
+    def load(cls, articles_path):
+        with open(articles_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def spoken_digits(self, text):
+        """
+        Цифры, произнесённые в тексте (слова-не-цифры пропускаются)
+        """
+        return ''.join(self._scan_words(text))
+
+    def _scan_words(self, text):
+        """
+        Цифры текста по порядку: слово из словаря — одна цифра,
+        число ("10091617", "100") — все его цифры
+        """
+        state = 0
+        word = []
+        for ch in f"{str(text).lower().replace('ё', 'е')} ":
+            if ch.isalnum():
+                word.append(ch)
+                if state is not None:
+                    state = self.words[state][0].get(ch)
+                continue
+            if word and all(c in '0123456789' for c in word):
+                yield from word
+            elif state is not None and self.words[state][1] is not None:
+                yield self.words[state][1]
+            state = 0
+            word = []
+
+    def _descendants(self, node, limit):
+        found = []
+        stack = [node]
+        while stack and len(found) < limit:
+            transitions, terminal = self.codes[stack.pop()][:2]
+            found.extend(terminal)
+            stack.extend(sorted(transitions.values(), reverse=True))
+        return sorted(found)[:limit]
+
+    def _step(self, node, digit):
+        """
+        Переход автомата: по дереву, а если цифры там нет — по ссылкам неудачи
+        """
+        while node and digit not in self.codes[node][0]:
+            node = self.codes[node][4]
+        return self.codes[node][0].get(digit, 0)
+
+    def match(self, text, min_digits=MIN_DIGITS, limit=10):
+        """
+        Ищет артикул в тексте за один проход.
+
+        Возвращает {'digits': цифры совпадения, 'exact': полный код или префикс,
+        'ids': артикулы} или None. Полный код важнее частичного, из равных —
+        более длинный, затем более поздний
+        """
+        node = 0
+        read = ''
+        best = None
+        for digit in self._scan_words(text):
+            read += digit
+            node = self._step(node, digit)
+            # Полные коды, оканчивающиеся здесь, — на цепочке ссылок неудачи
+            suffix = node
+            while suffix:
+                depth = self.depth[suffix]
+                if depth < min_digits:
+                    break
+                exact = bool(self.codes[suffix][1])
+                if suffix == node or exact:
+                    candidate = (exact, depth)
+                    if best is None or candidate >= best[0]:
+                        best = (candidate, suffix, read[-depth:])
+                suffix = self.codes[suffix][4]
+
+        if best is None:
+            return None
+        (exact, _), node, digits = best
+        if exact:
+            return {'digits': digits, 'exact': True, 'ids': [self.ids[p] for p in self.codes[node][1]]}
+        return {
+            'digits': digits,
+            'exact': False,
+            'ids': [self.ids[p] for p in self._descendants(node, limit)],
+        }
+
+
+if __name__ == '__main__':
+    import sys
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    json_path = os.path.join(os.path.dirname(script_dir), 'src', 'data', 'divans.json')
+    articles_path = articles_path_for(json_path)
+    if not os.path.exists(articles_path):
+        write_article_automaton(json_path, 'divans')
+
+    matcher = ArticleMatcher.load(articles_path)
+    for query in sys.argv[1:]:
+        print(f"{query!r} → {matcher.match(query)}")
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк сборки каталога на синтетических данных
+
+Генерирует книгу Excel (лист "Мягкая мебель" в формате розницы) и каталог
+матрасов заданного размера (по умолчанию 1k, 10k, 100k строк) и замеряет
+отдельно каждый этап:
+
+- load        — открытие книги (openpyxl, read-only);
+- rows        — потоковое чтение строк;
+- parse       — разбор названий (parse_brand_model);
+- phonetic    — фонетические варианты слов моделей (generate_phonetic_variants);
+- aliases     — алиасы моделей (generate_model_aliases);
+- build       — сборка записей диванов целиком (build_divan);
+- serialize   — запись divans.json (write_json_stream);
+- matrasAliases / matrasSerialize — то же для каталога матрасов.
+
+Кэши (разбор названий, алиасы, фонетика) перед каждым этапом сбрасываются,
+так что этап считается «с холода». Память этапа — пик tracemalloc сверх
+уровня на входе в этап (как в buildMetrics.py), поэтому она не зависит от
+того, что выполнялось раньше; в конце — размеры вывода.
+
+Каждый размер прогоняется --repeat раз (по умолчанию 3), время этапа —
+лучшее из повторов; память замеряется в ещё одном прогоне под tracemalloc.
+
+Результаты сравниваются с сохранённой базой (benchmarkBaseline.json рядом
+со скриптом). База снята на другой машине, поэтому её время масштабируется
+калибровкой: фиксированная нагрузка (calibration_seconds) замеряется и при
+сохранении базы, и при сравнении, время этапа базы умножается на отношение
+калибровок. Этап медленнее масштабированной базы больше чем на --tolerance
+(и больше чем на 50 мс) или рост пиковой памяти этапа (больше чем на 1 МБ) —
+регрессия, код выхода 1. Всё работает без сети; данные генерируются
+детерминированно (--seed).
+"""
+
+import json
+import os
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+
+import openpyxl
+
+import updateDivans
+import updateMatrasy
+from catalogWriter import write_json, write_json_stream
+
+BASELINE_FORMAT = 2
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_REPEAT = 3
+MIN_REGRESSION_SECONDS = 0.05
+MIN_REGRESSION_MB = 1.0
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarkBaseline.json')
+
+FURNITURE = ['Диван', 'Диван угловой', 'Диван П-образный', 'Кресло', 'Кресло-кровать', 'Пуф', 'Тахта']
+BRANDS = ['ELVA', 'VELUNA', 'Rivalli', 'Мебельград', 'Mio Tesoro', 'Moon Trade', 'MODULA', 'AksHome']
+SUFFIXES = ['', '', ' правый', ' левый', '-2', '-4', ' квадратный', ' стандарт']
+FABRICS = ['Diagonal', 'Velvet', 'Monolith', 'Bahama', 'Dream', 'Kiton']
+SUPPORTS = ['опора черная', 'опора венге', 'опора хром', 'без опор']
+SENTENCES = [
+    '<p>{model} — это стильный и комфортный диван для ежедневного отдыха.</p>',
+    'Каркас выполнен из массива березы, ДСП и фанеры.',
+    'Ортопедическое основание на металлокаркасе с березовыми латами&nbsp;выдерживает высокие нагрузки.',
+    '<br>Наполнение подушек: синтепух в сочетании с крошкой ППУ.',
+    'Механизм трансформации «еврокнижка» удобен в ежедневном использовании.',
+    'Вместительный бельевой ящик для постельных принадлежностей.',
+]
+
+
+def model_vocabulary(translit_map):
+    """
+    Кириллические слова моделей из TRANSLIT_MAP (только записи-списки)
+    """
+    words = []
+    for variants in translit_map.values():
+        if isinstance(variants, list):
+            words.extend(variants)
+    return sorted(set(words))
+
+
+def synthetic_models(rng, count, vocabulary):
+    models = set()
+    while len(models) < count:
+        model = rng.choice(vocabulary).capitalize()
+        if rng.random() < 0.3:
+            model += ' ' + rng.choice(vocabulary)
+        model += rng.choice(SUFFIXES)
+        models.add(model)
+    return sorted(models)
+
+
+def write_synthetic_workbook(path, rows, seed=0):
+    """
+    Книга с листом "Мягкая мебель": строки 1-7 — шапка, с 8-й — товары.
+    На модель приходится в среднем 8 расцветок
+    """
+    rng = random.Random(seed)
+    models = synthetic_models(rng, max(10, rows // 8), model_vocabulary(updateDivans.TRANSLIT_MAP))
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(updateDivans.SHEET_NAME)
+    for _ in range(updateDivans.FIRST_DATA_ROW - 2):
+        ws.append([])
+    ws.append(['Код товара', 'Название', 'Цена', 'Общее описание'])
+    for i in range(rows):
+        model = rng.choice(models)
+        name = (f"{rng.choice(FURNITURE)} {rng.choice(BRANDS)} {model} "
+                f"({rng.choice(FABRICS)} {rng.randint(1, 999)}, {rng.choice(SUPPORTS)})")
+        description = ' '.join(s.format(model=model) for s in rng.sample(SENTENCES, 4))
+        ws.append([10000000 + i, name, rng.randint(20000, 200000), description])
+    wb.save(path)
+
+
+def synthetic_matrasy(rows, seed=0):
+    rng = random.Random(seed)
+    vocabulary = sorted(updateMatrasy.TRANSLIT_MAP)
+    brands = ['Lagoma', 'Veluna', 'Askona']
+    matrasy = []
+    for i in range(rows):
+        brand = rng.choice(brands)
+        model = f"{rng.choice(vocabulary).capitalize()}{rng.choice(['', '', ' Plus', ' Max'])}"
+        matrasy.append({
+            'id': f"{brand}-{model}-{i}".lower().replace(' ', '-'),
+            'brand': brand,
+            'model': model,
+            'fullName': f"{brand} {model}",
+            'aliases': [],
+            'description': ' '.join(rng.sample(SENTENCES, 3)),
+            'features': ['Независимый пружинный блок', 'Съёмный чехол'],
+            'height': f"{rng.randint(18, 35)} см",
+            'firmness': rng.choice(['мягкий', 'средний', 'жесткий']),
+            'maxLoad': f"{rng.choice([110, 130, 150])} кг",
+            'warranty': f"{rng.choice([3, 5, 10])} лет",
+            'inStock': rng.random() < 0.8,
+        })
+    return matrasy
+
+
+def calibration_seconds(repeat=5):
+    """
+    Время фиксированной нагрузки, похожей на сборку (строки, регулярки,
+    json.dumps), — лучшее из repeat. Отношение калибровок двух машин
+    переводит время базы в масштаб текущей
+    """
+    rng = random.Random(0)
+    records = [
+        {'kod': str(10000000 + i), 'name': f"Диван {rng.choice(BRANDS)} {i}",
+         'aliases': [rng.choice(SUFFIXES).strip() or 'стандарт' for _ in range(8)],
+         'description': ' '.join(rng.sample(SENTENCES, 3))}
+        for i in range(2000)
+    ]
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for record in records:
+            text = re.sub(r'<[^>]+>', ' ', record['description']).lower()
+            record['words'] = sorted(set(text.split()) | set(record['aliases']))
+            json.dumps(record, ensure_ascii=False, indent=2)
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    return round(best, 4)
+
+
+def _megabytes(size):
+    return round(size / 1024 / 1024, 1)
+
+
+def reset_caches():
+    updateDivans.NAME_PARSER.cache.clear()
+    updateDivans.ALIAS_SERVICE.reset()
+    updateDivans.PHONETIC_ENGINE.reset()
+    updateMatrasy.ALIAS_SERVICE.reset()
+    updateMatrasy.PHONETIC_ENGINE.reset()
+
+
+class StageTimer:
+    """
+    Время и пиковая память по этапам. Память (trace_memory) — пик tracemalloc
+    сверх уровня на входе в этап; peak — наибольший отслеженный объём за все
+    этапы. Трассировка сильно замедляет код, поэтому время берётся из
+    прогонов без неё
+    """
+
+    def __init__(self, trace_memory=False):
+        self.stages = {}
+        self.peak = 0
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def run(self, name, fn, *args, **kwargs):
+        reset_caches()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            entry = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        seconds = time.perf_counter() - started
+        self.stages[name] = {'seconds': round(seconds, 4)}
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            self.peak = max(self.peak, peak)
+            self.stages[name]['peakMemoryMb'] = _megabytes(peak - entry)
+        return result
+
+    def close(self):
+        if self.trace_memory:
+            tracemalloc.stop()
+
+
+def benchmark_size(rows, work_dir, seed=0, repeat=DEFAULT_REPEAT):
+    """
+    Прогоняет все этапы на синтетических данных размера rows repeat раз;
+    время этапа — лучшее из повторов (меньше всего шума). Память — из
+    отдельного прогона под tracemalloc
+    """
+    excel_path = os.path.join(work_dir, f'synthetic-{rows}.xlsx')
+    if not os.path.exists(excel_path):
+        write_synthetic_workbook(excel_path, rows, seed)
+
+    runs = [run_stages(excel_path, rows, work_dir, seed) for _ in range(repeat)]
+    traced = run_stages(excel_path, rows, work_dir, seed, trace_memory=True)
+    stages = {
+        stage: {
+            'seconds': min(run['stages'][stage]['seconds'] for run in runs),
+            'peakMemoryMb': traced['stages'][stage]['peakMemoryMb'],
+        }
+        for stage in runs[0]['stages']
+    }
+    return {
+        'rows': rows,
+        'stages': stages,
+        'totalSeconds': round(sum(stage['seconds'] for stage in stages.values()), 4),
+        'peakMemoryMb': traced['peakMemoryMb'],
+        'outputBytes': runs[-1]['outputBytes'],
+    }
+
+
+def run_stages(excel_path, rows, work_dir, seed, trace_memory=False):
+    """
+    Один прогон всех этапов
+    """
+    timer = StageTimer(trace_memory)
+
+    def load():
+        return openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+
+    def read_rows(wb):
+        ws = wb[updateDivans.SHEET_NAME]
+        result = []
+        for row in ws.iter_rows(min_row=updateDivans.FIRST_DATA_ROW, max_col=4, values_only=True):
+            row = tuple(row) + (None,) * (4 - len(row))
+            if row[0] and row[1]:
+                result.append((row[0], row[1], row[3]))
+        wb.close()
+        return result
+
+    wb = timer.run('load', load)
+    table = timer.run('rows', read_rows, wb)
+    names = [str(name) for _, name, _ in table]
+
+    parsed = timer.run('parse', lambda: [updateDivans.parse_brand_model(name) for name in names])
+    models = [model for _, model in parsed]
+    tokens = [word for model in models for word in model.lower().split()]
+
+    timer.run('phonetic', lambda: [updateDivans.generate_phonetic_variants(token) for token in tokens])
+    timer.run('aliases', lambda: [updateDivans.generate_model_aliases(model) for model in models])
+    divans = timer.run('build', lambda: [updateDivans.build_divan(*row) for row in table])
+
+    divans_path = os.path.join(work_dir, f'divans-{rows}.json')
+    timer.run('serialize', write_json_stream, divans, divans_path, 'divans')
+
+    matrasy = synthetic_matrasy(rows, seed)
+
+    def matras_aliases():
+        for matras in matrasy:
+            matras['aliases'] = updateMatrasy.generate_model_aliases_enhanced(matras['model'], matras['brand'])
+
+    matrasy_path = os.path.join(work_dir, f'matrasy-{rows}.json')
+    timer.run('matrasAliases', matras_aliases)
+    timer.run('matrasSerialize', write_json, {'matrasy': matrasy}, matrasy_path,
+              ensure_ascii=False, indent=2)
+    timer.close()
+
+    return {
+        'stages': timer.stages,
+        'peakMemoryMb': _megabytes(timer.peak),
+        'outputBytes': {
+            'divans': os.path.getsize(divans_path),
+            'matrasy': os.path.getsize(matrasy_path),
+        },
+    }
+
+
+def compare_with_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE, calibration=None):
+    """
+    Список регрессий: (размер, этап, база, сейчас). Время базы умножается
+    на calibration / калибровку базы (если обе известны)
+    """
+    scale = 1.0
+    if calibration and baseline.get('calibrationSeconds'):
+        scale = calibration / baseline['calibrationSeconds']
+    regressions = []
+    for size, result in results.items():
+        base = baseline.get('results', {}).get(size)
+        if not base:
+            continue
+        for stage, current in result['stages'].items():
+            before = base['stages'].get(stage)
+            if not before:
+                continue
+            expected = before['seconds'] * scale
+            slower = current['seconds'] - expected
+            if slower > MIN_REGRESSION_SECONDS and current['seconds'] > expected * (1 + tolerance):
+                regressions.append((size, stage, f"{expected:.4f} с", f"{current['seconds']:.4f} с"))
+            grown = current['peakMemoryMb'] - before['peakMemoryMb']
+            if grown > MIN_REGRESSION_MB and current['peakMemoryMb'] > before['peakMemoryMb'] * (1 + tolerance):
+                regressions.append((size, f"{stage} (память)", f"{before['peakMemoryMb']} МБ",
+                                    f"{current['peakMemoryMb']} МБ"))
+        grown = result['peakMemoryMb'] - base['peakMemoryMb']
+        if grown > MIN_REGRESSION_MB and result['peakMemoryMb'] > base['peakMemoryMb'] * (1 + tolerance):
+            regressions.append((size, 'memory', f"{base['peakMemoryMb']} МБ", f"{result['peakMemoryMb']} МБ"))
+        for collection, size_bytes in result['outputBytes'].items():
+            if size_bytes != base['outputBytes'].get(collection):
+                print(f"   ℹ️  {size}: размер {collection} изменился: "
+                      f"{base['outputBytes'].get(collection)} → {size_bytes} байт")
+    return regressions
+
+
+def print_results(results):
+    for size, result in results.items():
+        print(f"\n📏 {size} строк: {result['totalSeconds']:.2f} с, пик памяти {result['peakMemoryMb']} МБ")
+        for stage, values in result['stages'].items():
+            print(f"   {stage:<16} {values['seconds']:>9.4f} с   {values['peakMemoryMb']:>7} МБ")
+        print(f"   вывод: divans {result['outputBytes']['divans']} байт, "
+              f"matrasy {result['outputBytes']['matrasy']} байт")
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Бенчмарк сборки каталога')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='размеры синтетических данных (строк)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='повторов на размер, берётся лучшее время этапа')
+    parser.add_argument('--work-dir', default=None,
+                        help='папка для синтетических книг (по умолчанию временная)')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='файл базы')
+    parser.add_argument('--save-baseline', action='store_true', help='сохранить результаты как базу')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='допустимое замедление относительно базы (0.25 — 25%%)')
+    args = parser.parse_args()
+
+    print("⏱️  Бенчмарк сборки каталога")
+    calibration = calibration_seconds()
+    print(f"   калибровка: {calibration:.4f} с")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = args.work_dir or tmp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        results = {}
+        for size in args.sizes:
+            results[str(size)] = benchmark_size(size, work_dir, args.seed, args.repeat)
+    print_results(results)
+
+    if args.save_baseline:
+        write_json({'format': BASELINE_FORMAT, 'seed': args.seed, 'repeat': args.repeat,
+                    'calibrationSeconds': calibration, 'results': results},
+                   args.baseline, ensure_ascii=False, indent=2)
+        print(f"\n💾 База сохранена: {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print("\nℹ️  Базы нет, сравнивать не с чем (--save-baseline)")
+        sys.exit(0)
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('seed') != args.seed:
+        print(f"\n⚠️  База снята с --seed {baseline.get('seed')}, данные не совпадают")
+    if baseline.get('calibrationSeconds'):
+        print(f"\n📐 Время базы × {calibration / baseline['calibrationSeconds']:.2f} "
+              f"(калибровка базы {baseline['calibrationSeconds']:.4f} с)")
+    else:
+        print("\n⚠️  В базе нет калибровки, время сравнивается как есть")
+    regressions = compare_with_baseline(results, baseline, args.tolerance, calibration)
+    if regressions:
+        print(f"\n❌ Регрессии (допуск {args.tolerance:.0%}):")
+        for size, stage, before, after in regressions:
+            print(f"   {size} строк, {stage}: {before} → {after}")
+        sys.exit(1)
+    print(f"\n✅ Регрессий нет (допуск {args.tolerance:.0%})")
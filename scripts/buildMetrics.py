@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Метрики сборки каталога (--profile в updateDivans.py и updateMatrasy.py)
+
+Когда сборка вдруг замедлилась или выросло число алиасов (например, после
+нового правила в PHONETIC_RULES), по обычному выводу не понять, какой этап
+и какие товары виноваты. В режиме --profile рядом с каталогом пишется
+<коллекция>.metrics.json:
+{
+  "format": 1,
+  "collection": "divans",
+  "totalSeconds": 3.91,
+  "peakAllocatedBytes": 48123456,
+  "stages": {"read": {"seconds": ..., "calls": ..., "allocatedBytes": ..., "peakBytes": ...}, ...},
+  "products": {"count": 2246, "seconds": {гистограмма}, "slowest": [...], "items": [...]},
+  "sections": {"aliases": {"totals": ..., "perProduct": {гистограммы}, ...}, "phonetic": {...}, ...},
+  "hotFunctions": [{"function": "aliasService.py:107(_model_aliases)", ...}, ...]
+}
+
+Время этапов — собственное: вложенные этапы (чтение строки внутри сборки
+записи, сборка внутри записи JSON) вычитаются из объемлющего, поэтому сумма
+по этапам не больше общего времени. Память считает tracemalloc: прирост
+(allocatedBytes) и пик сверх уровня на входе в этап (peakBytes).
+Время товара — всё, что понадобилось для его записи, кроме чтения строки
+из Excel. Полный профиль cProfile сохраняется в <коллекция>.profile
+(python3 -m pstats src/data/divans.profile).
+
+sections — те же сводки, что печатаются в консоль (статистика алиасов
+с гистограммами числа алиасов на товар, разбор названий, кэш алиасов,
+фонетические правила, готовые ответы).
+"""
+
+import cProfile
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from catalogWriter import write_json
+
+METRICS_FORMAT = 1
+HOT_FUNCTIONS = 30
+SLOWEST_PRODUCTS = 20
+
+
+def metrics_path_for(json_path):
+    """
+    divans.json → divans.metrics.json
+    """
+    root, ext = os.path.splitext(json_path)
+    return f"{root}.metrics{ext}"
+
+
+def profile_path_for(json_path):
+    """
+    divans.json → divans.profile
+    """
+    root, _ = os.path.splitext(json_path)
+    return f"{root}.profile"
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def histogram(values):
+    """
+    Сводка распределения: min/max/среднее/перцентили и корзины по степеням
+    двойки ("0", "1", "2-3", "4-7", …; дробные значения — по целой части)
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {'count': 0}
+
+    buckets = {}
+    for value in ordered:
+        low = 1 << (int(value).bit_length() - 1) if value >= 1 else 0
+        label = str(low) if low <= 1 else f"{low}-{2 * low - 1}"
+        buckets[label] = buckets.get(label, 0) + 1
+
+    return {
+        'count': len(ordered),
+        'min': ordered[0],
+        'max': ordered[-1],
+        'mean': round(sum(ordered) / len(ordered), 6),
+        'p50': _percentile(ordered, 0.5),
+        'p90': _percentile(ordered, 0.9),
+        'p99': _percentile(ordered, 0.99),
+        'buckets': buckets,
+    }
+
+
+def hot_functions(profiler, top=HOT_FUNCTIONS):
+    """
+    Самые дорогие функции профиля по собственному времени
+    """
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': f"{os.path.basename(filename)}:{line}({name})",
+            'calls': calls,
+            'ownSeconds': round(own, 6),
+            'cumulativeSeconds': round(cumulative, 6),
+        })
+    rows.sort(key=lambda row: -row['ownSeconds'])
+    return rows[:top]
+
+
+class BuildMetrics:
+    """
+    Время и память по этапам и по товарам, гистограммы и сводки одной сборки
+
+    start() включает tracemalloc и cProfile, write() их выключает и пишет
+    <коллекция>.metrics.json и <коллекция>.profile рядом с каталогом
+    """
+
+    enabled = True
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.stages = {}
+        self.products = []
+        self.sections = {}
+        self._stack = []
+        self._mark = 0.0
+        self._memory_mark = 0
+        self._peak = 0
+        self._profiler = None
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+        return self
+
+    def _switch(self):
+        """
+        Граница этапа: накопленное с прошлой границы время и память
+        достаются этапу на вершине стека
+        """
+        now = time.perf_counter()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            stage = self.stages[self._stack[-1]]
+            stage['seconds'] += now - self._mark
+            stage['allocatedBytes'] += current - self._memory_mark
+            stage['peakBytes'] = max(stage['peakBytes'], peak - self._memory_mark)
+        self._peak = max(self._peak, peak)
+        tracemalloc.reset_peak()
+        self._mark = now
+        self._memory_mark = current
+
+    @contextmanager
+    def stage(self, name):
+        stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'allocatedBytes': 0, 'peakBytes': 0})
+        stage['calls'] += 1
+        self._switch()
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._switch()
+            self._stack.pop()
+
+    @contextmanager
+    def product(self, product_id):
+        """
+        Один товар в обычном цикле: время и прирост памяти на него.
+        Отдаёт запись товара — в неё можно добавить свои поля
+        """
+        item = {'id': product_id}
+        started = time.perf_counter()
+        memory = tracemalloc.get_traced_memory()[0]
+        yield item
+        item['seconds'] = round(time.perf_counter() - started, 6)
+        item['allocatedBytes'] = tracemalloc.get_traced_memory()[0] - memory
+        self.products.append(item)
+
+    def _seconds_in(self, names):
+        return sum(self.stages[name]['seconds'] for name in names if name in self.stages)
+
+    def timed(self, name, iterable, product=None, exclude=()):
+        """
+        Пропускает элементы генератора дальше, относя время их получения
+        к этапу name. product(элемент) → {'id': ..., ...} — учёт по товарам;
+        время этапов exclude (например, чтения строки) в него не входит
+        """
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter() - self._seconds_in(exclude)
+            memory = tracemalloc.get_traced_memory()[0]
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            if product is not None:
+                self.products.append(dict(
+                    product(item),
+                    seconds=round(time.perf_counter() - started - self._seconds_in(exclude), 6),
+                    allocatedBytes=tracemalloc.get_traced_memory()[0] - memory,
+                ))
+            yield item
+
+    def section(self, name, report):
+        """
+        Сводка одного из компонентов сборки (то, что печатается в консоль)
+        """
+        self.sections[name] = report
+
+    def report(self, top=HOT_FUNCTIONS):
+        if self._profiler is not None:
+            self._profiler.disable()
+        product_seconds = [item['seconds'] for item in self.products]
+        return {
+            'format': METRICS_FORMAT,
+            'collection': self.collection,
+            'totalSeconds': round(time.perf_counter() - self._started, 6) if self._started else None,
+            'peakAllocatedBytes': max(self._peak, tracemalloc.get_traced_memory()[1]) if tracemalloc.is_tracing() else None,
+            'stages': {
+                name: dict(stage, seconds=round(stage['seconds'], 6))
+                for name, stage in self.stages.items()
+            },
+            'products': {
+                'count': len(self.products),
+                'seconds': histogram(product_seconds),
+                'slowest': sorted(self.products, key=lambda item: -item['seconds'])[:SLOWEST_PRODUCTS],
+                'items': self.products,
+            },
+            'sections': self.sections,
+            'hotFunctions': hot_functions(self._profiler, top) if self._profiler is not None else [],
+        }
+
+    def write(self, output_path, verbose=True):
+        """
+        Пишет метрики и профиль рядом с каталогом output_path
+        """
+        report = self.report()
+        metrics_path = metrics_path_for(output_path)
+        write_json(report, metrics_path, ensure_ascii=False, indent=1)
+        if self._profiler is not None:
+            self._profiler.dump_stats(profile_path_for(output_path))
+        tracemalloc.stop()
+        if verbose:
+            print_metrics(report)
+            print(f"📈 Метрики: {metrics_path}")
+        return report
+
+
+class NullMetrics:
+    """
+    Заглушка без учёта: обычная сборка не платит за метрики
+    """
+
+    enabled = False
+
+    def stage(self, name):
+        return nullcontext()
+
+    def product(self, product_id):
+        return nullcontext({})
+
+    def timed(self, name, iterable, product=None, exclude=()):
+        return iterable
+
+    def section(self, name, report):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+def print_metrics(report, top=5):
+    print(f"\n⏱️  Этапы сборки ({report['totalSeconds']:.2f} с):")
+    for name, stage in sorted(report['stages'].items(), key=lambda item: -item[1]['seconds']):
+        print(f"   {name:<15} {stage['seconds']:8.3f} с  "
+              f"{stage['allocatedBytes'] / 1024 / 1024:+8.1f} МБ  пик {stage['peakBytes'] / 1024 / 1024:.1f} МБ")
+    for item in report['products']['slowest'][:top]:
+        print(f"   🐢 {item['id']}: {item['seconds'] * 1000:.2f} мс")
+    for item in report['hotFunctions'][:top]:
+        print(f"   🔥 {item['function']}: {item['ownSeconds']:.3f} с ({item['calls']} вызовов)")
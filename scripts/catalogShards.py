@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Шардирование каталога по бренду и категории с манифестом
+
+Вместо одного большого JSON записи раскладываются по файлам
+shards/<коллекция>/<бренд>--<категория>.json, а небольшой манифест
+shards/<коллекция>.manifest.json сопоставляет алиасы брендов с файлами
+шардов. При холодном старте достаточно загрузить манифест, шарды
+подгружаются по мере обращения к бренду.
+
+Манифест:
+{
+  "format": 1,
+  "collection": "divans",
+  "shards": [
+    {"file": "divans/elva--диван.json", "brand": "ELVA", "category": "диван",
+     "count": 12, "bytes": 23456, "sha256": "..."},
+    ...
+  ],
+  "brands": {"elva": [0, 3], "элва": [0, 3], ...}
+}
+
+Номера в "brands" — позиции в "shards". Шарды пишутся параллельно
+(пул процессов) и атомарно (catalogWriter.atomic_write), размер и SHA-256
+каждого записываются в манифест. Рантайм бота (src/utils) шарды не читает:
+поиск по полному названию и по модели без бренда проходит весь каталог.
+"""
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from catalogWriter import atomic_write
+
+SHARDS_FORMAT = 1
+
+
+def shard_slug(text):
+    """
+    Имя файла из бренда/категории: нижний регистр, буквы и цифры через дефис
+    """
+    slug = re.sub(r'[^\w]+', '-', str(text).lower(), flags=re.UNICODE).strip('-_')
+    return slug or 'other'
+
+
+def shard_file_name(brand, category, taken):
+    """
+    Имя файла шарда; бренды, отличающиеся только регистром или знаками
+    ("Mio Tesoro" и "MIO-TESORO"), получают суффикс -2, -3, …
+    taken — уже выданные имена (пополняется)
+    """
+    stem = f"{shard_slug(brand)}--{shard_slug(category)}"
+    file_name = f"{stem}.json"
+    suffix = 2
+    while file_name in taken:
+        file_name = f"{stem}-{suffix}.json"
+        suffix += 1
+    taken.add(file_name)
+    return file_name
+
+
+def _write_shard(path, collection_key, records):
+    """
+    Пишет один шард, возвращает (размер, sha256). Выполняется в пуле процессов
+    """
+    raw = json.dumps({collection_key: records}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with atomic_write(path, encoding=None) as f:
+        f.write(raw)
+    return len(raw), hashlib.sha256(raw).hexdigest()
+
+
+def group_shards(records, brand_of, category_of):
+    """
+    Группирует записи по (бренд, категория) в порядке первого появления
+    """
+    groups = {}
+    for record in records:
+        key = (brand_of(record), category_of(record))
+        groups.setdefault(key, []).append(record)
+    return groups
+
+
+def write_shards(records, collection_key, shard_dir, brand_of, category_of, brand_aliases_of, workers=None):
+    """
+    Пишет шарды и манифест
+
+    brand_of / category_of — функции запись → бренд / категория
+    brand_aliases_of — функция запись → алиасы бренда для манифеста
+    workers — число процессов (None — по числу ядер, 1 — без пула)
+    """
+    groups = group_shards(records, brand_of, category_of)
+    collection_dir = os.path.join(shard_dir, collection_key)
+
+    shards = []
+    jobs = []
+    taken = set()
+    for (brand, category), shard_records in groups.items():
+        file_name = shard_file_name(brand, category, taken)
+        shards.append({
+            'file': f"{collection_key}/{file_name}",
+            'brand': brand,
+            'category': category,
+            'count': len(shard_records),
+        })
+        jobs.append((os.path.join(collection_dir, file_name), collection_key, shard_records))
+
+    if workers == 1 or len(jobs) <= 1:
+        results = [_write_shard(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_write_shard, *zip(*jobs)))
+
+    for shard, (size, checksum) in zip(shards, results):
+        shard['bytes'] = size
+        shard['sha256'] = checksum
+
+    brands = {}
+    for position, ((brand, _), shard_records) in enumerate(groups.items()):
+        aliases = {alias.lower() for record in shard_records for alias in brand_aliases_of(record)}
+        aliases.add(str(brand).lower())
+        for alias in aliases:
+            if alias:
+                brands.setdefault(alias, []).append(position)
+
+    # Удаляем шарды, оставшиеся от прошлой сборки (пустая коллекция —
+    # ни одного шарда, папки может не быть)
+    os.makedirs(collection_dir, exist_ok=True)
+    written = {os.path.basename(job[0]) for job in jobs}
+    for name in os.listdir(collection_dir):
+        if name.endswith('.json') and name not in written:
+            os.remove(os.path.join(collection_dir, name))
+
+    manifest = {
+        'format': SHARDS_FORMAT,
+        'collection': collection_key,
+        'shards': shards,
+        'brands': dict(sorted(brands.items())),
+    }
+    manifest_path = os.path.join(shard_dir, f"{collection_key}.manifest.json")
+    with atomic_write(manifest_path) as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    total = sum(shard['bytes'] for shard in shards)
+    print(f"🧩 Шарды: {len(shards)} файлов, {total} байт, "
+          f"манифест {os.path.getsize(manifest_path)} байт → {manifest_path}")
+    return manifest
+
+
+def load_manifest(shard_dir, collection_key):
+    manifest_path = os.path.join(shard_dir, f"{collection_key}.manifest.json")
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != SHARDS_FORMAT:
+        raise ValueError(f"Неподдерживаемый формат манифеста: {manifest.get('format')}")
+    return manifest
+
+
+def load_shard(shard_dir, manifest, position, verify=True):
+    """
+    Загружает шард по номеру, при verify сверяет SHA-256 с манифестом
+    """
+    shard = manifest['shards'][position]
+    with open(os.path.join(shard_dir, shard['file']), 'rb') as f:
+        raw = f.read()
+    if verify and hashlib.sha256(raw).hexdigest() != shard['sha256']:
+        raise ValueError(f"Шард {shard['file']} не совпадает с манифестом")
+    return json.loads(raw.decode('utf-8'))[manifest['collection']]
+
+
+def shards_for_query(manifest, query):
+    """
+    Номера шардов, чей алиас бренда встречается в запросе
+    """
+    words = ' '.join(str(query).lower().split())
+    padded = f" {words} "
+    return sorted({
+        position
+        for alias, positions in manifest['brands'].items()
+        if f" {alias} " in padded
+        for position in positions
+    })
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Атомарная запись каталогов и журнал изменений между сборками
+
+Раньше каталог писался прямо в рабочий файл (а updateMatrasy.py — поверх
+собственного входа), так что падение посреди записи оставляло бота
+с обрезанным JSON. Теперь запись идёт во временный файл в той же папке,
+затем fsync и атомарное переименование: рабочий файл всегда либо старый,
+либо новый целиком.
+
+Режим журнала (--diff) вместо полного каталога пишет только изменения
+относительно предыдущей сборки — <коллекция>.changelog.json:
+{
+  "format": 1,
+  "collection": "divans",
+  "idField": "kod",
+  "base": "<sha256 предыдущего файла>",
+  "target": "<sha256 полного нового каталога>",
+  "added": [{...}, ...],
+  "removed": ["10091617", ...],
+  "changed": [{"id": "10077273", "set": {"description": "..."}, "unset": []}, ...],
+  "order": [...]
+}
+
+"order" есть, только если порядок записей нельзя восстановить как
+«старый порядок без удалённых + добавленные в конце»; "keys" у изменённой
+записи — только если поменялся порядок её полей. Журнал применяется
+командой apply: проверяется SHA-256 исходного файла и результата.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+CHANGELOG_FORMAT = 1
+
+
+@contextmanager
+def atomic_write(path, encoding='utf-8'):
+    """
+    Файл для записи, который заменит path только после успешного закрытия
+    (временный файл рядом, fsync, os.replace). При ошибке path не меняется.
+    encoding=None — файл открывается в двоичном режиме
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w' if encoding else 'wb', encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        mode = os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    # Переименование тоже должно пережить сбой питания
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def json_chunks(records, key):
+    """
+    Куски текста {key: [...]} по одной записи. Вместе побайтно совпадают
+    с json.dump(..., ensure_ascii=False, indent=2)
+    """
+    yield '{\n  ' + json.dumps(key) + ': ['
+    count = 0
+    for record in records:
+        yield ',\n    ' if count else '\n    '
+        yield json.dumps(record, ensure_ascii=False, indent=2).replace('\n', '\n    ')
+        count += 1
+    yield '\n  ]\n}' if count else ']\n}'
+
+
+def write_json_stream(records, output_path, key):
+    """
+    Пишет {key: [...]} по одной записи, не держа весь список в памяти,
+    атомарно заменяя output_path. Возвращает число записей
+    """
+    count = 0
+
+    def counted():
+        nonlocal count
+        for record in records:
+            count += 1
+            yield record
+
+    with atomic_write(output_path) as f:
+        for chunk in json_chunks(counted(), key):
+            f.write(chunk)
+    return count
+
+
+def write_json(data, output_path, **kwargs):
+    """
+    json.dump в output_path через атомарную замену
+    """
+    with atomic_write(output_path) as f:
+        json.dump(data, f, **kwargs)
+
+
+def changelog_path_for(json_path):
+    """
+    divans.json → divans.changelog.json
+    """
+    root, ext = os.path.splitext(json_path)
+    return f"{root}.changelog{ext}"
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _index_by_id(records, id_field):
+    indexed = {}
+    for record in records:
+        record_id = record[id_field]
+        if record_id in indexed:
+            raise ValueError(f"Повторяющийся {id_field}: {record_id}")
+        indexed[record_id] = record
+    return indexed
+
+
+def diff_records(old_records, new_records, key, id_field):
+    """
+    Журнал изменений old → new. new_records может быть генератором:
+    записи сравниваются по мере поступления, SHA-256 полного нового
+    каталога считается по тем же кускам, что пишет write_json_stream
+    """
+    old_by_id = _index_by_id(old_records, id_field)
+    seen = set()
+    order = []
+    added = []
+    changed = []
+    digest = hashlib.sha256()
+
+    def compared():
+        for record in new_records:
+            record_id = record[id_field]
+            if record_id in seen:
+                raise ValueError(f"Повторяющийся {id_field}: {record_id}")
+            seen.add(record_id)
+            order.append(record_id)
+            old = old_by_id.get(record_id)
+            if old is None:
+                added.append(record)
+            elif old != record or list(old) != list(record):
+                change = {
+                    'id': record_id,
+                    'set': {field: value for field, value in record.items() if old.get(field) != value},
+                    'unset': [field for field in old if field not in record],
+                }
+                # Порядок полей нужен, только если он поменялся
+                if [field for field in old if field in record] + [
+                        field for field in record if field not in old] != list(record):
+                    change['keys'] = list(record)
+                changed.append(change)
+            yield record
+
+    for chunk in json_chunks(compared(), key):
+        digest.update(chunk.encode('utf-8'))
+
+    removed = [record[id_field] for record in old_records if record[id_field] not in seen]
+    changelog = {
+        'format': CHANGELOG_FORMAT,
+        'collection': key,
+        'idField': id_field,
+        'target': digest.hexdigest(),
+        'added': added,
+        'removed': removed,
+        'changed': changed,
+    }
+    default_order = [record[id_field] for record in old_records if record[id_field] in seen]
+    default_order += [record[id_field] for record in added]
+    if order != default_order:
+        changelog['order'] = order
+    return changelog
+
+
+def write_changelog(records, output_path, key, id_field, changelog_path=None, verbose=True):
+    """
+    Пишет журнал изменений records относительно текущего output_path
+    (сам каталог не переписывается). Возвращает число записей нового каталога
+    """
+    changelog_path = changelog_path or changelog_path_for(output_path)
+    if os.path.exists(output_path):
+        with open(output_path, 'r', encoding='utf-8') as f:
+            old_records = json.load(f)[key]
+        base = _sha256_file(output_path)
+    else:
+        old_records = []
+        base = None
+
+    changelog = diff_records(old_records, records, key, id_field)
+    changelog['base'] = base
+    write_json(changelog, changelog_path, ensure_ascii=False, separators=(',', ':'))
+
+    count = len(old_records) - len(changelog['removed']) + len(changelog['added'])
+    if verbose:
+        print(f"🧾 Журнал изменений: добавлено {len(changelog['added'])}, "
+              f"удалено {len(changelog['removed'])}, изменено {len(changelog['changed'])}, "
+              f"{os.path.getsize(changelog_path)} байт → {changelog_path}")
+    return count
+
+
+def apply_changelog(base_path, changelog_path, output_path=None):
+    """
+    Применяет журнал к каталогу base_path и атомарно пишет результат
+    (по умолчанию — поверх base_path). Сверяет SHA-256 до и после
+    """
+    output_path = output_path or base_path
+    with open(changelog_path, 'r', encoding='utf-8') as f:
+        changelog = json.load(f)
+    if changelog.get('format') != CHANGELOG_FORMAT:
+        raise ValueError(f"Неподдерживаемый формат журнала: {changelog.get('format')}")
+
+    key = changelog['collection']
+    id_field = changelog['idField']
+    if changelog['base'] is None:
+        old_records = []
+    else:
+        if _sha256_file(base_path) != changelog['base']:
+            raise ValueError(f"{base_path} не совпадает с исходной сборкой журнала")
+        with open(base_path, 'r', encoding='utf-8') as f:
+            old_records = json.load(f)[key]
+
+    removed = set(changelog['removed'])
+    by_id = {record[id_field]: dict(record) for record in old_records if record[id_field] not in removed}
+    for change in changelog['changed']:
+        record = by_id[change['id']]
+        record.update(change['set'])
+        for field in change['unset']:
+            record.pop(field, None)
+        if 'keys' in change:
+            by_id[change['id']] = {field: record[field] for field in change['keys']}
+    for record in changelog['added']:
+        by_id[record[id_field]] = record
+
+    order = changelog.get('order')
+    if order is None:
+        order = [record[id_field] for record in old_records if record[id_field] not in removed]
+        order += [record[id_field] for record in changelog['added']]
+    records = [by_id[record_id] for record_id in order]
+
+    digest = hashlib.sha256()
+    for chunk in json_chunks(records, key):
+        digest.update(chunk.encode('utf-8'))
+    if digest.hexdigest() != changelog['target']:
+        raise ValueError("Результат применения журнала не совпадает с целевой сборкой")
+
+    write_json_stream(records, output_path, key)
+    return len(records)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Применение журнала изменений каталога')
+    parser.add_argument('catalog', help='каталог, к которому применяется журнал (divans.json)')
+    parser.add_argument('changelog', help='журнал изменений (divans.changelog.json)')
+    parser.add_argument('--output', default=None, help='куда записать результат (по умолчанию — поверх каталога)')
+    args = parser.parse_args()
+
+    count = apply_changelog(args.catalog, args.changelog, args.output)
+    print(f"✅ Журнал применён: {count} записей → {args.output or args.catalog}")
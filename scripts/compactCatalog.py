@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Компактный формат каталога с интернированными таблицами
+
+Обычный divans.json повторяет у каждого дивана один и тот же массив
+brandAliases и одно и то же описание у всех расцветок модели. Компактный
+формат хранит каждую строку алиаса один раз ("strings"), каждый набор
+алиасов один раз ("aliasSets", ссылки на строки), а в записи вместо
+массива — номер набора. Длинные тексты (description) вынесены в отдельный
+файл, который можно грузить лениво. Вывод минифицирован.
+
+divans.compact.json:
+{
+  "format": 2,
+  "collection": "divans",
+  "source": {"file": "divans.json", "sha256": "..."},
+  "strings": ["elva", "элва", ...],
+  "aliasSets": [[0, 1, ...], ...],
+  "listFields": ["brandAliases", "modelAliases", "articleAliases"],
+  "textFields": ["description"],
+  "texts": "divans.descriptions.json",
+  "textsSha256": "...",
+  "records": [{"kod": "10091617", ..., "brandAliases": 0, "description": 0}, ...]
+}
+
+divans.descriptions.json:
+{"format": 2, "texts": ["ASPEN — это прямой диван...", ...]}
+
+SHA-256 исходного divans.json и файла текстов записаны в компактный каталог:
+после git checkout или выкладки порядок mtime не гарантирован, поэтому
+читатель (src/utils/catalogLoader.js) сверяет оба хэша и при расхождении
+читает divans.json. Оба файла пишутся атомарно.
+
+Прежний формат по-прежнему пишется как совместимый вывод.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from catalogWriter import atomic_write
+
+COMPACT_FORMAT = 2
+
+
+def compact_paths_for(json_path):
+    """
+    divans.json → (divans.compact.json, divans.descriptions.json)
+    """
+    root, ext = os.path.splitext(json_path)
+    return f"{root}.compact{ext}", f"{root}.descriptions{ext}"
+
+
+class _Interner:
+    def __init__(self):
+        self.items = []
+        self._positions = {}
+
+    def add(self, value):
+        key = json.dumps(value, ensure_ascii=False) if isinstance(value, list) else value
+        position = self._positions.get(key)
+        if position is None:
+            position = len(self.items)
+            self._positions[key] = position
+            self.items.append(value)
+        return position
+
+
+def build_compact_catalog(records, collection_key, list_fields, text_fields=('description',)):
+    """
+    Возвращает (компактный каталог, список текстов)
+    """
+    strings = _Interner()
+    alias_sets = _Interner()
+    texts = _Interner()
+    compact_records = []
+
+    for record in records:
+        item = {}
+        for field, value in record.items():
+            if field in list_fields and isinstance(value, list):
+                item[field] = alias_sets.add([strings.add(alias) for alias in value])
+            elif field in text_fields and isinstance(value, str):
+                item[field] = texts.add(value)
+            else:
+                item[field] = value
+        compact_records.append(item)
+
+    catalog = {
+        'format': COMPACT_FORMAT,
+        'collection': collection_key,
+        'strings': strings.items,
+        'aliasSets': alias_sets.items,
+        'listFields': list(list_fields),
+        'textFields': list(text_fields),
+        'records': compact_records,
+    }
+    return catalog, texts.items
+
+
+def expand_compact_catalog(catalog, texts=None):
+    """
+    Обратное преобразование в прежний формат: {collection: [записи]}.
+    Без texts текстовые поля остаются номерами (ленивая загрузка)
+    """
+    strings = catalog['strings']
+    alias_sets = catalog['aliasSets']
+    list_fields = set(catalog['listFields'])
+    text_fields = set(catalog['textFields'])
+
+    records = []
+    for item in catalog['records']:
+        record = {}
+        for field, value in item.items():
+            if field in list_fields and isinstance(value, int):
+                record[field] = [strings[position] for position in alias_sets[value]]
+            elif field in text_fields and texts is not None and isinstance(value, int):
+                record[field] = texts[value]
+            else:
+                record[field] = value
+        records.append(record)
+
+    return {catalog['collection']: records}
+
+
+def write_compact_catalog(records, collection_key, json_path, list_fields, text_fields=('description',)):
+    """
+    Пишет компактный каталог и файл текстов рядом с json_path (уже
+    записанным: в каталог попадает его SHA-256), проверяет, что из них
+    восстанавливается исходный список записей
+    """
+    compact_path, texts_path = compact_paths_for(json_path)
+    catalog, texts = build_compact_catalog(records, collection_key, list_fields, text_fields)
+
+    texts_raw = json.dumps({'format': COMPACT_FORMAT, 'texts': texts}, ensure_ascii=False, separators=(',', ':'))
+    with open(json_path, 'rb') as f:
+        source_sha256 = hashlib.sha256(f.read()).hexdigest()
+    catalog['source'] = {'file': os.path.basename(json_path), 'sha256': source_sha256}
+    catalog['texts'] = os.path.basename(texts_path)
+    catalog['textsSha256'] = hashlib.sha256(texts_raw.encode('utf-8')).hexdigest()
+
+    with atomic_write(texts_path) as f:
+        f.write(texts_raw)
+    with atomic_write(compact_path) as f:
+        json.dump(catalog, f, ensure_ascii=False, separators=(',', ':'))
+
+    if expand_compact_catalog(catalog, texts)[collection_key] != list(records):
+        raise ValueError(f"Компактный каталог {compact_path} не совпадает с исходным")
+
+    print(f"🗜️  Компактный каталог: {len(catalog['strings'])} строк, "
+          f"{len(catalog['aliasSets'])} наборов алиасов, {len(texts)} текстов")
+    print_size_comparison(json_path, compact_path, texts_path)
+    return compact_path, texts_path
+
+
+def _parse_time(path, repeat=5):
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = f.read()
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        json.loads(raw)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def print_size_comparison(json_path, compact_path, texts_path):
+    print(f"   {os.path.basename(json_path)}: {os.path.getsize(json_path)} байт, "
+          f"разбор {_parse_time(json_path):.2f} мс")
+    print(f"   {os.path.basename(compact_path)}: {os.path.getsize(compact_path)} байт, "
+          f"разбор {_parse_time(compact_path):.2f} мс")
+    print(f"   {os.path.basename(texts_path)} (лениво): {os.path.getsize(texts_path)} байт")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Извлечение описаний матрасов из папки "Описание матрасов/*.docx"
+
+Файл "Lagoma Alma _ описание.docx" соответствует записи с id "lagoma-alma".
+Описание — абзацы до раздела "Особенности:". Документы разбираются
+параллельно в пуле процессов; извлечённый текст кэшируется по времени
+изменения, размеру и SHA-256 файла, так что неизменённые документы
+не открываются повторно.
+
+.docx читается стандартной библиотекой (zip + XML), без python-docx.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+from catalogWriter import atomic_write
+
+CACHE_FORMAT = 1
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+SECTION_MARKERS = ('особенности', 'основные характеристики')
+DASH_RE = re.compile(r'(\w)([–—])')
+
+
+def docx_id(file_name):
+    """
+    "Lagoma Alma _ описание.docx" → "lagoma-alma"
+    """
+    title = os.path.splitext(file_name)[0].split(' _ ')[0]
+    return '-'.join(title.lower().split())
+
+
+def docx_paragraphs(path):
+    """
+    Текст абзацев документа (word/document.xml)
+    """
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read('word/document.xml'))
+    paragraphs = []
+    for paragraph in root.iter(f'{WORD_NS}p'):
+        text = ''.join(node.text or '' for node in paragraph.iter(f'{WORD_NS}t'))
+        paragraphs.append(' '.join(text.split()))
+    return paragraphs
+
+
+def extract_description(paragraphs):
+    """
+    Абзацы до раздела "Особенности:" одной строкой.
+    Перед тире ставится пробел, если в документе его нет ("Lund– матрас")
+    """
+    description = []
+    for paragraph in paragraphs:
+        if paragraph.lower().rstrip(':').startswith(SECTION_MARKERS):
+            break
+        if paragraph:
+            description.append(paragraph)
+    return DASH_RE.sub(r'\1 \2', ' '.join(description))
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _process_docx(path, cached_sha256):
+    """
+    Хэширует и (если содержимое изменилось) разбирает документ.
+    Выполняется в пуле процессов. Возвращает (sha256, текст или None, секунды)
+    """
+    started = time.perf_counter()
+    sha256 = _file_sha256(path)
+    text = None
+    if sha256 != cached_sha256:
+        text = extract_description(docx_paragraphs(path))
+    return sha256, text, time.perf_counter() - started
+
+
+def load_cache(cache_path):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get('files', {}) if cache.get('format') == CACHE_FORMAT else {}
+
+
+def save_cache(cache_path, files):
+    with atomic_write(cache_path) as f:
+        json.dump({'format': CACHE_FORMAT, 'files': files}, f, ensure_ascii=False)
+
+
+def ingest_docx_descriptions(docx_dir, cache_path, workers=None, verbose=True):
+    """
+    Описания из всех .docx папки: id → текст.
+    Файлы с прежними временем изменения и размером берутся из кэша без чтения,
+    остальные хэшируются и разбираются параллельно (если хэш совпал — текст
+    тоже берётся из кэша)
+    """
+    cached = load_cache(cache_path)
+    files = {}
+    pending = []
+
+    for name in sorted(os.listdir(docx_dir)):
+        if not name.lower().endswith('.docx') or name.startswith('~$'):
+            continue
+        path = os.path.join(docx_dir, name)
+        stat = os.stat(path)
+        entry = cached.get(name)
+        if entry and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            files[name] = entry
+        else:
+            pending.append((name, path, stat, entry))
+
+    timings = []
+    if pending:
+        args = [(path, entry['sha256'] if entry else None) for _, path, _, entry in pending]
+        if workers == 1 or len(pending) == 1:
+            results = [_process_docx(*arg) for arg in args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_process_docx, *zip(*args)))
+
+        for (name, _, stat, entry), (sha256, text, elapsed) in zip(pending, results):
+            reused = text is None
+            files[name] = {
+                'id': docx_id(name),
+                'mtime': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha256': sha256,
+                'text': entry['text'] if reused else text,
+            }
+            timings.append((name, elapsed, reused))
+
+    save_cache(cache_path, files)
+
+    if verbose:
+        skipped = len(files) - len(pending)
+        print(f"📄 Описания из .docx: {len(files)} файлов, без изменений: {skipped}, "
+              f"разобрано: {sum(1 for _, _, reused in timings if not reused)}")
+        for name, elapsed, reused in sorted(timings, key=lambda item: -item[1]):
+            note = ' (содержимое не изменилось)' if reused else ''
+            print(f"   {name}: {elapsed * 1000:.1f} мс{note}")
+
+    return {entry['id']: entry['text'] for entry in files.values() if entry['text']}
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест вебхука навыка на фразах из собранных каталогов
+
+Фразы берутся из divans.json/matrasy.json: алиасы брендов и моделей диванов,
+алиасы матрасов, артикулы цифрами и словами («артикул один ноль ноль
+девять…», со всеми вариантами произношения из DIGIT_NAMES). Из них
+собираются тела запросов в формате Алисы; application_id колонки берётся
+из src/config/deviceContent.js, чтобы запрос о диване пришёл из зоны
+диванов, а о матрасе — из зоны матрасов.
+
+Запросы шлют --concurrency асинхронных клиентов (asyncio, по одному
+keep-alive соединению на клиента). В отчёте:
+- пропускная способность (запросов в секунду);
+- задержка p50/p95/p99 — общая и по интентам (диваны, матрасы, артикулы);
+- ошибки (не 200, неверный JSON, таймаут) и ответы «не нашла».
+
+--stub поднимает в том же процессе заглушку вебхука: она отвечает через
+эталон поиска из queryReplay.py, так что тест работает без Node.js и сети.
+
+    python3 scripts/loadTest.py --url http://localhost:3000/webhook --concurrency 32 --requests 5000
+    python3 scripts/loadTest.py --stub
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from articleAutomaton import DIGIT_NAMES, article_digits
+from queryReplay import find_divan, find_divan_by_kod, find_matras, load_build
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_REQUESTS = 2000
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MIX = {'divan_search': 0.5, 'matras_search': 0.3, 'article_search': 0.2}
+
+# Зона колонки, из которой приходит запрос каждого интента
+INTENT_LOCATIONS = {
+    'divan_search': 'divans1',
+    'matras_search': 'matrasy1',
+    'article_search': 'divans1',
+}
+
+# Начала ответов «товар не найден» (mainHandler.js)
+NOT_FOUND_PREFIXES = (
+    'Не могу найти',
+    'Тут такие классные матрасы, я еще сонная',
+    'Назовите артикул',
+    'Извините, я могу рассказать о диванах только',
+)
+
+DIVAN_PREFIXES = ['', 'диван ', 'расскажи про диван ', 'расскажи про ']
+MATRAS_PREFIXES = ['', 'матрас ', 'расскажи про матрас ', 'алиса расскажи про ']
+ARTICLE_PREFIXES = ['артикул ', 'код товара ', 'расскажи про артикул ', '']
+
+DEVICE_MAPPING_RE = re.compile(r"'([0-9A-F]{64})':\s*'(\w+)'")
+
+# Замены convertWordsToDigits (src/utils/articleSearch.js) в том же порядке:
+# длинные слова раньше коротких
+WORDS_TO_DIGITS = [
+    ('восьмерка', '8'), ('восемь', '8'), ('семерка', '7'), ('семь', '7'),
+    ('шестерка', '6'), ('шесть', '6'), ('пятерка', '5'), ('пять', '5'),
+    ('четверка', '4'), ('четыре', '4'), ('тройка', '3'), ('три', '3'),
+    ('двойка', '2'), ('две', '2'), ('два', '2'), ('единица', '1'), ('одна', '1'), ('один', '1'),
+    ('девятка', '9'), ('девять', '9'), ('ноль', '0'), ('нуль', '0'),
+]
+
+
+def load_device_ids(config_path):
+    """
+    Зона → application_id первой привязанной к ней колонки
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    devices = {}
+    for application_id, location in DEVICE_MAPPING_RE.findall(text):
+        devices.setdefault(location, application_id)
+    return devices
+
+
+def spoken_article(rng, digits):
+    return ' '.join(rng.choice(DIGIT_NAMES[digit]) for digit in digits)
+
+
+def sample_utterances(build, count, mix=DEFAULT_MIX, seed=42):
+    """
+    count фраз [(интент, фраза), ...] из алиасов каталогов в пропорции mix
+    """
+    rng = random.Random(seed)
+    divans = [divan for divan in build['divans'] if divan.get('modelAliases')]
+    matrasy = [matras for matras in build['matrasy'] if matras.get('aliases')]
+    intents = list(mix)
+    weights = [mix[intent] for intent in intents]
+
+    samples = []
+    for intent in rng.choices(intents, weights, k=count):
+        if intent == 'divan_search':
+            divan = rng.choice(divans)
+            brand = rng.choice(divan.get('brandAliases') or [divan['brand'].lower()])
+            model = rng.choice(divan['modelAliases'])
+            utterance = rng.choice(DIVAN_PREFIXES) + (f"{brand} {model}" if rng.random() < 0.7 else model)
+        elif intent == 'matras_search':
+            matras = rng.choice(matrasy)
+            utterance = rng.choice(MATRAS_PREFIXES) + rng.choice(matras['aliases'])
+        else:
+            digits = article_digits(rng.choice(build['divans'])['kod'])
+            spoken = spoken_article(rng, digits) if rng.random() < 0.5 else digits
+            utterance = rng.choice(ARTICLE_PREFIXES) + spoken
+        samples.append((intent, utterance.strip()))
+    return samples
+
+
+def alice_request(utterance, application_id, message_id=1, session_id=None):
+    """
+    Тело запроса Алисы (SimpleUtterance) от колонки application_id
+    """
+    session_id = session_id or str(uuid.uuid4())
+    return {
+        'meta': {
+            'locale': 'ru-RU',
+            'timezone': 'Europe/Moscow',
+            'client_id': 'ru.yandex.quasar.app/1.0 (Yandex Station; android 9)',
+            'interfaces': {},
+        },
+        'request': {
+            'command': utterance.lower(),
+            'original_utterance': utterance,
+            'type': 'SimpleUtterance',
+            'markup': {'dangerous_context': False},
+            'nlu': {'tokens': utterance.lower().split(), 'entities': [], 'intents': {}},
+        },
+        'session': {
+            'message_id': message_id,
+            'session_id': session_id,
+            'skill_id': 'load-test',
+            'user_id': application_id,
+            'user': {'user_id': application_id},
+            'application': {'application_id': application_id},
+            'new': False,
+        },
+        'state': {'session': {}, 'user': {}, 'application': {}},
+        'version': '1.0',
+    }
+
+
+# --- HTTP/1.1 поверх asyncio ---
+
+async def read_http_message(reader):
+    """
+    (стартовая строка, заголовки, тело); Content-Length или chunked
+    """
+    start_line = await reader.readline()
+    if not start_line:
+        raise ConnectionError('соединение закрыто')
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        body = bytearray()
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            body += await reader.readexactly(size)
+            await reader.readline()
+        return start_line.decode('latin-1').strip(), headers, bytes(body)
+
+    length = int(headers.get('content-length', 0))
+    body = await reader.readexactly(length) if length else b''
+    return start_line.decode('latin-1').strip(), headers, body
+
+
+class HttpClient:
+    """
+    Одно keep-alive соединение; при обрыве переподключается
+    """
+
+    def __init__(self, url, timeout=DEFAULT_TIMEOUT):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or '/'
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def post_json(self, payload):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.writer.write(
+            f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n".encode('latin-1') + body
+        )
+        await self.writer.drain()
+        status_line, headers, data = await asyncio.wait_for(read_http_message(self.reader), self.timeout)
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return int(status_line.split()[1]), data
+
+
+# --- Прогон ---
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def _latency_summary(latencies):
+    ordered = sorted(latencies)
+    return {
+        'p50': round(_percentile(ordered, 0.5), 3),
+        'p95': round(_percentile(ordered, 0.95), 3),
+        'p99': round(_percentile(ordered, 0.99), 3),
+        'max': round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+async def run_load(url, samples, devices, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """
+    Шлёт samples в concurrency потоков и возвращает отчёт
+    """
+    queue = asyncio.Queue()
+    for number, sample in enumerate(samples, 1):
+        queue.put_nowait((number, sample))
+
+    results = []
+
+    async def worker():
+        client = HttpClient(url, timeout)
+        session_id = str(uuid.uuid4())
+        try:
+            while True:
+                try:
+                    number, (intent, utterance) = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                payload = alice_request(utterance, devices.get(INTENT_LOCATIONS[intent], ''), number, session_id)
+                started = time.perf_counter()
+                error = None
+                text = ''
+                try:
+                    status, data = await client.post_json(payload)
+                    if status != 200:
+                        error = f"HTTP {status}"
+                    else:
+                        text = json.loads(data)['response']['text']
+                except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                        ValueError, KeyError) as exc:
+                    error = exc.__class__.__name__
+                    await client.close()
+                results.append({
+                    'intent': intent,
+                    'ms': (time.perf_counter() - started) * 1000,
+                    'error': error,
+                    'notFound': error is None and text.startswith(NOT_FOUND_PREFIXES),
+                })
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    by_intent = {}
+    for result in results:
+        by_intent.setdefault(result['intent'], []).append(result)
+
+    def summary(items):
+        ok = [item['ms'] for item in items if item['error'] is None]
+        return dict(
+            requests=len(items),
+            errors=sum(1 for item in items if item['error'] is not None),
+            notFound=sum(1 for item in items if item['notFound']),
+            latencyMs=_latency_summary(ok),
+        )
+
+    errors = {}
+    for result in results:
+        if result['error'] is not None:
+            errors[result['error']] = errors.get(result['error'], 0) + 1
+
+    return dict(
+        summary(results),
+        url=url,
+        concurrency=concurrency,
+        seconds=round(elapsed, 3),
+        throughput=round(len(results) / elapsed, 1) if elapsed else 0.0,
+        intents={intent: summary(items) for intent, items in sorted(by_intent.items())},
+        errorKinds=errors,
+    )
+
+
+def print_report(report):
+    print(f"🎯 {report['url']}, клиентов: {report['concurrency']}")
+    print(f"   Запросов: {report['requests']} за {report['seconds']:.2f} с — {report['throughput']:.1f} в секунду")
+    print(f"   Ошибок: {report['errors']}" + (f" {report['errorKinds']}" if report['errorKinds'] else ''))
+    latency = report['latencyMs']
+    print(f"   Задержка: p50 {latency['p50']:.1f} мс, p95 {latency['p95']:.1f} мс, p99 {latency['p99']:.1f} мс")
+    print(f"\n   {'интент':<16} {'запросов':>9} {'не нашла':>9} {'ошибок':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for intent, item in report['intents'].items():
+        latency = item['latencyMs']
+        print(f"   {intent:<16} {item['requests']:>9} {item['notFound']:>9} {item['errors']:>7} "
+              f"{latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f}")
+
+
+# --- Заглушка вебхука ---
+
+def convert_words_to_digits(text):
+    """
+    Порт convertWordsToDigits: цифры из слов и чисел текста, если их
+    хотя бы 5, иначе исходный текст
+    """
+    result = text.lower()
+    for word, digit in WORDS_TO_DIGITS:
+        result = result.replace(word, digit)
+    digits = re.findall(r'\d', result)
+    return ''.join(digits) if len(digits) >= 5 else text
+
+
+def stub_answer(build, devices, body):
+    """
+    Ответ заглушки: зона колонки по application_id, поиск — эталон queryReplay.py,
+    артикулы — как handleArticleSearch (convertWordsToDigits)
+    """
+    locations = {application_id: location for location, application_id in devices.items()}
+    command = body['request']['command']
+    location = locations.get(body['session']['application']['application_id'])
+
+    article = re.search(r'\d{5,}', command) or re.search(r'\d{5,}', convert_words_to_digits(command))
+    if article:
+        divan = find_divan_by_kod(build['divans'], article.group())
+        text = f"🛋️ {divan['name']}" if divan else 'Не могу найти товар с таким артикулом.'
+    elif location == 'matrasy1':
+        matras = find_matras(build['matrasy'], command)
+        if matras is None:
+            text = 'Тут такие классные матрасы, я еще сонная, не поняла ваш вопрос.'
+        else:
+            text = f"🛏️ {matras}" if isinstance(matras, str) else f"🛏️ {matras['fullName']}"
+    elif location in ('divans1', 'divans2'):
+        divan = find_divan(build['divans'], command)
+        text = f"🛋️ {divan['name']}" if divan else 'Не могу найти такой диван.'
+    else:
+        text = 'Извините, я могу рассказать о диванах только в зоне диванов.'
+
+    return {
+        'response': {'text': text, 'end_session': False, 'should_listen': True},
+        'session_state': {'timeout': 3600},
+        'version': '1.0',
+    }
+
+
+async def start_stub_server(build, devices, host='127.0.0.1', port=0):
+    """
+    Заглушка POST /webhook и GET /health на asyncio. Возвращает (server, url)
+    """
+    async def handle(reader, writer):
+        try:
+            while True:
+                try:
+                    start_line, headers, body = await read_http_message(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    return
+                method, path = start_line.split()[:2]
+                if method == 'POST' and path == '/webhook':
+                    status, payload = '200 OK', stub_answer(build, devices, json.loads(body))
+                elif method == 'GET' and path == '/health':
+                    status, payload = '200 OK', {'status': 'ok'}
+                else:
+                    status, payload = '404 Not Found', {'error': 'not found'}
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: keep-alive\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    bound_port = server.sockets[0].getsockname()[1]
+    return server, f"http://{host}:{bound_port}/webhook"
+
+
+async def main(args, build, devices, samples):
+    server = None
+    url = args.url
+    if args.stub:
+        server, url = await start_stub_server(build, devices)
+        print(f"🧪 Заглушка вебхука: {url}\n")
+    try:
+        return await run_load(url, samples, devices, args.concurrency, args.timeout)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_dir = os.path.dirname(script_dir)
+
+    parser = argparse.ArgumentParser(description='Нагрузочный тест вебхука навыка')
+    parser.add_argument('--url', default='http://localhost:3000/webhook',
+                        help='адрес вебхука (по умолчанию локальный сервер)')
+    parser.add_argument('--stub', action='store_true',
+                        help='поднять заглушку вебхука в этом же процессе и нагружать её')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='число одновременных клиентов')
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS,
+                        help='всего запросов')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='таймаут ответа, секунд')
+    parser.add_argument('--mix', default=None,
+                        help='доли интентов, например divan_search=0.6,matras_search=0.2,article_search=0.2')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='seed выборки фраз')
+    parser.add_argument('--build', default=os.path.join(project_dir, 'src', 'data'),
+                        help='папка с divans.json и matrasy.json')
+    parser.add_argument('--report', default=None,
+                        help='записать отчёт в JSON')
+    args = parser.parse_args()
+
+    mix = DEFAULT_MIX
+    if args.mix:
+        mix = {name: float(share) for name, share in (item.split('=') for item in args.mix.split(','))}
+        unknown = set(mix) - set(INTENT_LOCATIONS)
+        if unknown:
+            parser.error(f"неизвестные интенты: {', '.join(sorted(unknown))}")
+
+    build = load_build(args.build)
+    devices = load_device_ids(os.path.join(project_dir, 'src', 'config', 'deviceContent.js'))
+    samples = sample_utterances(build, args.requests, mix, args.seed)
+
+    print("🚦 Нагрузочный тест вебхука\n")
+    report = asyncio.run(main(args, build, devices, samples))
+    print_report(report)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n📝 Отчёт: {args.report}")
+
+    print("\n✨ Готово!")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Табличный разбор названия товара на бренд и модель
+
+"Диван угловой Mio Tesoro Лира правый (Diagonal 694, опора черная)"
+→ ("Mio Tesoro", "Лира правый")
+
+Вместо большого регулярного выражения и отдельных веток под каждый
+многословный бренд — префиксное дерево по словам:
+
+- FURNITURE_TYPES — типы мебели в начале названия ("диван угловой",
+  "кресло-кровать", …); skip — сколько слов после типа тоже отбросить
+  ("Комплект <название> …");
+- многословные бренды берутся из ключей BRAND_ALIASES: новый бренд из
+  двух слов — новая запись в словаре, без нового кода.
+
+Односложный бренд — первое слово после типа мебели. Всё после первой
+скобки (ткань, цвет, опоры) на разбор не влияет, поэтому результат
+кэшируется по части названия до скобки: расцветки одной модели
+разбираются один раз.
+"""
+
+import re
+
+# Типы мебели: (слова, сколько слов после типа отбросить)
+FURNITURE_TYPES = [
+    (('диван',), 0),
+    (('диван', 'угловой'), 0),
+    (('диван', 'п-образный'), 0),
+    (('кресло',), 0),
+    (('кресло-кровать',), 0),
+    (('кресло-реклайнер',), 0),
+    (('кресло', 'мягкое'), 0),
+    (('комплект',), 1),
+    (('модуль', 'мягкий'), 0),
+    (('пуф',), 0),
+    (('пуф-трансформер',), 0),
+    (('тахта',), 0),
+    (('тахта', 'угловая'), 0),
+    (('уголок',), 1),
+    (('скамья',), 1),
+    (('оттоманка',), 0),
+]
+
+WORD_RE = re.compile(r'\S+')
+BRAND_WORD_RE = re.compile(r'[A-Za-zА-Яа-я]+')
+MODEL_RE = re.compile(r'[A-Za-zА-Яа-я0-9\s\-]+')
+
+
+class PrefixTrie:
+    """
+    Префиксное дерево по словам (без учёта регистра)
+    """
+
+    def __init__(self, entries=()):
+        self.root = {}
+        for words, value in entries:
+            self.insert(words, value)
+
+    def insert(self, words, value):
+        node = self.root
+        for word in words:
+            node = node.setdefault(word.lower(), {})
+        node[None] = value
+
+    def prefixes(self, words, start=0):
+        """
+        Все совпадения с начала words[start:]: [(число слов, значение), ...],
+        от коротких к длинным
+        """
+        found = []
+        node = self.root
+        for length, word in enumerate(words[start:], 1):
+            node = node.get(word.lower())
+            if node is None:
+                break
+            if None in node:
+                found.append((length, node[None]))
+        return found
+
+
+def multiword_brands(brands):
+    """
+    Бренды из нескольких слов — только они попадают в дерево брендов
+    """
+    return sorted(brand for brand in brands if len(brand.split()) > 1)
+
+
+class NameParser:
+    """
+    Разбор названия: тип мебели → бренд → модель, с кэшем по названию до скобки
+    """
+
+    def __init__(self, brands, furniture_types=FURNITURE_TYPES):
+        self.furniture = PrefixTrie(furniture_types)
+        self.brands = PrefixTrie((brand.split(), brand) for brand in multiword_brands(brands))
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, name):
+        key = str(name).split('(', 1)[0]
+        result = self.cache.get(key)
+        if result is None:
+            self.misses += 1
+            result = self.cache[key] = self._parse(key)
+        else:
+            self.hits += 1
+        return result
+
+    def _parse(self, text):
+        spans = [match.span() for match in WORD_RE.finditer(text)]
+        words = [text[start:end] for start, end in spans]
+
+        # Тип мебели: самое длинное совпадение, после которого остаются слова
+        first = 0
+        for length, skip in reversed(self.furniture.prefixes(words)):
+            if length + skip < len(words):
+                first = length + skip
+                break
+        if first >= len(words):
+            return '', ''
+
+        # Многословный бренд из BRAND_ALIASES
+        brand_matches = self.brands.prefixes(words, first)
+        if brand_matches:
+            length, brand = brand_matches[-1]
+            rest = text[spans[first + length - 1][1]:] if first + length < len(words) else ''
+            return brand, rest.strip()
+
+        # Односложный бренд — первое слово, модель — остальное до скобки
+        if first + 1 >= len(words):
+            return '', ''
+        brand = words[first]
+        model = text[spans[first + 1][0]:].strip()
+        if not BRAND_WORD_RE.fullmatch(brand) or not MODEL_RE.fullmatch(model):
+            return '', ''
+        return brand, model
+
+    def report(self):
+        return {'parsed': self.hits + self.misses, 'unique': self.misses, 'cacheHits': self.hits}
+
+    def print_summary(self):
+        report = self.report()
+        print(f"\n🏷️  Разбор названий: {report['parsed']}, уникальных до скобки: {report['unique']}, "
+              f"из кэша: {report['cacheHits']}")
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Фонетический ключ для русских и транслитерированных латинских слов
+
+Вместо перечисления всех написаний ("велуна/велюна/вилуна × модель")
+каждому алиасу сопоставляется ключ звучания: похожие по звучанию варианты
+дают один и тот же ключ, и запрос сопоставляется одним поиском в словаре.
+
+Ключ строится так (в духе Soundex/Metaphone):
+1. нижний регистр, латиница → кириллица (длинные сочетания первыми);
+2. многобуквенные правила из PHONETIC_RULES сводятся к одной букве
+   (тс → ц, дж → ж, ...);
+3. ь/ъ/й отбрасываются (й между гласными почти не слышна: майами/маями),
+   однобуквенные пары из PHONETIC_RULES (е/э, и/ы, о/а, ...)
+   объединяются в классы, согласные оглушаются (б/п, в/ф, г/к/х, д/т, з/с/ц,
+   ж/ш/щ/ч), я → а, ю → у;
+4. повторы подряд схлопываются (нн → н, лл → л).
+
+Ключ зависит от набора правил, поэтому правила записываются в файл ключей
+и читатель восстанавливает ту же функцию через make_phonetic_key(rules).
+"""
+
+import json
+import os
+
+from catalogWriter import atomic_write
+
+KEYS_FORMAT = 1
+
+# Латиница → кириллица (как в transliterate() из src/utils/divanSearch.js)
+LATIN_TO_CYRILLIC = {
+    'shch': 'щ', 'sch': 'щ',
+    'yo': 'ё', 'zh': 'ж', 'ch': 'ч', 'sh': 'ш', 'kh': 'х',
+    'yu': 'ю', 'ya': 'я', 'ts': 'ц', 'ck': 'к', 'ph': 'ф',
+    'a': 'а', 'b': 'б', 'v': 'в', 'g': 'г', 'd': 'д', 'e': 'е',
+    'z': 'з', 'i': 'и', 'y': 'й', 'k': 'к', 'l': 'л', 'm': 'м',
+    'n': 'н', 'o': 'о', 'p': 'п', 'r': 'р', 's': 'с', 't': 'т',
+    'u': 'у', 'f': 'ф', 'h': 'х', 'w': 'в', 'x': 'кс', 'j': 'дж',
+    'c': 'к', 'q': 'к',
+}
+_LATIN_LONGEST = max(len(key) for key in LATIN_TO_CYRILLIC)
+
+# Классы звучания, которых нет в PHONETIC_RULES
+EXTRA_CLASSES = [
+    'бп', 'вф', 'гкх', 'дт', 'зсц', 'жшщч',
+    'ая', 'ую',
+]
+
+SILENT = set('ьъй')
+
+
+def latin_to_cyrillic(text):
+    result = []
+    i = 0
+    while i < len(text):
+        for size in range(min(_LATIN_LONGEST, len(text) - i), 0, -1):
+            chunk = text[i:i + size]
+            if chunk in LATIN_TO_CYRILLIC:
+                result.append(LATIN_TO_CYRILLIC[chunk])
+                i += size
+                break
+        else:
+            result.append(text[i])
+            i += 1
+    return ''.join(result)
+
+
+def _build_classes(rules):
+    """
+    Классы букв: объединение однобуквенных пар правил и EXTRA_CLASSES
+    """
+    parent = {}
+
+    def find(char):
+        parent.setdefault(char, char)
+        while parent[char] != char:
+            parent[char] = parent[parent[char]]
+            char = parent[char]
+        return char
+
+    def union(a, b):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    for old, new in rules:
+        if len(old) == 1 and len(new) == 1:
+            union(old, new)
+    for group in EXTRA_CLASSES:
+        for char in group[1:]:
+            union(group[0], char)
+
+    return {char: find(char) for char in parent}
+
+
+def _build_digraphs(rules):
+    """
+    Многобуквенные правила, сводимые к одной букве (тс → ц, дж → ж, ...).
+    Удвоения (нн → н) не нужны — повторы схлопываются отдельно
+    """
+    digraphs = {}
+    for old, new in rules:
+        for long, short in ((old, new), (new, old)):
+            if len(long) > 1 and len(short) == 1 and long != short * len(long):
+                digraphs[long] = short
+    return sorted(digraphs.items(), key=lambda item: -len(item[0]))
+
+
+def make_phonetic_key(rules):
+    """
+    Функция ключа для заданного набора фонетических правил (с кэшем)
+    """
+    classes = _build_classes(rules)
+    digraphs = _build_digraphs(rules)
+    cache = {}
+
+    def word_key(word):
+        cached = cache.get(word)
+        if cached is not None:
+            return cached
+
+        text = latin_to_cyrillic(word.lower().replace('ё', 'е'))
+        for long, short in digraphs:
+            text = text.replace(long, short)
+
+        key = []
+        for char in text:
+            if char in SILENT or not char.isalnum():
+                continue
+            code = classes.get(char, char)
+            if not key or key[-1] != code:
+                key.append(code)
+
+        result = ''.join(key)
+        cache[word] = result
+        return result
+
+    def phrase_key(text):
+        keys = (word_key(word) for word in str(text).split())
+        return ' '.join(key for key in keys if key)
+
+    return phrase_key
+
+
+def keys_for(aliases, key_fn):
+    """
+    Уникальные ключи набора алиасов (отсортированы)
+    """
+    return sorted({key for key in (key_fn(alias) for alias in aliases) if key})
+
+
+def keys_path_for(json_path):
+    """
+    Путь каталога с ключами рядом с исходным: divans.json → divans.keys.json
+    """
+    root, ext = os.path.splitext(json_path)
+    return f"{root}.keys{ext}"
+
+
+def write_key_catalog(records, collection_key, rules, key_path, brand_aliases, model_aliases, drop_fields=()):
+    """
+    Пишет каталог, где списки алиасов заменены ключами brandKeys/modelKeys
+
+    brand_aliases / model_aliases — функции запись → список алиасов
+    drop_fields — поля с перечисленными алиасами, которые не нужны в выводе
+    """
+    key_fn = make_phonetic_key(rules)
+    alias_count = 0
+    key_count = 0
+    compact = []
+
+    for record in records:
+        brand = brand_aliases(record)
+        model = model_aliases(record)
+        item = {field: value for field, value in record.items() if field not in drop_fields}
+        item['brandKeys'] = keys_for(brand, key_fn)
+        item['modelKeys'] = keys_for(model, key_fn)
+        alias_count += len(brand) + len(model)
+        key_count += len(item['brandKeys']) + len(item['modelKeys'])
+        compact.append(item)
+
+    with atomic_write(key_path) as f:
+        json.dump({
+            'format': KEYS_FORMAT,
+            'keyRules': [list(rule) for rule in rules],
+            collection_key: compact,
+        }, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"🔑 Фонетические ключи: {alias_count} алиасов → {key_count} ключей, "
+          f"{os.path.getsize(key_path)} байт → {key_path}")
+    return compact
+
+
+class KeyMatcher:
+    """
+    Эталонный поиск по каталогу с ключами: ключи n-грамм запроса ищутся
+    в словарях ключ → позиции, по одному обращению на n-грамму
+    """
+
+    def __init__(self, catalog, collection_key):
+        self.key_fn = make_phonetic_key([tuple(rule) for rule in catalog['keyRules']])
+        self.records = catalog[collection_key]
+        self.brand = {}
+        self.model = {}
+        self.max_words = 1
+
+        for position, record in enumerate(self.records):
+            for table, field in ((self.brand, 'brandKeys'), (self.model, 'modelKeys')):
+                for key in record[field]:
+                    table.setdefault(key, set()).add(position)
+                    self.max_words = max(self.max_words, len(key.split()))
+
+    @classmethod
+    def load(cls, key_path, collection_key):
+        with open(key_path, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        if catalog.get('format') != KEYS_FORMAT:
+            raise ValueError(f"Неподдерживаемый формат ключей: {catalog.get('format')}")
+        return cls(catalog, collection_key)
+
+    def match(self, query):
+        """
+        Записи, у которых совпали ключ бренда и модели (или хотя бы модели)
+        """
+        words = self.key_fn(query).split()
+        brand_hits = set()
+        model_hits = set()
+
+        for size in range(1, min(self.max_words, len(words)) + 1):
+            for start in range(len(words) - size + 1):
+                ngram = ' '.join(words[start:start + size])
+                brand_hits.update(self.brand.get(ngram, ()))
+                model_hits.update(self.model.get(ngram, ()))
+
+        positions = (brand_hits & model_hits) or model_hits
+        return [self.records[position] for position in sorted(positions)]
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Движок фонетических вариантов слова
+
+Считает замыкание набора правил замен (old → new) до заданной глубины:
+глубина 1 — одно применение правила, глубина 2 — комбинации двух правил
+(например, о→а и е→э в одном слове) и т.д. Число вариантов на слово
+ограничивается, результаты запоминаются по токену, так что одинаковые
+слова разных товаров считаются один раз.
+
+Настройки по умолчанию (глубина 1, правило применяется ко всем вхождениям
+сразу, без ограничения) повторяют прежнее поведение str.replace.
+"""
+
+from collections import Counter
+
+
+class PhoneticEngine:
+    """
+    Замыкание фонетических правил с ограничением глубины и числа вариантов
+
+    max_depth    — сколько правил можно применить к одному слову
+    max_variants — предел числа вариантов на слово (включая само слово),
+                   None — без ограничения
+    positional   — применять правило к каждому вхождению по отдельности
+                   (иначе — ко всем вхождениям сразу, как str.replace)
+    """
+
+    def __init__(self, rules, max_depth=1, max_variants=None, positional=False):
+        self.rules = list(rules)
+        self.configure(max_depth, max_variants, positional)
+
+    def configure(self, max_depth=1, max_variants=None, positional=False):
+        if max_depth < 0:
+            raise ValueError("max_depth не может быть отрицательной")
+        if max_variants is not None and max_variants < 1:
+            raise ValueError("max_variants должен быть не меньше 1")
+
+        self.max_depth = max_depth
+        self.max_variants = max_variants
+        self.positional = positional
+        self.reset()
+
+    def reset(self):
+        """
+        Сбрасывает кэш и статистику
+        """
+        self._cache = {}
+        self.rule_contributions = Counter()
+        self.hits = 0
+        self.misses = 0
+        self.capped = 0
+
+    def settings(self):
+        return {
+            'rules': self.rules,
+            'maxDepth': self.max_depth,
+            'maxVariants': self.max_variants,
+            'positional': self.positional,
+        }
+
+    def _rewrites(self, word, old, new):
+        """
+        Результаты одного применения правила old → new к слову
+        """
+        if old not in word:
+            return
+        if not self.positional:
+            yield word.replace(old, new)
+            return
+        start = word.find(old)
+        while start != -1:
+            yield word[:start] + new + word[start + len(old):]
+            start = word.find(old, start + 1)
+
+    def _closure(self, word):
+        variants = {word}
+        frontier = [word]
+
+        for _ in range(self.max_depth):
+            next_frontier = []
+            for current in frontier:
+                for rule in self.rules:
+                    for variant in self._rewrites(current, *rule):
+                        if variant in variants:
+                            continue
+                        if self.max_variants is not None and len(variants) >= self.max_variants:
+                            self.capped += 1
+                            return variants
+                        variants.add(variant)
+                        next_frontier.append(variant)
+                        self.rule_contributions[rule] += 1
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        return variants
+
+    def variants(self, word):
+        """
+        Множество вариантов слова (само слово всегда входит)
+        """
+        cached = self._cache.get(word)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        result = frozenset(self._closure(word))
+        self._cache[word] = result
+        return result
+
+    def report(self):
+        """
+        Сводка: вклад каждого правила, попадания в кэш, упоры в предел
+        """
+        return {
+            'settings': {
+                'maxDepth': self.max_depth,
+                'maxVariants': self.max_variants,
+                'positional': self.positional,
+            },
+            'uniqueTokens': self.misses,
+            'cacheHits': self.hits,
+            'cappedTokens': self.capped,
+            'ruleContributions': [
+                {'rule': f"{old}→{new}", 'variants': self.rule_contributions[(old, new)]}
+                for old, new in self.rules
+            ],
+        }
+
+    def print_report(self, top=10):
+        report = self.report()
+        print(f"\n🔤 Фонетические варианты (глубина {self.max_depth}, "
+              f"предел {self.max_variants or '—'}):")
+        print(f"   Уникальных токенов: {report['uniqueTokens']}, из кэша: {report['cacheHits']}")
+        if self.capped:
+            print(f"   Упёрлись в предел: {self.capped}")
+        contributions = sorted(report['ruleContributions'], key=lambda item: -item['variants'])
+        for item in contributions[:top]:
+            if item['variants']:
+                print(f"   {item['rule']}: +{item['variants']}")
+
+
+def add_phonetic_arguments(parser):
+    """
+    Общие флаги командной строки для updateDivans.py и updateMatrasy.py
+    """
+    parser.add_argument('--phonetic-depth', type=int, default=1,
+                        help='глубина замыкания фонетических правил (по умолчанию 1)')
+    parser.add_argument('--phonetic-cap', type=int, default=None,
+                        help='максимум фонетических вариантов на слово')
+    parser.add_argument('--phonetic-positional', action='store_true',
+                        help='применять правило к каждому вхождению отдельно')
+
+
+def configure_from_args(engine, args):
+    engine.configure(args.phonetic_depth, args.phonetic_cap, args.phonetic_positional)
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Офлайн-прогон запросов через эталон поиска рантайма
+
+До деплоя не видно, стал ли поиск после правки генерации алиасов лучше
+или хуже. Скрипт прогоняет корпус фраз (записанных или синтетических)
+через точную копию пути поиска из src/utils/divanSearch.js и
+src/utils/matrasSearch.js — поиск по коду и произнесённым цифрам, удаление
+служебных слов, фонетические замены, транслитерация, проверка алиасов
+бренда и модели — по свежесобранным divans.json/matrasy.json и считает:
+
+- попадания — найден ожидаемый товар (или, для фраз без товара, ничего);
+- не тот товар — найден товар, которого фраза не называет;
+- промахи — ничего не найдено, хотя товар назван;
+- задержку поиска (p50/p99) — проход по каталогу линейный, так что она
+  растёт вместе с числом алиасов.
+
+Эталон повторяет и особенности JS: \\b в регулярных выражениях без флага u
+знает только латиницу, поэтому кириллические служебные слова («диван»,
+«расскажи») в рантайме из запроса не удаляются.
+
+Корпус — JSON Lines:
+{"query": "расскажи про диван велуна майами", "collection": "divans", "expected": ["10077273"]}
+expected — код/id товара, список допустимых или null (фраза не о товаре).
+Без --corpus корпус генерируется из первой сборки детерминированно (--seed):
+бренд с моделью, модель отдельно, транслитерация латиницы, искажения
+распознавания речи, код цифрами и словами, посторонние фразы.
+
+С --compare те же фразы прогоняются по второй сборке, печатаются метрики
+бок о бок и фразы, у которых поменялся результат.
+"""
+
+import json
+import os
+import random
+import re
+import statistics
+import time
+
+from articleAutomaton import article_digits
+
+# --- Эталон src/utils/divanSearch.js ---
+
+TRANSLIT_SPECIAL = {
+    'yuki': 'юкки', 'yukki': 'юкки', 'gizela': 'гизела', 'chianti': 'кьянти',
+    'kyanti': 'кьянти', 'vito': 'вито', 'bilbao': 'бильбао', 'pekin': 'пекин',
+    'beijing': 'пекин', 'aisti': 'айсти', 'isti': 'исти', 'miami': 'майами',
+    'aspen': 'аспен', 'leyton': 'лейтон', 'evas': 'эвас', 'sonni': 'сонни',
+    'eloy': 'элой', 'kubo': 'кубо', 'montreal': 'монреаль', 'douglas': 'дуглас',
+    'emma': 'эмма', 'dijon': 'дижон', 'orleans': 'орлеан', 'parma': 'парма',
+    'discovery': 'дискавери', 'porto': 'порто', 'somerset': 'сомерсет',
+    'rimini': 'римини', 'valencia': 'валенсия',
+}
+
+TRANSLIT_GENERAL = {
+    'shch': 'щ', 'yo': 'ё', 'zh': 'ж', 'ch': 'ч', 'sh': 'ш',
+    'yu': 'ю', 'ya': 'я', 'ts': 'ц',
+    'a': 'а', 'b': 'б', 'v': 'в', 'g': 'г', 'd': 'д', 'e': 'е',
+    'z': 'з', 'i': 'и', 'y': 'й', 'k': 'к', 'l': 'л', 'm': 'м',
+    'n': 'н', 'o': 'о', 'p': 'п', 'r': 'р', 's': 'с', 't': 'т',
+    'u': 'у', 'f': 'ф', 'h': 'х', 'w': 'в', 'x': 'кс', 'j': 'дж',
+}
+
+SPOKEN_DIGITS = {
+    'ноль': '0', 'нуль': '0',
+    'один': '1', 'раз': '1', 'адин': '1',
+    'два': '2', 'двойка': '2',
+    'три': '3', 'тройка': '3',
+    'четыре': '4', 'четверка': '4', 'читыре': '4',
+    'пять': '5', 'пятерка': '5', 'пьять': '5',
+    'шесть': '6', 'шестерка': '6', 'шэсть': '6',
+    'семь': '7', 'семерка': '7', 'сем': '7',
+    'восемь': '8', 'восьмерка': '8', 'восем': '8',
+    'девять': '9', 'девятка': '9', 'дивять': '9',
+}
+
+DIVAN_STOP_WORDS = ['диван', 'кресло', 'расскажи', 'про', 'о', 'об', 'мне', 'пожалуйста', 'хочу',
+                    'узнать', 'спасибо', 'также', 'хорошо', 'еще', 'ещё']
+
+DIVAN_FIXES = [
+    ('порта', 'порто'), ('парта', 'порто'), ('милано', 'милан'), ('джижон', 'дижон'),
+    ('porta', 'porto'), ('parta', 'porto'), ('milano', 'milan'),
+]
+
+# --- Эталон src/utils/matrasSearch.js ---
+
+MATRAS_STOP_WORDS = ['алиса', 'расскажи', 'про', 'матрас', 'пожалуйста', 'также', 'хорошо',
+                     'спасибо', 'ещё', 'еще']
+
+MATRAS_FIXES = [
+    ('lagoona', 'veluna'), ('laguna', 'veluna'), ('лагуна', 'велуна'),
+    ('паллата', 'палато'), ('паллато', 'палато'), ('palatta', 'palato'),
+    ('palate', 'palato'), ('pallate', 'palato'), ('палате', 'палато'),
+]
+
+VELUNA_BRANDS = ['велуна', 'велюна', 'veluna', 'илуна', 'iluna', 'вилуна', 'виллуна', 'велуно',
+                 'илуно', 'вилуно', 'виллуно']
+LAGOMA_BRANDS = ['лагома', 'lagoma', 'лагона', 'lagona', 'лагоома', 'лагоума', 'лагомма', 'логома']
+
+# \b без флага u в JS — граница только латинских букв, цифр и _
+_STOP_WORD_RES = {
+    word: re.compile(rf'\b{re.escape(word)}\b', re.IGNORECASE | re.ASCII)
+    for word in DIVAN_STOP_WORDS + MATRAS_STOP_WORDS
+}
+_DIGITS_RE = re.compile(r'\d{5,}')
+_NON_DIGIT_RE = re.compile(r'\D')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def strip_stop_words(text, stop_words):
+    for word in stop_words:
+        text = _STOP_WORD_RES[word].sub(' ', text)
+    return _SPACES_RE.sub(' ', text).strip()
+
+
+def transliterate(text):
+    """
+    transliterate() из divanSearch.js: сначала специальные случаи,
+    затем общая таблица (длинные сочетания первыми)
+    """
+    result = text.lower()
+    for lat, cyr in TRANSLIT_SPECIAL.items():
+        result = result.replace(lat, cyr)
+    for lat, cyr in sorted(TRANSLIT_GENERAL.items(), key=lambda item: -len(item[0])):
+        result = result.replace(lat, cyr)
+    return result
+
+
+def spoken_digits_to_numbers(text):
+    return ''.join(SPOKEN_DIGITS.get(word, '') for word in _SPACES_RE.split(text.lower()))
+
+
+def _kod_digits(divan):
+    return _NON_DIGIT_RE.sub('', str(divan['kod']))
+
+
+def find_divan_by_kod(divans, kod):
+    clean_kod = _NON_DIGIT_RE.sub('', str(kod))
+    if clean_kod:
+        for divan in divans:
+            if _kod_digits(divan) == clean_kod:
+                return divan
+
+    spoken_number = spoken_digits_to_numbers(str(kod))
+    if len(spoken_number) >= 4:
+        for divan in divans:
+            divan_kod = _kod_digits(divan)
+            if divan_kod.startswith(spoken_number) or divan_kod == spoken_number:
+                return divan
+    return None
+
+
+def find_divan_by_brand_model(divans, query):
+    lower_query = strip_stop_words(query.lower().strip(), DIVAN_STOP_WORDS)
+    for wrong, right in DIVAN_FIXES:
+        lower_query = lower_query.replace(wrong, right)
+    translit_query = transliterate(lower_query)
+
+    # Точное совпадение по полному названию
+    for divan in divans:
+        divan_name = divan['name'].lower()
+        if (lower_query in divan_name or translit_query in divan_name) and len(lower_query) > 5:
+            return divan
+
+    # Алиасы бренда и модели
+    for divan in divans:
+        brand_match = any(
+            alias.lower() in lower_query or alias.lower() in translit_query
+            for alias in divan.get('brandAliases') or []
+        )
+        if not brand_match and divan.get('brand'):
+            divan_brand = divan['brand'].lower()
+            brand_match = divan_brand in lower_query or divan_brand in translit_query
+
+        if brand_match:
+            model_match = any(
+                alias.lower() in lower_query or alias.lower() in translit_query
+                or lower_query in alias.lower() or translit_query in alias.lower()
+                for alias in divan.get('modelAliases') or []
+            )
+            if not model_match and divan.get('model'):
+                divan_model = divan['model'].lower()
+                model_first_word = _SPACES_RE.split(divan_model)[0]
+                model_match = (model_first_word in lower_query or model_first_word in translit_query
+                               or divan_model in lower_query or divan_model in translit_query)
+            if model_match:
+                return divan
+
+    # Только по модели, без бренда
+    for divan in divans:
+        for alias in divan.get('modelAliases') or []:
+            alias_lower = alias.lower()
+            if (alias_lower == lower_query or alias_lower == translit_query
+                    or (len(lower_query) > 3 and (lower_query in alias_lower or alias_lower in lower_query))
+                    or (len(translit_query) > 3
+                        and (translit_query in alias_lower or alias_lower in translit_query))):
+                return divan
+
+        if divan.get('model'):
+            model_first_word = _SPACES_RE.split(divan['model'].lower())[0]
+            if len(model_first_word) > 3 and (model_first_word in lower_query
+                                              or model_first_word in translit_query):
+                return divan
+    return None
+
+
+def find_divan(divans, query):
+    """
+    generateDivanResponse(): код цифрами → произнесённые цифры → бренд и модель
+    """
+    kod_match = _DIGITS_RE.search(query)
+    if kod_match:
+        divan = find_divan_by_kod(divans, kod_match.group())
+        if divan:
+            return divan
+
+    spoken_number = spoken_digits_to_numbers(query)
+    if len(spoken_number) >= 4:
+        divan = find_divan_by_kod(divans, spoken_number)
+        if divan:
+            return divan
+
+    return find_divan_by_brand_model(divans, query)
+
+
+def find_matras(matrasy, query):
+    """
+    findMatrasByName(): запись матраса, 'multiple_veluna'/'multiple_lagoma' или None
+    """
+    cleaned = strip_stop_words(query.lower().strip(), MATRAS_STOP_WORDS)
+    for wrong, right in MATRAS_FIXES:
+        cleaned = cleaned.replace(wrong, right)
+
+    # Этап 1: алиас целиком или отдельным словом
+    for matras in matrasy:
+        for alias in matras['aliases']:
+            alias_lower = alias.lower()
+            if cleaned == alias_lower:
+                return matras
+            if (f" {alias_lower} " in cleaned or cleaned.startswith(f"{alias_lower} ")
+                    or cleaned.endswith(f" {alias_lower}")):
+                return matras
+
+    # Этап 2: вхождение алиаса
+    for matras in matrasy:
+        for alias in matras['aliases']:
+            if alias.lower() in cleaned:
+                return matras
+
+    # Этап 3: только бренд
+    has_veluna = any(brand in cleaned for brand in VELUNA_BRANDS)
+    has_lagoma = any(brand in cleaned for brand in LAGOMA_BRANDS)
+    if has_veluna and not has_lagoma:
+        return 'multiple_veluna'
+    if has_lagoma and not has_veluna:
+        return 'multiple_lagoma'
+    return None
+
+
+def result_id(collection, found):
+    if found is None or isinstance(found, str):
+        return found
+    return found['kod'] if collection == 'divans' else found['id']
+
+
+# --- Корпус ---
+
+DIGIT_WORDS = ['ноль', 'один', 'два', 'три', 'четыре', 'пять', 'шесть', 'семь', 'восемь', 'девять']
+
+# Типичные искажения распознавания речи (одна замена на фразу)
+ASR_NOISE = [('о', 'а'), ('е', 'и'), ('е', 'э'), ('и', 'ы'), ('а', 'о'), ('т', 'д'),
+             ('с', 'з'), ('ль', 'л'), ('л', 'ль'), ('нн', 'н'), ('ю', 'у')]
+
+NEGATIVE_QUERIES = {
+    'divans': ['расскажи про шкаф', 'какая сегодня погода', 'диван кровать бергамо',
+               'кресло качалка', 'есть ли скидки на кухни'],
+    'matrasy': ['расскажи про подушку', 'матрас для младенца', 'какая сегодня погода',
+                'одеяло зимнее', 'матрас аскона'],
+}
+
+
+def load_build(data_dir):
+    """
+    Каталоги одной сборки: data_dir/divans.json и data_dir/matrasy.json
+    """
+    build = {'path': data_dir}
+    for collection in ('divans', 'matrasy'):
+        path = os.path.join(data_dir, f"{collection}.json")
+        with open(path, 'r', encoding='utf-8') as f:
+            build[collection] = json.load(f)[collection]
+        build[f"{collection}Bytes"] = os.path.getsize(path)
+    return build
+
+
+def _noisy(rng, text):
+    candidates = [(old, new) for old, new in ASR_NOISE if old in text]
+    if not candidates:
+        return None
+    old, new = rng.choice(candidates)
+    starts = [match.start() for match in re.finditer(re.escape(old), text)]
+    start = rng.choice(starts)
+    return text[:start] + new + text[start + len(old):]
+
+
+def synthetic_corpus(build, seed=42):
+    """
+    Синтетические фразы с ожидаемыми товарами по каталогам сборки
+    """
+    rng = random.Random(seed)
+    corpus = []
+
+    def add(query, collection, expected):
+        corpus.append({'query': query, 'collection': collection, 'expected': expected})
+
+    # Диваны: все расцветки одной модели — допустимые ответы
+    by_model = {}
+    by_brand_model = {}
+    for divan in build['divans']:
+        brand = divan['brand'].lower().strip()
+        model = divan['model'].lower().strip()
+        if brand and model:
+            by_brand_model.setdefault((brand, model), []).append(divan['kod'])
+            by_model.setdefault(model, []).append(divan['kod'])
+
+    for (brand, model), kods in by_brand_model.items():
+        add(f"{brand} {model}", 'divans', kods)
+        add(f"расскажи про диван {brand} {model}", 'divans', kods)
+        add(model, 'divans', by_model[model])
+        spoken = transliterate(f"{brand} {model}")
+        if spoken != f"{brand} {model}":
+            add(spoken, 'divans', kods)
+        noisy = _noisy(rng, spoken)
+        if noisy:
+            add(f"диван {noisy}", 'divans', kods)
+
+        kod = rng.choice(kods)
+        digits = article_digits(kod)
+        add(f"код {digits}", 'divans', [kod])
+        add(' '.join(DIGIT_WORDS[int(digit)] for digit in digits), 'divans', [kod])
+
+    # Матрасы
+    for matras in build['matrasy']:
+        brand = matras['brand'].lower().strip()
+        model = matras['model'].lower().strip()
+        add(f"матрас {brand} {model}", 'matrasy', [matras['id']])
+        add(f"расскажи про {model}", 'matrasy', [matras['id']])
+        spoken = transliterate(f"{brand} {model}")
+        add(spoken, 'matrasy', [matras['id']])
+        noisy = _noisy(rng, spoken)
+        if noisy:
+            add(f"матрас {noisy}", 'matrasy', [matras['id']])
+
+    for brand in sorted({matras['brand'].lower().strip() for matras in build['matrasy']}):
+        add(f"матрас {transliterate(brand)}", 'matrasy', [f"multiple_{brand}"])
+
+    for collection, queries in NEGATIVE_QUERIES.items():
+        for query in queries:
+            add(query, collection, None)
+    return corpus
+
+
+def load_corpus(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_corpus(corpus, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for item in corpus:
+            f.write(json.dumps(item, ensure_ascii=False) + '\n')
+
+
+# --- Прогон ---
+
+def _expected_set(expected):
+    if expected is None:
+        return None
+    return {str(item) for item in expected} if isinstance(expected, list) else {str(expected)}
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def replay(build, corpus, repeat=1):
+    """
+    Прогоняет корпус по сборке. Возвращает метрики и исход каждой фразы
+    """
+    finders = {'divans': find_divan, 'matrasy': find_matras}
+    outcomes = []
+    latencies = []
+    counts = {'hit': 0, 'wrong': 0, 'miss': 0}
+
+    for item in corpus:
+        collection = item['collection']
+        records = build[collection]
+        find = finders[collection]
+
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            found = find(records, item['query'])
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        latencies.append(best * 1000)
+
+        got = result_id(collection, found)
+        expected = _expected_set(item.get('expected'))
+        if got is None:
+            status = 'hit' if expected is None else 'miss'
+        else:
+            status = 'hit' if expected is not None and str(got) in expected else 'wrong'
+        counts[status] += 1
+        outcomes.append({'query': item['query'], 'collection': collection, 'got': got, 'status': status})
+
+    total = len(corpus) or 1
+    ordered = sorted(latencies)
+    return {
+        'build': build['path'],
+        'queries': len(corpus),
+        'hits': counts['hit'],
+        'wrong': counts['wrong'],
+        'misses': counts['miss'],
+        'hitRate': round(counts['hit'] / total, 4),
+        'wrongRate': round(counts['wrong'] / total, 4),
+        'missRate': round(counts['miss'] / total, 4),
+        'latencyMs': {
+            'p50': round(_percentile(ordered, 0.5), 4),
+            'p99': round(_percentile(ordered, 0.99), 4),
+            'mean': round(statistics.fmean(ordered), 4) if ordered else 0.0,
+        },
+        'aliases': {
+            'divans': sum(len(divan.get('brandAliases') or []) + len(divan.get('modelAliases') or [])
+                          for divan in build['divans']),
+            'matrasy': sum(len(matras['aliases']) for matras in build['matrasy']),
+        },
+        'bytes': {'divans': build['divansBytes'], 'matrasy': build['matrasyBytes']},
+        'outcomes': outcomes,
+    }
+
+
+def print_report(report, limit=10):
+    print(f"📦 Сборка: {report['build']}")
+    print(f"   Фраз: {report['queries']}")
+    print(f"   🎯 Попаданий: {report['hits']} ({report['hitRate']:.1%})")
+    print(f"   ❌ Не тот товар: {report['wrong']} ({report['wrongRate']:.1%})")
+    print(f"   🕳️  Промахов: {report['misses']} ({report['missRate']:.1%})")
+    print(f"   ⏱️  Задержка: p50 {report['latencyMs']['p50']:.3f} мс, p99 {report['latencyMs']['p99']:.3f} мс")
+    print(f"   Алиасов: диваны {report['aliases']['divans']}, матрасы {report['aliases']['matrasy']}")
+    failed = [item for item in report['outcomes'] if item['status'] != 'hit']
+    for item in failed[:limit]:
+        print(f"      {item['status']}: '{item['query']}' → {item['got']}")
+
+
+def print_comparison(before, after, limit=20):
+    rows = [
+        ('Попадания', f"{before['hitRate']:.1%}", f"{after['hitRate']:.1%}"),
+        ('Не тот товар', f"{before['wrongRate']:.1%}", f"{after['wrongRate']:.1%}"),
+        ('Промахи', f"{before['missRate']:.1%}", f"{after['missRate']:.1%}"),
+        ('p50, мс', f"{before['latencyMs']['p50']:.3f}", f"{after['latencyMs']['p50']:.3f}"),
+        ('p99, мс', f"{before['latencyMs']['p99']:.3f}", f"{after['latencyMs']['p99']:.3f}"),
+        ('Алиасы диванов', before['aliases']['divans'], after['aliases']['divans']),
+        ('Алиасы матрасов', before['aliases']['matrasy'], after['aliases']['matrasy']),
+        ('divans.json, байт', before['bytes']['divans'], after['bytes']['divans']),
+        ('matrasy.json, байт', before['bytes']['matrasy'], after['bytes']['matrasy']),
+    ]
+    print(f"\n{'':<20} {'A':>14} {'B':>14}")
+    for name, a, b in rows:
+        print(f"{name:<20} {str(a):>14} {str(b):>14}")
+
+    changed = [
+        (old, new) for old, new in zip(before['outcomes'], after['outcomes'])
+        if old['got'] != new['got'] or old['status'] != new['status']
+    ]
+    print(f"\n🔀 Поменялся результат: {len(changed)}")
+    for old, new in changed[:limit]:
+        print(f"   '{old['query']}': {old['status']} {old['got']} → {new['status']} {new['got']}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    default_data_dir = os.path.join(os.path.dirname(script_dir), 'src', 'data')
+
+    parser = argparse.ArgumentParser(description='Прогон запросов через эталон поиска рантайма')
+    parser.add_argument('--build', default=default_data_dir,
+                        help='папка сборки с divans.json и matrasy.json (по умолчанию src/data)')
+    parser.add_argument('--compare', default=None,
+                        help='вторая сборка для сравнения бок о бок')
+    parser.add_argument('--corpus', default=None,
+                        help='корпус фраз (JSON Lines); без него — синтетический')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='seed синтетического корпуса')
+    parser.add_argument('--write-corpus', default=None,
+                        help='сохранить использованный корпус (JSON Lines)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='повторов каждой фразы для замера задержки (берётся лучший)')
+    parser.add_argument('--report', default=None,
+                        help='записать метрики и исходы в JSON')
+    args = parser.parse_args()
+
+    print("🎙️  Прогон запросов\n")
+    build = load_build(args.build)
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(build, args.seed)
+    if args.write_corpus:
+        write_corpus(corpus, args.write_corpus)
+
+    reports = [replay(build, corpus, args.repeat)]
+    print_report(reports[0])
+    if args.compare:
+        print()
+        reports.append(replay(load_build(args.compare), corpus, args.repeat))
+        print_report(reports[1])
+        print_comparison(*reports)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(reports if args.compare else reports[0], f, ensure_ascii=False, indent=2)
+        print(f"\n📝 Отчёт: {args.report}")
+
+    print("\n✨ Готово!")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Готовые ответы Алисы, собранные при сборке каталога
+
+Описания длиннее лимита Алисы сейчас обрезаются на каждом запросе
+(substring(0, 1017) + '...'), часто посреди слова. Здесь текст ответа
+считается один раз при сборке:
+
+- text     — первый ответ (заголовок + начало описания), не длиннее лимита;
+- continue — продолжение описания кусками по предложениям, каждый ≤ лимита;
+- summary  — короткий вариант описания (первые предложения до SUMMARY_LIMIT).
+
+Предложения не разрезаются; слишком длинное предложение делится по словам.
+Если описание не влезло в один ответ, каждая часть, кроме последней,
+заканчивается подсказкой MORE_CUE; рантайм отдаёт следующую часть на
+«дальше» (интент continue_reading в src/handlers/mainHandler.js).
+"""
+
+import re
+
+# Лимит Алисы — 1024 символа, рантайм держит запас до 1000
+RESPONSE_LIMIT = 1000
+SUMMARY_LIMIT = 250
+# Меньше этого места под описание в первом ответе — описание целиком уходит в continue
+MIN_FIRST_LIMIT = 100
+ELLIPSIS = '…'
+MORE_CUE = '\n\nСкажите «дальше», чтобы услышать продолжение.'
+
+# Точка без пробела после HTML-очистки: "фанеры.Сиденье" → "фанеры. Сиденье"
+MISSING_SPACE_RE = re.compile(r'([.!?…])(?=[А-ЯЁA-Z])')
+SENTENCE_RE = re.compile(r'(?<=[.!?…])\s+(?=[«"(А-ЯЁA-Z0-9])')
+
+
+def split_sentences(text):
+    text = MISSING_SPACE_RE.sub(r'\1 ', ' '.join(str(text).split()))
+    return [sentence for sentence in SENTENCE_RE.split(text) if sentence]
+
+
+def _split_words(sentence, limit):
+    """
+    Делит слишком длинное предложение по словам на куски ≤ limit
+    """
+    limit = max(1, limit)
+    pieces = []
+    current = ''
+    for word in sentence.split():
+        candidate = f"{current} {word}" if current else word
+        if len(candidate) <= limit:
+            current = candidate
+            continue
+        if current:
+            pieces.append(current)
+        # Слово длиннее лимита режем как есть
+        while len(word) > limit:
+            pieces.append(word[:limit])
+            word = word[limit:]
+        current = word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(text, limit, first_limit=None):
+    """
+    Куски текста по предложениям: первый ≤ first_limit, остальные ≤ limit
+    """
+    chunks = []
+    current = ''
+
+    def budget():
+        return first_limit if (first_limit is not None and not chunks) else limit
+
+    for sentence in split_sentences(text):
+        candidate = f"{current} {sentence}" if current else sentence
+        if len(candidate) <= budget():
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+            current = ''
+        if len(sentence) <= budget():
+            current = sentence
+            continue
+        for piece in _split_words(sentence, budget()):
+            if current:
+                chunks.append(current)
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def summarize(text, limit=SUMMARY_LIMIT):
+    """
+    Короткий вариант: целые предложения с начала, пока влезают в limit.
+    Если не влезает даже первое — обрезка по слову с многоточием
+    """
+    summary = ''
+    for sentence in split_sentences(text):
+        candidate = f"{summary} {sentence}" if summary else sentence
+        if len(candidate) > limit:
+            break
+        summary = candidate
+    if not summary and text:
+        summary = _split_words(split_sentences(text)[0], limit - len(ELLIPSIS))[0] + ELLIPSIS
+    return summary
+
+
+def render_response(header, body, footer='', limit=RESPONSE_LIMIT):
+    """
+    Ответ из заголовка, тела и подвала: тело режется по предложениям так,
+    чтобы первый ответ (header + начало + footer) влез в лимит. Если
+    заголовок (очень длинное название) почти не оставляет места, первый
+    ответ — только заголовок и подвал, описание идёт в continue.
+    Если частей больше одной, все, кроме последней, заканчиваются MORE_CUE
+    (место под неё вычитается из лимита)
+    """
+    chunks = _chunk_body(header, body, footer, limit)
+    if len(chunks) > 1:
+        chunks = _chunk_body(header, body, footer, limit - len(MORE_CUE))
+    segments = [f"{header}{chunks[0]}{footer}"] + chunks[1:]
+    segments = [segment + MORE_CUE for segment in segments[:-1]] + segments[-1:]
+    return {
+        'text': segments[0],
+        'continue': segments[1:],
+        'summary': summarize(body),
+    }
+
+
+def _chunk_body(header, body, footer, limit):
+    first_limit = limit - len(header) - len(footer)
+    if first_limit < MIN_FIRST_LIMIT:
+        return [''] + chunk_text(body, limit)
+    return chunk_text(body, limit, first_limit=first_limit) or ['']
+
+
+def render_divan(divan, limit=RESPONSE_LIMIT):
+    """
+    Ответ о диване в формате formatDivanResponse из src/utils/divanSearch.js
+    """
+    header = f"🛋️ {divan['name']}\n\nКод товара: {divan['kod']}\n\n"
+    return render_response(header, divan['description'], limit=limit)
+
+
+def render_matras(matras, limit=RESPONSE_LIMIT):
+    """
+    Ответ о матрасе в формате generateMatrasResponse из src/utils/matrasSearch.js
+    """
+    specs = []
+    if matras.get('height'):
+        specs.append(f"Высота: {matras['height']}")
+    if matras.get('firmness'):
+        specs.append(f"Жесткость: {matras['firmness']}")
+    if matras.get('maxLoad'):
+        specs.append(f"Максимальная нагрузка: до {matras['maxLoad']}")
+    if matras.get('warranty'):
+        specs.append(f"Гарантия: {matras['warranty']}")
+
+    footer = '\n\n'
+    if specs:
+        footer += '\n'.join(specs) + '\n\n'
+    footer += "✅ Есть в наличии." if matras.get('inStock') else "⏳ Под заказ."
+
+    return render_response(f"🛏️ {matras['fullName']}\n\n", matras['description'], footer, limit)
+
+
+class RenderStats:
+    """
+    Сколько ответов пришлось разбить на части
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.chunked = 0
+        self.segments = 0
+
+    def track(self, response):
+        self.total += 1
+        if response['continue']:
+            self.chunked += 1
+            self.segments += len(response['continue'])
+        return response
+
+    def report(self):
+        return {'responses': self.total, 'chunked': self.chunked, 'continuations': self.segments}
+
+    def print_summary(self):
+        report = self.report()
+        print(f"\n💬 Готовые ответы: {report['responses']}, разбито на части: {report['chunked']} "
+              f"(продолжений: {report['continuations']})")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Словарь удалений (SymSpell) для поиска бренда и модели с опечатками
+
+Для каждого канонического токена (слова из brand/model в divans.json и
+matrasy.json) заранее строятся все варианты с удалением до max_distance букв.
+При поиске те же удаления строятся для слова запроса, кандидаты берутся
+из словаря и проверяются расстоянием Дамерау–Левенштейна. Незнакомые
+опечатки находятся без перебора каталога и без роста списков алиасов.
+
+Формат файла (компактный JSON):
+{
+  "format": 1,
+  "maxDistance": 2,
+  "prefixLength": 7,
+  "tokens": ["аспен", "lenvik", ...],
+  "entries": [[{"catalog": "divans", "field": "model", "ids": [...]}], ...],
+  "deletes": {"спен": [0], ...}
+}
+
+Номера в "deletes" — позиции в "tokens" (и в "entries").
+"""
+
+import json
+import os
+import random
+import re
+import time
+
+from catalogWriter import atomic_write
+from phoneticKey import latin_to_cyrillic
+
+SYMSPELL_FORMAT = 1
+DEFAULT_MAX_DISTANCE = 2
+DEFAULT_PREFIX_LENGTH = 7
+MIN_TOKEN_LENGTH = 3
+
+
+def canonical_tokens(catalog_path, collection_key, id_field):
+    """
+    Слова бренда и модели каждой записи: токен → поле → список id.
+    Латинские слова добавляются и в кириллической транслитерации —
+    Алиса распознаёт "Lenvik" как "ленвик"
+    """
+    with open(catalog_path, 'r', encoding='utf-8') as f:
+        records = json.load(f)[collection_key]
+
+    tokens = {}
+    for record in records:
+        for field in ('brand', 'model'):
+            for token in re.findall(r'\w+', str(record.get(field) or '').lower()):
+                if len(token) < MIN_TOKEN_LENGTH or token.isdigit():
+                    continue
+                forms = {token}
+                if token.isascii():
+                    forms.add(latin_to_cyrillic(token))
+                for form in forms:
+                    ids = tokens.setdefault(form, {}).setdefault(field, [])
+                    record_id = str(record[id_field])
+                    if record_id not in ids:
+                        ids.append(record_id)
+    return tokens
+
+
+def deletes(word, max_distance, prefix_length=DEFAULT_PREFIX_LENGTH):
+    """
+    Все варианты слова (по префиксу prefix_length) с удалением до max_distance букв
+    """
+    word = word[:prefix_length]
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for current in frontier:
+            if len(current) <= 1:
+                continue
+            for i in range(len(current)):
+                variant = current[:i] + current[i + 1:]
+                if variant not in result:
+                    result.add(variant)
+                    next_frontier.add(variant)
+        frontier = next_frontier
+    return result
+
+
+def edit_distance(a, b, limit):
+    """
+    Расстояние Дамерау–Левенштейна (optimal string alignment);
+    если оно больше limit, возвращает limit + 1
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+            row_min = min(row_min, current[j])
+        if row_min > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+def build_symspell(catalogs, max_distance=DEFAULT_MAX_DISTANCE, prefix_length=DEFAULT_PREFIX_LENGTH):
+    """
+    Строит словарь удалений
+
+    catalogs — список (путь, ключ коллекции, поле id)
+    """
+    merged = {}
+    for catalog_path, collection_key, id_field in catalogs:
+        for token, fields in canonical_tokens(catalog_path, collection_key, id_field).items():
+            for field, ids in fields.items():
+                merged.setdefault(token, []).append({
+                    'catalog': collection_key,
+                    'field': field,
+                    'ids': ids,
+                })
+
+    tokens = sorted(merged)
+    delete_map = {}
+    for position, token in enumerate(tokens):
+        for variant in deletes(token, max_distance, prefix_length):
+            delete_map.setdefault(variant, []).append(position)
+
+    return {
+        'format': SYMSPELL_FORMAT,
+        'maxDistance': max_distance,
+        'prefixLength': prefix_length,
+        'tokens': tokens,
+        'entries': [merged[token] for token in tokens],
+        'deletes': dict(sorted(delete_map.items())),
+    }
+
+
+def write_symspell(symspell, output_path):
+    with atomic_write(output_path) as f:
+        json.dump(symspell, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"🔡 Словарь опечаток: {len(symspell['tokens'])} токенов, "
+          f"{len(symspell['deletes'])} удалений, {os.path.getsize(output_path)} байт → {output_path}")
+
+
+def load_symspell(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        symspell = json.load(f)
+    if symspell.get('format') != SYMSPELL_FORMAT:
+        raise ValueError(f"Неподдерживаемый формат словаря: {symspell.get('format')}")
+    return symspell
+
+
+def lookup(symspell, word, max_distance=None):
+    """
+    Эталонный поиск: канонические токены на расстоянии ≤ max_distance,
+    отсортированные по расстоянию. Возвращает список (токен, расстояние, записи)
+    """
+    limit = symspell['maxDistance'] if max_distance is None else min(max_distance, symspell['maxDistance'])
+    word = word.lower()
+    tokens = symspell['tokens']
+
+    candidates = set()
+    for variant in deletes(word, limit, symspell['prefixLength']):
+        candidates.update(symspell['deletes'].get(variant, ()))
+
+    results = []
+    for position in candidates:
+        token = tokens[position]
+        distance = edit_distance(word, token, limit)
+        if distance <= limit:
+            results.append((distance, token, symspell['entries'][position]))
+
+    results.sort(key=lambda item: (item[0], item[1]))
+    return [(token, distance, entries) for distance, token, entries in results]
+
+
+def linear_lookup(symspell, word, max_distance):
+    """
+    Полный перебор токенов — базовая линия для бенчмарка
+    """
+    word = word.lower()
+    results = []
+    for position, token in enumerate(symspell['tokens']):
+        distance = edit_distance(word, token, max_distance)
+        if distance <= max_distance:
+            results.append((token, distance, symspell['entries'][position]))
+    results.sort(key=lambda item: (item[1], item[0]))
+    return results
+
+
+def misspell(word, distance, rng):
+    """
+    Случайная опечатка: distance правок (удаление, вставка, замена, перестановка)
+    """
+    alphabet = sorted(set(word)) or ['а']
+    for _ in range(distance):
+        operation = rng.choice(('delete', 'insert', 'replace', 'transpose'))
+        i = rng.randrange(len(word))
+        if operation == 'delete' and len(word) > 1:
+            word = word[:i] + word[i + 1:]
+        elif operation == 'insert':
+            word = word[:i] + rng.choice(alphabet) + word[i:]
+        elif operation == 'transpose' and i < len(word) - 1:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+        else:
+            word = word[:i] + rng.choice(alphabet) + word[i + 1:]
+    return word
+
+
+def _percentile(sorted_values, percent):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))
+    return sorted_values[index]
+
+
+def benchmark(symspell, samples=2000, seed=42):
+    """
+    Задержка поиска в зависимости от числа опечаток (0..maxDistance)
+    в сравнении с полным перебором. Опечатки генерируются детерминированно
+    """
+    rng = random.Random(seed)
+    tokens = symspell['tokens']
+    max_distance = symspell['maxDistance']
+
+    print(f"\n⏱️  Бенчмарк поиска ({samples} запросов на уровень, {len(tokens)} токенов)")
+    print(f"   {'правок':>6} {'p50 мкс':>9} {'p99 мкс':>9} {'перебор p50':>12} {'найдено':>8}")
+
+    results = []
+    for distance in range(max_distance + 1):
+        queries = [(token, misspell(token, distance, rng))
+                   for token in (rng.choice(tokens) for _ in range(samples))]
+
+        timings = []
+        found = 0
+        for original, query in queries:
+            started = time.perf_counter_ns()
+            matches = lookup(symspell, query)
+            timings.append((time.perf_counter_ns() - started) / 1000)
+            if any(token == original for token, _, _ in matches):
+                found += 1
+
+        linear = []
+        for _, query in queries[:max(1, samples // 10)]:
+            started = time.perf_counter_ns()
+            linear_lookup(symspell, query, max_distance)
+            linear.append((time.perf_counter_ns() - started) / 1000)
+
+        timings.sort()
+        linear.sort()
+        row = {
+            'distance': distance,
+            'p50Us': round(_percentile(timings, 50), 1),
+            'p99Us': round(_percentile(timings, 99), 1),
+            'linearP50Us': round(_percentile(linear, 50), 1),
+            'recall': round(found / samples, 4),
+        }
+        results.append(row)
+        print(f"   {distance:>6} {row['p50Us']:>9} {row['p99Us']:>9} {row['linearP50Us']:>12} "
+              f"{row['recall'] * 100:>7.1f}%")
+
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Словарь опечаток для брендов и моделей')
+    parser.add_argument('--max-distance', type=int, default=DEFAULT_MAX_DISTANCE,
+                        help='максимальное число правок (по умолчанию 2)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='замерить задержку поиска по числу опечаток')
+    parser.add_argument('--lookup', metavar='СЛОВО',
+                        help='найти слово в построенном словаре')
+    args = parser.parse_args()
+
+    # Определяем пути
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(os.path.dirname(script_dir), 'src', 'data')
+    output_path = os.path.join(data_dir, 'typos.json')
+    catalogs = [
+        (os.path.join(data_dir, 'divans.json'), 'divans', 'kod'),
+        (os.path.join(data_dir, 'matrasy.json'), 'matrasy', 'id'),
+    ]
+
+    print("🚀 Построение словаря опечаток\n")
+    symspell = build_symspell(catalogs, max_distance=args.max_distance)
+    write_symspell(symspell, output_path)
+
+    if args.lookup:
+        for token, distance, entries in lookup(symspell, args.lookup):
+            fields = ', '.join(f"{entry['catalog']}.{entry['field']}" for entry in entries)
+            print(f"   {token} (правок: {distance}) — {fields}")
+
+    if args.benchmark:
+        benchmark(symspell)
+
+    print("\n✨ Готово!")
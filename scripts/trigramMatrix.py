@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+Матрица символьных триграмм для ранжированного поиска товара (top-k)
+
+Рантайм ищет до первого совпадения: findDivanByBrandModel возвращает первый
+диван, чей алиас прошёл includes(), — ни ранжирования, ни уверенности. Здесь
+каждый товар — вектор TF-IDF по символьным триграммам его модели, к которым
+с весом SECONDARY_WEIGHT добавлены триграммы названия, бренда и алиасов
+(нормированный по L2), а запрос без служебных слов оценивается сразу против
+всех товаров одним разреженным умножением. Результат — top-k товаров
+с косинусной близостью 0..1: если лучший результат слаб или почти равен
+второму, навык может переспросить, а не угадывать.
+
+Триграммы берутся по словам с пробелами по краям ("элва" → " эл", "элв",
+"лва", "ва "); ё → е, латинские слова транслитерируются в кириллицу
+(Алиса распознаёт "Elva" как "элва").
+
+divans.trigrams.json (компактный JSON):
+{
+  "format": 2,
+  "source": {"file": "divans.json", "sha256": "..."},
+  "collection": "divans",
+  "idField": "kod",
+  "ids": ["10091617", ...],
+  "names": ["Диван ...", ...],
+  "trigrams": [" аа", " аб", ...],
+  "idf": [5.01, ...],
+  "indptr": [0, 3, ...],
+  "indices": [12, 40, 77, ...],
+  "data": [0.0731, ...]
+}
+
+indptr/indices/data — матрица триграммы × товары в формате CSR (то же, что
+CSC матрицы товары × триграммы): товары с триграммой t — indices[indptr[t]:
+indptr[t+1]], их веса — в data. Такая ориентация нужна для оценки запроса:
+читаются только строки его триграмм.
+
+С NumPy массивы загружаются как ndarray, оценка пачки запросов — один
+np.bincount по всем парам (запрос, товар), top-k — np.argpartition. Без
+NumPy работает та же математика на словарях. Замер --benchmark: 100 000
+синтетических товаров — p50 1.8 мс с NumPy и 71 мс без него, 20 000 —
+9 мс без NumPy.
+
+Пороги MIN_CONFIDENCE и CLARIFY_MARGIN подобраны --calibrate: перебор на
+размеченных фразах корпуса queryReplay.py с началами из loadTest.py и
+фразах о товарах другой категории (для них верный ответ — «не нашла»).
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import random
+import re
+import time
+
+from catalogWriter import atomic_write
+from phoneticKey import latin_to_cyrillic
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TRIGRAMS_FORMAT = 2
+DEFAULT_TOP_K = 5
+# Вес триграмм, которые есть только в названии, бренде и алиасах (не в модели).
+# Подобран на корпусе calibrate(): при равных весах длинное название
+# («Диван угловой … Elva») размывает вектор, и фраза «расскажи про ленвик»
+# набирает 0.37 против 0.80, когда модель весит больше остального
+SECONDARY_WEIGHT = 0.3
+# Служебные слова запроса (как stopWords в src/utils/divanSearch.js и
+# matrasSearch.js, без названий категорий — они отличают диван от кресла)
+QUERY_STOP_WORDS = frozenset([
+    'алиса', 'расскажи', 'про', 'о', 'об', 'мне', 'пожалуйста', 'хочу', 'узнать',
+    'спасибо', 'также', 'хорошо', 'еще',
+])
+# Ниже этой близости лучший товар считается ненайденным
+# (python3 trigramMatrix.py --calibrate)
+MIN_CONFIDENCE = 0.36
+# Если второй товар ближе этого к первому — переспросить. Калибровка даёт 0:
+# почти равные оценки — это цвета одной модели, и любой из них верный ответ,
+# а с отрывом 0.01 переспрос случается на каждой двенадцатой фразе
+CLARIFY_MARGIN = 0.0
+# Предел размера пачки × числа товаров: плотная матрица оценок пачки
+# (8 байт на ячейку) должна помещаться в кэш процессора, иначе
+# np.bincount упирается в память и пачка считается медленнее одиночных запросов
+BATCH_CELLS = 250_000
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def trigrams_path_for(json_path):
+    """
+    divans.json → divans.trigrams.json
+    """
+    root, ext = os.path.splitext(json_path)
+    return f"{root}.trigrams{ext}"
+
+
+def normalize_words(text):
+    """
+    Слова текста: нижний регистр, ё → е, латиница → кириллица
+    """
+    words = []
+    for word in _WORD_RE.findall(str(text).lower().replace('ё', 'е')):
+        words.append(latin_to_cyrillic(word) if word.isascii() and not word.isdigit() else word)
+    return words
+
+
+def text_trigrams(texts):
+    """
+    Множество триграмм всех слов списка текстов
+    """
+    grams = set()
+    for text in texts:
+        for word in normalize_words(text):
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                grams.add(padded[i:i + 3])
+    return grams
+
+
+def build_trigram_matrix(records, collection_key, id_field, texts, name_field='name',
+                         secondary_texts=None, secondary_weight=SECONDARY_WEIGHT):
+    """
+    Строит матрицу триграммы × товары
+
+    texts — функция запись → основные строки (модель)
+    secondary_texts — функция запись → название, бренд и алиасы; их
+    триграммы, которых нет в texts, входят в вектор товара с весом
+    secondary_weight
+    """
+    product_grams = [text_trigrams(texts(record)) for record in records]
+    secondary_grams = [
+        text_trigrams(secondary_texts(record)) - grams if secondary_texts else set()
+        for record, grams in zip(records, product_grams)
+    ]
+
+    frequency = {}
+    for grams, secondary in zip(product_grams, secondary_grams):
+        for gram in grams | secondary:
+            frequency[gram] = frequency.get(gram, 0) + 1
+
+    vocabulary = sorted(frequency)
+    position = {gram: number for number, gram in enumerate(vocabulary)}
+    # Сглаженный IDF: триграмма, общая для всех товаров, весит 1
+    count = len(records)
+    idf = [math.log((1 + count) / (1 + frequency[gram])) + 1 for gram in vocabulary]
+
+    postings = [[] for _ in vocabulary]
+    for product, (grams, secondary) in enumerate(zip(product_grams, secondary_grams)):
+        weights = {position[gram]: 1.0 for gram in grams}
+        weights.update((position[gram], secondary_weight) for gram in secondary)
+        norm = math.sqrt(sum((idf[row] * weight) ** 2 for row, weight in weights.items())) or 1.0
+        for row, weight in weights.items():
+            postings[row].append((product, round(idf[row] * weight / norm, 6)))
+
+    indptr = [0]
+    indices = []
+    data = []
+    for row in postings:
+        for product, weight in row:
+            indices.append(product)
+            data.append(weight)
+        indptr.append(len(indices))
+
+    return {
+        'format': TRIGRAMS_FORMAT,
+        'collection': collection_key,
+        'idField': id_field,
+        'ids': [str(record[id_field]) for record in records],
+        'names': [str(record.get(name_field) or '') for record in records],
+        'trigrams': vocabulary,
+        'idf': [round(value, 6) for value in idf],
+        'indptr': indptr,
+        'indices': indices,
+        'data': data,
+    }
+
+
+def write_trigram_matrix(json_path, collection_key, id_field, texts, name_field='name', trigrams_path=None,
+                         secondary_texts=None):
+    """
+    Читает готовый каталог, строит матрицу и сохраняет её рядом. Как и индекс
+    алиасов, матрица привязана контрольной суммой к байтам каталога
+    """
+    with open(json_path, 'rb') as f:
+        raw = f.read()
+
+    records = json.loads(raw.decode('utf-8'))[collection_key]
+    matrix = build_trigram_matrix(records, collection_key, id_field, texts, name_field, secondary_texts)
+    matrix['source'] = {
+        'file': os.path.basename(json_path),
+        'sha256': hashlib.sha256(raw).hexdigest(),
+    }
+
+    trigrams_path = trigrams_path or trigrams_path_for(json_path)
+    with atomic_write(trigrams_path) as f:
+        json.dump(matrix, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"🔠 Матрица триграмм: {len(matrix['ids'])} товаров × {len(matrix['trigrams'])} триграмм, "
+          f"{len(matrix['data'])} ненулевых, {os.path.getsize(trigrams_path)} байт → {trigrams_path}")
+    return matrix
+
+
+def load_trigram_matrix(trigrams_path, json_path=None):
+    """
+    Загружает матрицу; если передан json_path — проверяет, что она
+    построена именно из этого файла
+    """
+    with open(trigrams_path, 'r', encoding='utf-8') as f:
+        matrix = json.load(f)
+
+    if matrix.get('format') != TRIGRAMS_FORMAT:
+        raise ValueError(f"Неподдерживаемый формат матрицы: {matrix.get('format')}")
+
+    if json_path is not None:
+        with open(json_path, 'rb') as f:
+            checksum = hashlib.sha256(f.read()).hexdigest()
+        if checksum != matrix['source']['sha256']:
+            raise ValueError(f"Матрица {trigrams_path} не соответствует {json_path}")
+
+    return matrix
+
+
+class TrigramMatcher:
+    """
+    Оценка запросов против всех товаров матрицы
+
+    use_numpy=None — NumPy, если он установлен
+    """
+
+    def __init__(self, matrix, use_numpy=None):
+        if matrix.get('format') != TRIGRAMS_FORMAT:
+            raise ValueError(f"Неподдерживаемый формат матрицы: {matrix.get('format')}")
+        if use_numpy and np is None:
+            raise ImportError('для use_numpy=True нужен NumPy')
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self.ids = matrix['ids']
+        self.names = matrix['names']
+        self.position = {gram: row for row, gram in enumerate(matrix['trigrams'])}
+        self.idf = matrix['idf']
+        if self.use_numpy:
+            self.indptr = np.asarray(matrix['indptr'], dtype=np.int64)
+            self.indices = np.asarray(matrix['indices'], dtype=np.int64)
+            self.data = np.asarray(matrix['data'], dtype=np.float64)
+        else:
+            self.indptr = matrix['indptr']
+            self.indices = matrix['indices']
+            self.data = matrix['data']
+
+    @classmethod
+    def load(cls, trigrams_path, json_path=None, use_numpy=None):
+        return cls(load_trigram_matrix(trigrams_path, json_path), use_numpy)
+
+    def query_vector(self, query):
+        """
+        [(строка триграммы, вес)] запроса, нормированный по L2. Служебные
+        слова (QUERY_STOP_WORDS) и триграммы, которых нет в каталоге, не
+        учитываются — иначе они занижали бы близость
+        """
+        words = [word for word in normalize_words(query) if word not in QUERY_STOP_WORDS]
+        rows = [self.position[gram] for gram in text_trigrams(words) if gram in self.position]
+        norm = math.sqrt(sum(self.idf[row] ** 2 for row in rows)) or 1.0
+        return [(row, self.idf[row] / norm) for row in sorted(rows)]
+
+    def _result(self, product, score):
+        return {'id': self.ids[product], 'name': self.names[product], 'score': round(float(score), 4)}
+
+    def top_k(self, query, k=DEFAULT_TOP_K):
+        """
+        k самых близких товаров: [{'id', 'name', 'score'}, ...] по убыванию score
+        """
+        return self.top_k_batch([query], k)[0]
+
+    def top_k_batch(self, queries, k=DEFAULT_TOP_K):
+        """
+        top_k для пачки запросов; с NumPy — одна матричная операция на пачку
+        (пачки больше BATCH_CELLS / число товаров делятся на части)
+        """
+        vectors = [self.query_vector(query) for query in queries]
+        if not self.use_numpy:
+            return [self._top_k_python(vector, k) for vector in vectors]
+
+        size = max(1, BATCH_CELLS // max(1, len(self.ids)))
+        results = []
+        for start in range(0, len(vectors), size):
+            results.extend(self._top_k_numpy(vectors[start:start + size], k))
+        return results
+
+    def _top_k_python(self, vector, k):
+        scores = {}
+        for row, weight in vector:
+            for offset in range(self.indptr[row], self.indptr[row + 1]):
+                product = self.indices[offset]
+                scores[product] = scores.get(product, 0.0) + weight * self.data[offset]
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [self._result(product, score) for product, score in best]
+
+    def _top_k_numpy(self, vectors, k):
+        """
+        Оценки пачки: Q (запросы × триграммы) · M (триграммы × товары).
+        Ненулевые Q раскрываются в пары (запрос, товар, вес) по строкам M,
+        и np.bincount складывает их в плотную матрицу запросы × товары
+        """
+        count = len(self.ids)
+        query_rows = np.fromiter((number for number, vector in enumerate(vectors) for _ in vector), np.int64)
+        grams = np.fromiter((row for vector in vectors for row, _ in vector), np.int64)
+        weights = np.fromiter((weight for vector in vectors for _, weight in vector), np.float64)
+
+        starts = self.indptr[grams]
+        lengths = self.indptr[grams + 1] - starts
+        total = int(lengths.sum())
+        # Позиции в indices/data для всех строк M, нужных пачке, подряд
+        offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(starts, lengths)
+        cells = np.repeat(query_rows, lengths) * count + self.indices[offsets]
+        scores = np.bincount(cells, self.data[offsets] * np.repeat(weights, lengths),
+                             minlength=len(vectors) * count).reshape(len(vectors), count)
+
+        k = min(k, count)
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.lexsort((best, -best_scores), axis=1)
+        best = np.take_along_axis(best, order, axis=1)
+
+        results = []
+        for number in range(len(vectors)):
+            row = scores[number]
+            results.append([
+                self._result(product, row[product])
+                for product in best[number].tolist() if row[product] > 0
+            ])
+        return results
+
+
+def needs_clarification(matches, min_confidence=MIN_CONFIDENCE, margin=CLARIFY_MARGIN):
+    """
+    Решение по top-k: 'not_found' — лучший товар слишком далёк, 'clarify' —
+    несколько товаров почти одинаково близки (вернуть их для уточнения),
+    None — лучший товар можно называть уверенно
+    """
+    if not matches or matches[0]['score'] < min_confidence:
+        return 'not_found'
+    if len(matches) > 1 and matches[0]['score'] - matches[1]['score'] < margin:
+        return 'clarify'
+    return None
+
+
+# --- Калибровка порогов ---
+
+# Цена исхода: уверенно назван не тот товар (или товар на постороннюю фразу)
+# хуже всего, промах заставляет повторить запрос, переспрос стоит одну реплику
+CALIBRATION_COSTS = {'wrong': 3, 'miss': 2, 'clarify': 1}
+
+
+def calibration_corpus(build, seed=42):
+    """
+    Размеченные фразы для подбора порогов: корпус queryReplay.py (кроме
+    кодов — их ищет автомат артикулов) и те же фразы с началами из
+    loadTest.py («расскажи про диван …», «матрас …») для обеих категорий.
+    Фразы о товаре одной категории — отрицательные примеры для другой
+    (покупатель спрашивает про диван у колонки в зоне матрасов)
+    """
+    from loadTest import DIVAN_PREFIXES, MATRAS_PREFIXES
+    from queryReplay import spoken_digits_to_numbers, synthetic_corpus
+
+    prefixes = list(dict.fromkeys(DIVAN_PREFIXES + MATRAS_PREFIXES))
+    corpus = []
+    seen = set()
+    for item in synthetic_corpus(build, seed):
+        query, expected = item['query'], item['expected']
+        if re.search(r'\d', query) or len(spoken_digits_to_numbers(query)) >= 4:
+            continue
+        if expected and any(str(value).startswith('multiple_') for value in expected):
+            continue
+        expected = None if expected is None else sorted({str(value) for value in expected})
+        variants = [(item['collection'], f"{prefix}{query}", expected) for prefix in prefixes] if expected else []
+        variants.append((item['collection'], query, expected))
+        if expected:
+            other = 'matrasy' if item['collection'] == 'divans' else 'divans'
+            variants.append((other, query, None))
+        for collection, text, labels in variants:
+            if (collection, text) not in seen:
+                seen.add((collection, text))
+                corpus.append({'query': text, 'collection': collection, 'expected': labels})
+    return corpus
+
+
+def calibration_outcome(matches, expected, min_confidence, margin):
+    """
+    'ok', 'wrong', 'miss' или 'clarify' для решения needs_clarification
+    """
+    decision = needs_clarification(matches, min_confidence, margin)
+    if expected is None:
+        return {'not_found': 'ok', 'clarify': 'clarify'}.get(decision, 'wrong')
+    if decision == 'not_found':
+        return 'miss'
+    if decision == 'clarify':
+        return 'clarify' if any(match['id'] in expected for match in matches) else 'miss'
+    return 'ok' if matches[0]['id'] in expected else 'wrong'
+
+
+def calibrate(matchers, corpus, thresholds=None, margins=None, k=DEFAULT_TOP_K):
+    """
+    Перебор порогов (min_confidence, margin) на размеченном корпусе;
+    matchers — {коллекция: TrigramMatcher}. Возвращает строки
+    {'minConfidence', 'margin', 'ok', 'wrong', 'miss', 'clarify', 'cost'}
+    по возрастанию цены
+    """
+    thresholds = thresholds or [step / 100 for step in range(5, 81)]
+    margins = margins or [0.0, 0.01, 0.02, 0.03, 0.05, 0.08, 0.1]
+    scored = []
+    for collection, matcher in matchers.items():
+        items = [item for item in corpus if item['collection'] == collection]
+        for item, matches in zip(items, matcher.top_k_batch([item['query'] for item in items], k)):
+            scored.append((matches, item['expected'] and set(item['expected'])))
+
+    rows = []
+    for min_confidence in thresholds:
+        for margin in margins:
+            counts = {'ok': 0, 'wrong': 0, 'miss': 0, 'clarify': 0}
+            for matches, expected in scored:
+                counts[calibration_outcome(matches, expected, min_confidence, margin)] += 1
+            cost = sum(CALIBRATION_COSTS[outcome] * counts[outcome] for outcome in CALIBRATION_COSTS)
+            rows.append(dict(minConfidence=min_confidence, margin=margin, cost=cost, **counts))
+    rows.sort(key=lambda row: (row['cost'], -row['margin'], row['minConfidence']))
+    return rows
+
+
+def print_calibration(rows, limit=5):
+    current = next((row for row in rows if row['minConfidence'] == MIN_CONFIDENCE
+                    and row['margin'] == CLARIFY_MARGIN), None)
+    total = rows[0]['ok'] + rows[0]['wrong'] + rows[0]['miss'] + rows[0]['clarify']
+    print(f"   фраз: {total}, цена: не тот товар ×{CALIBRATION_COSTS['wrong']}, "
+          f"промах ×{CALIBRATION_COSTS['miss']}, переспрос ×{CALIBRATION_COSTS['clarify']}")
+    for label, row in [('текущие', current)] + [('лучшие', row) for row in rows[:limit]]:
+        if row:
+            print(f"   {label:<8} порог {row['minConfidence']:.2f}, отрыв {row['margin']:.2f}: "
+                  f"верно {row['ok']}, не тот {row['wrong']}, промах {row['miss']}, "
+                  f"переспрос {row['clarify']}, цена {row['cost']}")
+
+
+# --- Бенчмарк ---
+
+_SYLLABLES = ['ла', 'ро', 'ми', 'ка', 'то', 'ве', 'лу', 'на', 'си', 'бо', 'ре', 'ан', 'ос', 'ти', 'мар', 'лен']
+
+
+def synthetic_records(records, texts, count, seed=42):
+    """
+    count товаров по образцу каталога: тип из слов настоящего товара,
+    модель — настоящее слово и выдуманное второе слово из слогов
+    (слоги кодируют номер товара, так что модели не повторяются)
+    """
+    rng = random.Random(seed)
+    generated = []
+    for number in range(count):
+        words = [word for word in normalize_words(' '.join(texts(rng.choice(records)))) if len(word) > 3]
+        words = words or ['модель']
+        syllables = []
+        rest = number
+        while rest or len(syllables) < 3:
+            rest, digit = divmod(rest, len(_SYLLABLES))
+            syllables.append(_SYLLABLES[digit])
+        model = f"{rng.choice(words)} {''.join(syllables)}"
+        generated.append({'id': f"S{number:06d}", 'name': f"{rng.choice(words).capitalize()} {model}",
+                          'model': model})
+    return generated
+
+
+def benchmark(matrix, queries, expected, k=DEFAULT_TOP_K, use_numpy=None, batch=64):
+    """
+    Задержка одного запроса, запроса в пачке и полнота top-1/top-k
+    """
+    matcher = TrigramMatcher(matrix, use_numpy)
+    timings = []
+    hits_first = hits_k = 0
+    for query, product_id in zip(queries, expected):
+        started = time.perf_counter()
+        matches = matcher.top_k(query, k)
+        timings.append((time.perf_counter() - started) * 1000)
+        ids = [match['id'] for match in matches]
+        hits_first += bool(ids) and ids[0] == product_id
+        hits_k += product_id in ids
+
+    started = time.perf_counter()
+    for start in range(0, len(queries), batch):
+        matcher.top_k_batch(queries[start:start + batch], k)
+    batch_ms = (time.perf_counter() - started) * 1000 / max(1, len(queries))
+
+    timings.sort()
+    return {
+        'engine': 'numpy' if matcher.use_numpy else 'python',
+        'products': len(matrix['ids']),
+        'queries': len(queries),
+        'p50Ms': round(timings[len(timings) // 2], 3),
+        'p99Ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 3),
+        'batchMsPerQuery': round(batch_ms, 3),
+        'recallTop1': round(hits_first / len(queries), 4),
+        f"recallTop{k}": round(hits_k / len(queries), 4),
+    }
+
+
+def print_benchmark(row):
+    print(f"   {row['engine']:<7} {row['products']:>7} товаров: p50 {row['p50Ms']:.2f} мс, "
+          f"p99 {row['p99Ms']:.2f} мс, в пачке {row['batchMsPerQuery']:.2f} мс/запрос, "
+          f"top-1 {row['recallTop1'] * 100:.1f}%")
+
+
+def run_synthetic_benchmark(records, texts, count, queries=500, seed=42, engines=(None,)):
+    """
+    Бенчмарк на count синтетических товаров; запросы — модели
+    случайных товаров с одной опечаткой
+    """
+    from symspellIndex import misspell
+
+    rng = random.Random(seed)
+    generated = synthetic_records(records, texts, count, seed)
+    started = time.perf_counter()
+    matrix = build_trigram_matrix(generated, 'synthetic', 'id', lambda record: [record['model']], 'name',
+                                  lambda record: [record['name']])
+    print(f"   Матрица {count} товаров: {time.perf_counter() - started:.1f} с, "
+          f"{len(matrix['trigrams'])} триграмм, {len(matrix['data'])} ненулевых")
+
+    sample = [rng.randrange(count) for _ in range(queries)]
+    query_texts = [f"расскажи про {misspell(generated[number]['model'], 1, rng)}" for number in sample]
+    expected = [generated[number]['id'] for number in sample]
+
+    rows = []
+    for use_numpy in engines:
+        rows.append(benchmark(matrix, query_texts, expected, use_numpy=use_numpy))
+        print_benchmark(rows[-1])
+    return rows
+
+
+def divan_texts(divan):
+    return [divan['model']]
+
+
+def divan_secondary_texts(divan):
+    return [divan['name'], divan['brand']] + divan['brandAliases'] + divan['modelAliases']
+
+
+def matras_texts(matras):
+    return [matras['model']]
+
+
+def matras_secondary_texts(matras):
+    return [matras['fullName'], matras['brand']] + matras['aliases']
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Матрица триграмм и ранжированный поиск товаров')
+    parser.add_argument('--query', action='append', default=[], metavar='ФРАЗА',
+                        help='показать top-k для фразы (можно несколько раз)')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_K,
+                        help='сколько товаров показывать')
+    parser.add_argument('--benchmark', type=int, default=None, metavar='ТОВАРОВ',
+                        help='бенчмарк на синтетическом каталоге заданного размера (например, 100000)')
+    parser.add_argument('--calibrate', action='store_true',
+                        help='подобрать MIN_CONFIDENCE и CLARIFY_MARGIN на корпусе queryReplay.py')
+    parser.add_argument('--no-numpy', action='store_true',
+                        help='считать без NumPy')
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(os.path.dirname(script_dir), 'src', 'data')
+    catalogs = [
+        (os.path.join(data_dir, 'divans.json'), 'divans', 'kod', divan_texts, 'name', divan_secondary_texts),
+        (os.path.join(data_dir, 'matrasy.json'), 'matrasy', 'id', matras_texts, 'fullName',
+         matras_secondary_texts),
+    ]
+
+    print("🚀 Матрица триграмм\n")
+    matchers = []
+    for json_path, collection_key, id_field, texts, name_field, secondary_texts in catalogs:
+        matrix = write_trigram_matrix(json_path, collection_key, id_field, texts, name_field,
+                                      secondary_texts=secondary_texts)
+        matchers.append((collection_key, TrigramMatcher(matrix, use_numpy=False if args.no_numpy else None)))
+
+    for query in args.query:
+        print(f"\n🔎 {query}")
+        for collection_key, matcher in matchers:
+            matches = matcher.top_k(query, args.top)
+            decision = needs_clarification(matches) or 'ok'
+            print(f"   {collection_key} ({decision}):")
+            for match in matches:
+                print(f"      {match['score']:.3f}  {match['id']}  {match['name']}")
+
+    if args.calibrate:
+        from queryReplay import load_build
+
+        print("\n🎯 Калибровка порогов")
+        rows = calibrate(dict(matchers), calibration_corpus(load_build(data_dir)))
+        print_calibration(rows)
+
+    if args.benchmark:
+        with open(catalogs[0][0], 'r', encoding='utf-8') as f:
+            divans = json.load(f)['divans']
+        engines = (False,) if args.no_numpy or np is None else (True, False)
+        print(f"\n⏱️  Бенчмарк: {args.benchmark} синтетических товаров")
+        run_synthetic_benchmark(divans, lambda divan: divan_texts(divan) + divan_secondary_texts(divan),
+                                args.benchmark, engines=engines)
+
+    print("\n✨ Готово!")
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Скрипт для обновления всего каталога из книги розницы за один проход
+
+Книга "Диваны, крессла, матрасы розница" открывается один раз (read-only),
+каждый нужный лист читается потоково и попадает в свою категорию:
+"Мягкая мебель" → divans.json, "Матрасы" → matrasy.json. Разбор строк и
+генерация алиасов идут параллельно в пуле процессов пачками строк.
+
+Листы описываются в SHEETS: название листа, категория вывода, колонки
+(по заголовкам строки 7) и функция разбора строки. Новый лист — новая
+запись в SHEETS, без нового кода чтения. Названия разбирает NameParser
+(nameParser.py) — тот же, что в updateDivans.py, с типом «матрас» для
+матрасов.
+
+Это основной путь обновления каталога из книги. Собранные записи
+дописываются теми же функциями, что у updateDivans.py (parse_excel_to_json)
+и updateMatrasy.py (update_matrasy_json), поэтому флаги общие и значат
+то же самое. Те скрипты остаются для одного каталога: updateDivans.py —
+только лист «Мягкая мебель» (и сравнение режимов чтения), updateMatrasy.py —
+алиасы и описания .docx по текущему matrasy.json без книги.
+"""
+
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import openpyxl
+
+from nameParser import NameParser
+from phoneticVariants import add_phonetic_arguments, configure_from_args
+from updateDivans import PHONETIC_ENGINE as DIVAN_PHONETIC_ENGINE
+from updateDivans import (BRAND_ALIASES, build_divan, clean_description, parse_excel_to_json,
+                          write_divans_articles, write_divans_index, write_divans_keys,
+                          write_divans_shards, write_divans_trigrams)
+from updateMatrasy import PHONETIC_ENGINE as MATRAS_PHONETIC_ENGINE
+from updateMatrasy import (update_matrasy_json, write_matrasy_index, write_matrasy_keys,
+                           write_matrasy_shards, write_matrasy_trigrams)
+
+HEADER_ROW = 7
+FIRST_DATA_ROW = 8
+BATCH_SIZE = 200
+
+
+def clean_sheet_value(value):
+    """
+    Значение характеристики без служебных "::" ("средний::;жесткий::" → "средний/жесткий")
+    """
+    if value is None:
+        return None
+    parts = [part.strip().rstrip(':').strip() for part in str(value).split(';')]
+    parts = [part for part in parts if part]
+    return '/'.join(parts) or None
+
+
+def format_number(value, unit):
+    if value is None or value == '':
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return f"{value} {unit}"
+    return f"{int(number) if number.is_integer() else number} {unit}"
+
+
+def normalize_kod(value):
+    """
+    Код товара как строка без ".0" (числовые ячейки openpyxl отдаёт float)
+    """
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    text = str(value).strip()
+    return text[:-2] if text.endswith('.0') and text[:-2].isdigit() else text
+
+
+def parse_divan_row(row):
+    """
+    Строка листа "Мягкая мебель" → запись дивана (как в updateDivans.py)
+    """
+    if not (row['kod'] and row['name']):
+        return None
+    return build_divan(row['kod'], row['name'], row['description'])
+
+
+# Разбор названий матрасов: тип «матрас», многословные бренды из BRAND_ALIASES
+MATRAS_TYPES = [(('матрас',), 0)]
+MATRAS_NAME_PARSER = NameParser(BRAND_ALIASES, MATRAS_TYPES)
+SIZE_RE = re.compile(r'\d+\s*[xх×]\s*\d+', re.IGNORECASE)
+
+
+def parse_matras_name(name):
+    """
+    "Матрас LAGOMA Alma 140x200x26" → ("Lagoma", "Alma")
+
+    Размер отрезается до разбора: расцветки у матрасов нет, а все размеры
+    одной модели разбираются один раз (кэш NameParser по названию)
+    """
+    brand, model = MATRAS_NAME_PARSER.parse(SIZE_RE.split(str(name))[0])
+    # В листе бренд заглавными (LAGOMA), в matrasy.json — как имя (Lagoma)
+    return (brand.title() if brand.isupper() else brand), model
+
+
+def parse_matras_row(row):
+    """
+    Строка листа "Матрасы" → размерная позиция матраса (модели собираются позже)
+    """
+    if not (row['kod'] and row['name']):
+        return None
+    brand, model = parse_matras_name(row['name'])
+    if not model:
+        return None
+    return {
+        'kod': normalize_kod(row['kod']),
+        'brand': brand,
+        'model': model,
+        'description': clean_description(row['description']),
+        'height': format_number(row.get('height'), 'см'),
+        'firmness': clean_sheet_value(row.get('firmness')),
+        'maxLoad': format_number(row.get('maxLoad'), 'кг'),
+        'warranty': clean_sheet_value(row.get('warranty')),
+    }
+
+
+# Листы книги: колонки задаются заголовками строки 7
+SHEETS = [
+    {
+        'sheet': 'Мягкая мебель',
+        'category': 'divans',
+        'columns': {
+            'kod': 'код товара',
+            'name': 'название',
+            'description': 'общее описание',
+        },
+        'parse': parse_divan_row,
+    },
+    {
+        'sheet': 'Матрасы',
+        'category': 'matrasy',
+        'columns': {
+            'kod': 'код товара',
+            'name': 'название',
+            'description': 'общее описание',
+            'firmness': 'Степень жесткости',
+            'maxLoad': 'Макс. нагрузка на одно спальное место (кг)',
+            'warranty': 'Срок службы',
+            'height': 'Толщина (см)',
+        },
+        'parse': parse_matras_row,
+    },
+]
+
+
+def resolve_columns(ws, columns):
+    """
+    Номера колонок по заголовкам; отсутствующие колонки пропускаются
+    """
+    header = next(ws.iter_rows(min_row=HEADER_ROW, max_row=HEADER_ROW, values_only=True))
+    positions = {str(title).strip(): i for i, title in enumerate(header) if title is not None}
+    resolved = {}
+    for field, title in columns.items():
+        if title in positions:
+            resolved[field] = positions[title]
+        elif field in ('kod', 'name'):
+            raise ValueError(f"На листе {ws.title} нет колонки '{title}'")
+    return resolved
+
+
+def iter_sheet_batches(ws, columns, batch_size=BATCH_SIZE):
+    """
+    Потоково читает лист и отдаёт пачки строк-словарей
+    """
+    max_col = max(columns.values()) + 1
+    batch = []
+    for values in ws.iter_rows(min_row=FIRST_DATA_ROW, max_col=max_col, values_only=True):
+        values = tuple(values) + (None,) * (max_col - len(values))
+        batch.append({field: values[i] for field, i in columns.items()})
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def configure_worker(phonetic):
+    """
+    Настройки фонетики (--phonetic-*) в процессе пула: алиасы диванов
+    строятся там же, где разбираются строки
+    """
+    if phonetic:
+        DIVAN_PHONETIC_ENGINE.configure(*phonetic)
+
+
+def parse_batch(sheet_position, batch):
+    """
+    Разбирает пачку строк листа. Выполняется в пуле процессов
+    """
+    parse = SHEETS[sheet_position]['parse']
+    return [record for record in (parse(row) for row in batch) if record is not None]
+
+
+def read_workbook(excel_path, workers=None, raw=(), phonetic=None):
+    """
+    Один проход по книге: категория → список записей в порядке строк.
+    Книга открывается один раз, пачки строк разбираются параллельно.
+    Категории из raw возвращаются строками-словарями без разбора
+    (их разбирает вызывающий, например через кэш строк)
+    """
+    wb = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    futures = {}
+    rows = {}
+    timings = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=configure_worker,
+                                 initargs=(phonetic,)) as pool:
+            for position, spec in enumerate(SHEETS):
+                if spec['sheet'] not in wb.sheetnames:
+                    print(f"⚠️  Лист '{spec['sheet']}' не найден, пропускаю")
+                    continue
+                started = time.perf_counter()
+                ws = wb[spec['sheet']]
+                columns = resolve_columns(ws, spec['columns'])
+                for batch in iter_sheet_batches(ws, columns):
+                    if spec['category'] in raw:
+                        rows.setdefault(spec['category'], []).extend(batch)
+                        continue
+                    futures.setdefault(spec['category'], []).append(
+                        pool.submit(parse_batch, position, batch)
+                    )
+                timings[spec['sheet']] = time.perf_counter() - started
+
+            results = {
+                category: [record for future in category_futures for record in future.result()]
+                for category, category_futures in futures.items()
+            }
+            results.update(rows)
+    finally:
+        wb.close()
+
+    for sheet, elapsed in timings.items():
+        print(f"   Лист '{sheet}': прочитан за {elapsed:.2f} с")
+    return results
+
+
+def build_matrasy(positions, curated):
+    """
+    Собирает модели матрасов из размерных позиций листа.
+    Поля из текущего matrasy.json (описание, особенности, характеристики),
+    заполненные вручную, имеют приоритет над данными листа
+    """
+    curated_by_id = {matras['id']: matras for matras in curated}
+    models = {}
+    for item in positions:
+        matras_id = f"{item['brand']}-{item['model']}".lower().replace(' ', '-')
+        models.setdefault(matras_id, dict(item, id=matras_id))
+
+    # Алиасы дописывает update_matrasy_json, как при запуске updateMatrasy.py
+    def merge(existing, item):
+        brand = existing.get('brand', item['brand'])
+        model = existing.get('model', item['model'])
+        return {
+            'id': existing.get('id', item['id']),
+            'brand': brand,
+            'model': model,
+            'fullName': existing.get('fullName', f"{brand} {model}"),
+            'aliases': sorted(existing.get('aliases', [])),
+            'description': existing.get('description') or item['description'] or 'Описание отсутствует',
+            'features': existing.get('features', []),
+            'height': existing.get('height', item['height']),
+            'firmness': existing.get('firmness', item['firmness']),
+            'maxLoad': existing.get('maxLoad', item['maxLoad']),
+            'warranty': existing.get('warranty', item['warranty']),
+            'inStock': existing.get('inStock', True),
+        }
+
+    # Порядок текущего файла сохраняется, новые модели — в конце в порядке листа.
+    # Модели, которых нет в листе, остаются как есть
+    matrasy = [
+        merge(matras, models[matras['id']]) if matras['id'] in models else matras
+        for matras in curated
+    ]
+    for matras_id, item in models.items():
+        if matras_id not in curated_by_id:
+            matrasy.append(merge({}, item))
+
+    return matrasy
+
+
+# Производные файлы по каталогу: флаг → функция (путь каталога)
+DERIVED = {
+    'divans': {
+        'index': write_divans_index,
+        'phonetic_keys': write_divans_keys,
+        'articles': write_divans_articles,
+        'trigrams': write_divans_trigrams,
+    },
+    'matrasy': {
+        'index': write_matrasy_index,
+        'phonetic_keys': write_matrasy_keys,
+        'trigrams': write_matrasy_trigrams,
+    },
+}
+SHARD_WRITERS = {'divans': write_divans_shards, 'matrasy': write_matrasy_shards}
+
+
+def update_catalog(excel_path, data_dir, workers=None, incremental=False, compact=False, render=False,
+                   diff=False, profile=False, docx_dir=None, phonetic=None):
+    """
+    Обновляет divans.json и matrasy.json за один проход по книге
+
+    Флаги — как у parse_excel_to_json (updateDivans.py) и update_matrasy_json
+    (updateMatrasy.py). incremental=True — строки диванов собираются через
+    кэш строк в этом процессе, а не в пуле: неизменённые берутся из кэша.
+    phonetic — (глубина, предел, позиционные) для процессов пула.
+    Возвращает пути обновлённых каталогов {категория: путь}
+    """
+    print(f"📖 Читаю файл: {excel_path}")
+    started = time.perf_counter()
+    results = read_workbook(excel_path, workers, raw=('divans',) if incremental else (), phonetic=phonetic)
+    paths = {}
+
+    if 'divans' in results:
+        divans_path = os.path.join(data_dir, 'divans.json')
+        options = dict(incremental=incremental, compact=compact, render=render, diff=diff, profile=profile)
+        if incremental:
+            rows = [(row['kod'], row['name'], row['description']) for row in results['divans']]
+            parse_excel_to_json(excel_path, divans_path, rows=rows, **options)
+        else:
+            parse_excel_to_json(excel_path, divans_path, divans=results['divans'], **options)
+        paths['divans'] = divans_path
+
+    if 'matrasy' in results:
+        matrasy_path = os.path.join(data_dir, 'matrasy.json')
+        try:
+            with open(matrasy_path, 'r', encoding='utf-8') as f:
+                curated = json.load(f)['matrasy']
+        except FileNotFoundError:
+            curated = []
+        matrasy = build_matrasy(results['matrasy'], curated)
+        print()
+        update_matrasy_json(matrasy_path, matrasy_path, compact=compact, docx_dir=docx_dir, workers=workers,
+                            render=render, diff=diff, profile=profile, data={'matrasy': matrasy})
+        new_models = len({m['id'] for m in matrasy} - {m['id'] for m in curated})
+        print(f"   Новых моделей из листа: {new_models}")
+        paths['matrasy'] = matrasy_path
+
+    print(f"\n⏱️  Всего: {time.perf_counter() - started:.2f} с")
+    return paths
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Обновление всего каталога из книги розницы')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='число процессов для разбора строк, записи шардов и разбора .docx')
+    parser.add_argument('--incremental', action='store_true',
+                        help='пересчитывать алиасы диванов только для изменённых строк')
+    parser.add_argument('--compact', action='store_true',
+                        help='компактные каталоги с интернированными алиасами (*.compact.json)')
+    parser.add_argument('--render', action='store_true',
+                        help='добавить готовые ответы с разбивкой длинных описаний (поле response)')
+    parser.add_argument('--diff', action='store_true',
+                        help='не переписывать каталоги, а записать журналы изменений (*.changelog.json)')
+    parser.add_argument('--profile', action='store_true',
+                        help='метрики по этапам и товарам и профиль cProfile (*.metrics.json, *.profile)')
+    parser.add_argument('--docx', action='store_true',
+                        help="подтянуть описания матрасов из папки 'Описание матрасов'")
+    parser.add_argument('--index', action='store_true',
+                        help='инвертированные индексы алиасов (*.index.json)')
+    parser.add_argument('--phonetic-keys', action='store_true',
+                        help='каталоги с фонетическими ключами вместо алиасов (*.keys.json)')
+    parser.add_argument('--articles', action='store_true',
+                        help='автомат артикулов диванов (divans.articles.json)')
+    parser.add_argument('--trigrams', action='store_true',
+                        help='матрицы триграмм для ранжированного поиска top-k (*.trigrams.json)')
+    parser.add_argument('--shards', action='store_true',
+                        help='шарды по бренду и категории с манифестами (src/data/shards)')
+    add_phonetic_arguments(parser)
+    args = parser.parse_args()
+    # Производные файлы строятся из каталогов, которые в --diff не меняются
+    if args.diff:
+        derived = [f"--{flag.replace('_', '-')}" for flag in ('index', 'phonetic_keys', 'articles', 'trigrams',
+                                                              'shards') if getattr(args, flag)]
+        if derived:
+            parser.error(f"--diff нельзя сочетать с {', '.join(derived)}: каталог не переписывается")
+    configure_from_args(DIVAN_PHONETIC_ENGINE, args)
+    configure_from_args(MATRAS_PHONETIC_ENGINE, args)
+
+    # Определяем пути
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_dir = os.path.dirname(script_dir)
+    excel_path = os.path.join(project_dir, 'Файл для диванов', 'Диваны, крессла, матрасы розница (1).xlsx')
+    data_dir = os.path.join(project_dir, 'src', 'data')
+    docx_dir = os.path.join(project_dir, 'Описание матрасов') if args.docx else None
+
+    print("🚀 Обновление каталога (диваны и матрасы)\n")
+    paths = update_catalog(excel_path, data_dir, args.workers, incremental=args.incremental,
+                           compact=args.compact, render=args.render, diff=args.diff, profile=args.profile,
+                           docx_dir=docx_dir,
+                           phonetic=(args.phonetic_depth, args.phonetic_cap, args.phonetic_positional))
+    for category, path in paths.items():
+        for flag, write in DERIVED[category].items():
+            if getattr(args, flag):
+                write(path)
+        if args.shards:
+            SHARD_WRITERS[category](path, os.path.join(data_dir, 'shards'), args.workers)
+    print("\n✨ Готово!")
@@ -4,11 +4,27 @@
 Автоматически генерирует алиасы для брендов и моделей
 """
 
+import hashlib
+import inspect
 import openpyxl
 import json
+import os
 import re
 from html import unescape
 
+from aliasIndex import write_alias_index
+from aliasService import AliasService
+from articleAutomaton import write_article_automaton
+from buildMetrics import NULL_METRICS, BuildMetrics, histogram
+from catalogShards import write_shards
+from catalogWriter import atomic_write, write_changelog, write_json, write_json_stream
+from compactCatalog import write_compact_catalog
+from nameParser import FURNITURE_TYPES, NameParser, multiword_brands
+from phoneticKey import keys_path_for, write_key_catalog
+from phoneticVariants import PhoneticEngine, add_phonetic_arguments, configure_from_args
+from responseRender import RenderStats, render_divan
+from trigramMatrix import divan_secondary_texts, divan_texts, write_trigram_matrix
+
 # Алиасы для брендов
 BRAND_ALIASES = {
     'VELUNA': ['veluna', 'велуна', 'велюна', 'илуна', 'iluna', 'вилуна'],
@@ -76,129 +92,40 @@ TRANSLIT_MAP = {
     'f': 'ф', 'h': 'х', 'w': 'в', 'y': 'й'
 }
 
+# Замены для распространённых фонетических ошибок
+PHONETIC_RULES = [
+    ('е', 'э'), ('э', 'е'),  # е/э
+    ('и', 'ы'), ('ы', 'и'),  # и/ы
+    ('о', 'а'), ('а', 'о'),  # о/а в безударной позиции
+    ('ё', 'е'), ('е', 'ё'),  # ё/е
+    ('й', 'и'), ('и', 'й'),  # й/и
+    ('ц', 'тс'), ('тс', 'ц'),  # ц/тс
+    ('ч', 'тш'), ('тш', 'ч'),  # ч/тш
+    ('щ', 'шч'), ('шч', 'щ'),  # щ/шч
+    ('дж', 'ж'), ('ж', 'дж'),  # дж/ж
+    ('нн', 'н'), ('н', 'нн'),  # двойные согласные
+    ('лл', 'л'), ('л', 'лл'),
+    ('мм', 'м'), ('м', 'мм'),
+    ('сс', 'с'), ('с', 'сс'),
+    ('тт', 'т'), ('т', 'тт'),
+]
+
+PHONETIC_ENGINE = PhoneticEngine(PHONETIC_RULES)
+ALIAS_SERVICE = AliasService(TRANSLIT_MAP, PHONETIC_ENGINE)
+
 def generate_phonetic_variants(word):
     """
     Генерирует фонетические варианты произношения слова
+    (замыкание PHONETIC_RULES с кэшем по токену, см. phoneticVariants.py)
     """
-    variants = set([word])
-    
-    # Замены для распространённых фонетических ошибок
-    phonetic_rules = [
-        ('е', 'э'), ('э', 'е'),  # е/э
-        ('и', 'ы'), ('ы', 'и'),  # и/ы
-        ('о', 'а'), ('а', 'о'),  # о/а в безударной позиции
-        ('ё', 'е'), ('е', 'ё'),  # ё/е
-        ('й', 'и'), ('и', 'й'),  # й/и
-        ('ц', 'тс'), ('тс', 'ц'),  # ц/тс
-        ('ч', 'тш'), ('тш', 'ч'),  # ч/тш
-        ('щ', 'шч'), ('шч', 'щ'),  # щ/шч
-        ('дж', 'ж'), ('ж', 'дж'),  # дж/ж
-        ('нн', 'н'), ('н', 'нн'),  # двойные согласные
-        ('лл', 'л'), ('л', 'лл'),
-        ('мм', 'м'), ('м', 'мм'),
-        ('сс', 'с'), ('с', 'сс'),
-        ('тт', 'т'), ('т', 'тт'),
-    ]
-    
-    for old, new in phonetic_rules:
-        if old in word:
-            variants.add(word.replace(old, new))
-    
-    return variants
+    return PHONETIC_ENGINE.variants(word)
 
 def generate_model_aliases(model_name):
     """
     Генерирует максимально разнообразные алиасы для модели
+    (общий сервис с LRU-кэшем по модели, см. aliasService.py)
     """
-    if not model_name:
-        return []
-    
-    aliases = set()
-    model_lower = model_name.lower().strip()
-    
-    # Добавляем оригинал
-    aliases.add(model_lower)
-    
-    # Разбиваем на слова
-    words = model_lower.split()
-    
-    # Для каждого слова генерируем фонетические варианты
-    for word in words:
-        # Фонетические варианты
-        for variant in generate_phonetic_variants(word):
-            aliases.add(variant)
-            
-            # Добавляем с остальными словами
-            other_words = [w for w in words if w != word]
-            if other_words:
-                aliases.add(' '.join([variant] + other_words))
-                aliases.add(' '.join(other_words + [variant]))
-    
-    # Для каждого слова проверяем специальные случаи из TRANSLIT_MAP
-    for word in words:
-        if word in TRANSLIT_MAP and isinstance(TRANSLIT_MAP[word], list):
-            # Это специальный случай - добавляем все варианты
-            for variant in TRANSLIT_MAP[word]:
-                aliases.add(variant)
-                
-                # Фонетические варианты специальных случаев
-                for phonetic in generate_phonetic_variants(variant):
-                    aliases.add(phonetic)
-                
-                # Также добавляем с остальными словами
-                other_words = [w for w in words if w != word]
-                if other_words:
-                    for variant_word in TRANSLIT_MAP[word]:
-                        aliases.add(' '.join([variant_word] + other_words))
-                        aliases.add(' '.join(other_words + [variant_word]))
-    
-    # Добавляем первое слово отдельно (основное название)
-    if words:
-        first_word = words[0]
-        aliases.add(first_word)
-        
-        # Фонетические варианты первого слова
-        for variant in generate_phonetic_variants(first_word):
-            aliases.add(variant)
-        
-        # Транслитерация первого слова
-        if first_word in TRANSLIT_MAP and isinstance(TRANSLIT_MAP[first_word], list):
-            for variant in TRANSLIT_MAP[first_word]:
-                aliases.add(variant)
-                for phonetic in generate_phonetic_variants(variant):
-                    aliases.add(phonetic)
-    
-    # Убираем суффиксы типа "-4", "-2" для поиска по базовому названию
-    for word in words:
-        base_word = re.sub(r'-?\d+$', '', word)
-        if base_word and base_word != word and len(base_word) >= 3:
-            aliases.add(base_word)
-            
-            # Фонетические варианты базового слова
-            for variant in generate_phonetic_variants(base_word):
-                aliases.add(variant)
-            
-            # И транслитерация базового слова
-            if base_word in TRANSLIT_MAP and isinstance(TRANSLIT_MAP[base_word], list):
-                for variant in TRANSLIT_MAP[base_word]:
-                    aliases.add(variant)
-                    for phonetic in generate_phonetic_variants(variant):
-                        aliases.add(phonetic)
-    
-    # Ищем латинский ключ для кириллического слова
-    for word in words:
-        for lat_key, cyr_variants in TRANSLIT_MAP.items():
-            if isinstance(cyr_variants, list) and word in cyr_variants:
-                aliases.add(lat_key)
-                other_words = [w for w in words if w != word]
-                if other_words:
-                    aliases.add(' '.join([lat_key] + other_words))
-                    aliases.add(' '.join(other_words + [lat_key]))
-    
-    # Убираем слишком короткие алиасы (меньше 3 символов)
-    aliases = {a for a in aliases if len(a) >= 3}
-    
-    return sorted(list(aliases))
+    return ALIAS_SERVICE.model_aliases(model_name)
 
 def generate_article_aliases(article_code):
     """
@@ -208,34 +135,15 @@ def generate_article_aliases(article_code):
     if not article_code:
         return []
     
-    # Словарь произношения цифр
-    digit_names = {
-        '0': ['ноль', 'нуль'],
-        '1': ['один', 'раз', 'адин'],
-        '2': ['два', 'двойка'],
-        '3': ['три', 'тройка'],
-        '4': ['четыре', 'четверка', 'читыре'],
-        '5': ['пять', 'пятерка', 'пьять'],
-        '6': ['шесть', 'шестерка', 'шэсть'],
-        '7': ['семь', 'семерка', 'сем'],
-        '8': ['восемь', 'восьмерка', 'восем'],
-        '9': ['девять', 'девятка', 'дивять']
-    }
-    
     aliases = set()
     code_str = str(article_code).strip()
     
     # Добавляем оригинал
     aliases.add(code_str)
     
-    # Генерируем произношение по цифрам
-    # Например: "10077127" → "один ноль ноль семь семь один два семь"
-    for i in range(len(code_str)):
-        digit = code_str[i]
-        if digit in digit_names:
-            # Генерируем все комбинации произношений
-            # Это будет использоваться для поиска
-            pass
+    # Произношение по цифрам ("10077127" → "один ноль ноль семь семь один два семь")
+    # не перечисляется: словарь DIGIT_NAMES и все коды компилируются в автомат
+    # (articleAutomaton.py, флаг --articles)
     
     # Добавляем варианты с пробелами между цифрами
     spaced = ' '.join(code_str)
@@ -264,93 +172,334 @@ def generate_brand_aliases(brand_name):
     # Если не найдено, возвращаем базовые алиасы
     return [brand_clean.lower()]
 
-def parse_excel_to_json(excel_path, output_path):
+SHEET_NAME = 'Мягкая мебель'
+FIRST_DATA_ROW = 8
+
+# Разбор названий: типы мебели и многословные бренды из BRAND_ALIASES (nameParser.py)
+NAME_PARSER = NameParser(BRAND_ALIASES)
+
+
+def iter_excel_rows(excel_path, streaming=True):
     """
-    Парсит Excel файл и создаёт JSON с алиасами
+    Читает строки листа "Мягкая мебель" как кортежи (код, название, описание)
+
+    streaming=True — read-only режим openpyxl с построчным итератором,
+    память не растёт вместе с листом.
+    streaming=False — прежний путь: полная загрузка книги и ws.cell()
     """
-    print(f"📖 Читаю файл: {excel_path}")
-    
-    wb = openpyxl.load_workbook(excel_path, data_only=True)
-    ws = wb['Мягкая мебель']
+    wb = openpyxl.load_workbook(excel_path, read_only=streaming, data_only=True)
+    try:
+        ws = wb[SHEET_NAME]
+        if streaming:
+            for row in ws.iter_rows(min_row=FIRST_DATA_ROW, max_col=4, values_only=True):
+                row = tuple(row) + (None,) * (4 - len(row))
+                yield row[0], row[1], row[3]
+        else:
+            for row in range(FIRST_DATA_ROW, ws.max_row + 1):
+                yield ws.cell(row, 1).value, ws.cell(row, 2).value, ws.cell(row, 4).value
+    finally:
+        wb.close()
+
+
+def clean_description(description):
+    """
+    Очищает описание от HTML
+    """
+    if not description:
+        return description
+    description = re.sub(r'<[^<]+?>', '', str(description))
+    description = unescape(description)
+    return re.sub(r'\s+', ' ', description).strip()
+
+
+def parse_brand_model(name_str):
+    """
+    Извлекает бренд и модель из названия товара
+    """
+    return NAME_PARSER.parse(name_str)
+
+
+def build_divan(kod, name, description, metrics=NULL_METRICS):
+    """
+    Собирает запись дивана с алиасами из одной строки Excel
+    """
+    name_str = str(name)
+    with metrics.stage('parse'):
+        brand, model = parse_brand_model(name_str)
+    with metrics.stage('brandAliases'):
+        brand_aliases = generate_brand_aliases(brand)
+    with metrics.stage('modelAliases'):
+        model_aliases = generate_model_aliases(model)
+    with metrics.stage('articleAliases'):
+        article_aliases = generate_article_aliases(kod)
+    with metrics.stage('description'):
+        description = clean_description(description) or 'Описание отсутствует'
+    
+    return {
+        'kod': str(kod),
+        'name': name_str,
+        'brand': brand,
+        'model': model,
+        'brandAliases': brand_aliases,
+        'modelAliases': model_aliases,
+        'articleAliases': article_aliases,
+        'description': description
+    }
+
+
+def iter_divans(rows, cache=None, metrics=NULL_METRICS):
+    """
+    Конвейер: строка → очистка → бренд/модель → алиасы
+
+    С cache (RowCache) неизменённые строки берутся из кэша
+    """
+    for kod, name, description in rows:
+        if kod and name:
+            if cache is None:
+                yield build_divan(kod, name, description, metrics)
+            else:
+                yield cache.build(kod, name, description, metrics)
+
+
+def _digest(value):
+    data = json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def brand_dependencies(brand):
+    """
+    Записи BRAND_ALIASES, от которых зависит generate_brand_aliases(brand)
+    (в порядке словаря — важно первое совпадение)
+    """
+    brand_clean = brand.strip()
+    if not brand_clean:
+        return []
+    brand_lower = brand_clean.lower()
+    return [
+        [key, aliases] for key, aliases in BRAND_ALIASES.items()
+        if key == brand_clean or key.lower() in brand_lower or brand_lower in key.lower()
+    ]
+
+
+def model_dependencies(model, reverse_translit):
+    """
+    Записи TRANSLIT_MAP, от которых зависит generate_model_aliases(model):
+    прямые варианты слов (и их основ без суффикса) и латинские ключи
+    """
+    words = model.lower().strip().split()
+    tokens = set(words)
+    for word in words:
+        tokens.add(re.sub(r'-?\d+$', '', word))
     
-    divans = []
+    direct = {
+        token: TRANSLIT_MAP[token] for token in tokens
+        if isinstance(TRANSLIT_MAP.get(token), list)
+    }
+    reverse = {
+        word: sorted(reverse_translit[word]) for word in words
+        if word in reverse_translit
+    }
+    return [direct, reverse]
+
+
+def generator_version():
+    """
+    Версия генераторов алиасов: исходный код функций и фонетические правила.
+    Таблицы BRAND_ALIASES/TRANSLIT_MAP сюда не входят — они учитываются
+    построчно через brand_dependencies/model_dependencies
+    """
+    functions = [
+        clean_description, parse_brand_model, generate_phonetic_variants,
+        generate_model_aliases, generate_brand_aliases, generate_article_aliases,
+        PhoneticEngine, NameParser, multiword_brands, AliasService,
+    ]
+    # Разбор названий зависит от многословных брендов и типов мебели;
+    # остальные ключи BRAND_ALIASES влияют только на свои строки
+    parser_tables = [multiword_brands(BRAND_ALIASES), FURNITURE_TYPES]
+    return _digest([PHONETIC_ENGINE.settings(), parser_tables] + [inspect.getsource(fn) for fn in functions])
+
+
+def render_version():
+    """
+    Версия готовых ответов (--render): исходный код responseRender.py
+    """
+    return _digest(inspect.getsource(inspect.getmodule(render_divan)))
+
+
+class RowCache:
+    """
+    Кэш построчной сборки для инкрементального режима.
+
+    Для каждой строки хранится хэш входа (код, название, описание),
+    отпечатки зависимостей бренда и модели и готовая запись. При изменении
+    BRAND_ALIASES/TRANSLIT_MAP пересчитываются только строки, чьи токены
+    затронуты правкой.
+
+    output — настройки, меняющие записи в JSON, но не в кэше (например,
+    render). Если они отличаются от прошлой сборки, каталог переписывается,
+    даже когда ни одна строка не изменилась
+    """
     
-    # Читаем данные начиная со строки 8
-    for row in range(8, ws.max_row + 1):
-        kod = ws.cell(row, 1).value  # A - код товара
-        name = ws.cell(row, 2).value  # B - название
-        description = ws.cell(row, 4).value  # D - общее описание
+    FORMAT = 1
+    
+    def __init__(self, path):
+        self.path = path
+        self.version = generator_version()
+        self.rows = {}
+        self.fresh = {}
+        self.order = []
+        self.output = {}
+        self.reused = 0
+        self.rebuilt_brand = 0
+        self.rebuilt_model = 0
+        self.rebuilt = 0
         
-        if kod and name:
-            # Очищаем HTML из описания
-            if description:
-                description = re.sub(r'<[^<]+?>', '', str(description))
-                description = unescape(description)
-                description = re.sub(r'\s+', ' ', description).strip()
-            
-            # Улучшенный парсинг бренда и модели
-            name_str = str(name)
-            
-            # Убираем тип мебели в начале
-            pattern = r'^(Диван\s+(угловой\s+|П-образный\s+)?|Кресло(-кровать|-реклайнер|\s+мягкое)?\s+|Комплект\s+.*?\s+|Модуль\s+мягкий\s+|Пуф(-трансформер)?\s+|Тахта(\s+угловая)?\s+|Уголок\s+.*?\s+|Скамья\s+.*?\s+|Оттоманка\s+)'
-            cleaned_name = re.sub(pattern, '', name_str, flags=re.IGNORECASE).strip()
-            
-            # Специальная обработка для "Mio Tesoro" (двухсловный бренд)
-            brand = ""
-            model = ""
-            
-            if cleaned_name.startswith('Mio Tesoro') or cleaned_name.startswith('Mio tesoro'):
-                brand = 'Mio Tesoro'
-                model = cleaned_name[10:].strip()  # Убираем "Mio Tesoro"
-                # Убираем всё после скобки
-                if '(' in model:
-                    model = model[:model.index('(')].strip()
-            elif cleaned_name.startswith('Moon Trade') or cleaned_name.startswith('Moon trade'):
-                brand = 'Moon Trade'
-                model = cleaned_name[10:].strip()
-                if '(' in model:
-                    model = model[:model.index('(')].strip()
-            else:
-                # Обычный парсинг для односложных брендов
-                match = re.search(r'^([A-Za-zА-Яа-я\s]+?)\s+([A-Za-zА-Яа-я0-9\s\-]+?)(?:\s*\(|$)', cleaned_name)
-                if match:
-                    brand = match.group(1).strip()
-                    model = match.group(2).strip()
-            
-            # Генерируем алиасы
-            brand_aliases = generate_brand_aliases(brand)
-            model_aliases = generate_model_aliases(model)
-            article_aliases = generate_article_aliases(kod)
-            
-            divans.append({
-                'kod': str(kod),
-                'name': name_str,
-                'brand': brand,
-                'model': model,
-                'brandAliases': brand_aliases,
-                'modelAliases': model_aliases,
-                'articleAliases': article_aliases,
-                'description': description or 'Описание отсутствует'
-            })
-    
-    # Сохраняем в JSON
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump({'divans': divans}, f, ensure_ascii=False, indent=2)
-    
-    print(f"✅ Сохранено {len(divans)} диванов в {output_path}")
-    
-    # Статистика
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        
+        if data and data.get('format') == self.FORMAT and data.get('version') == self.version:
+            self.rows = data['rows']
+            self.previous_order = data.get('order', [])
+            self.previous_output = data.get('output')
+        else:
+            self.previous_order = None
+            self.previous_output = None
+    
+    def build(self, kod, name, description, metrics=NULL_METRICS):
+        key = str(kod)
+        input_hash = _digest([key, str(name), description])
+        entry = self.rows.get(key)
+        
+        if entry is None or entry['input'] != input_hash:
+            record = build_divan(kod, name, description, metrics)
+            brand_deps = _digest(brand_dependencies(record['brand']))
+            model_deps = _digest(model_dependencies(record['model'], ALIAS_SERVICE.reverse_translit))
+            self.rebuilt += 1
+        else:
+            record = entry['record']
+            brand_deps = _digest(brand_dependencies(record['brand']))
+            model_deps = _digest(model_dependencies(record['model'], ALIAS_SERVICE.reverse_translit))
+            changed = False
+            if brand_deps != entry['brand']:
+                with metrics.stage('brandAliases'):
+                    record['brandAliases'] = generate_brand_aliases(record['brand'])
+                self.rebuilt_brand += 1
+                changed = True
+            if model_deps != entry['model']:
+                with metrics.stage('modelAliases'):
+                    record['modelAliases'] = generate_model_aliases(record['model'])
+                self.rebuilt_model += 1
+                changed = True
+            if not changed:
+                self.reused += 1
+        
+        self.fresh[key] = {
+            'input': input_hash,
+            'brand': brand_deps,
+            'model': model_deps,
+            'record': record,
+        }
+        self.order.append(key)
+        return record
+    
+    @property
+    def unchanged(self):
+        """
+        Каталог совпадает с предыдущей сборкой: ни одна строка не пересчитана,
+        порядок строк и настройки вывода те же
+        """
+        return (self.rebuilt == 0 and self.rebuilt_brand == 0 and self.rebuilt_model == 0
+                and self.order == self.previous_order and self.output == self.previous_output)
+    
+    def next_build(self):
+        """
+        Следующая сборка в том же процессе (watchCatalog.py): только что
+        собранные строки становятся кэшем, файл кэша заново не читается
+        """
+        self.rows = self.fresh
+        self.previous_order = self.order
+        self.previous_output = self.output
+        self.fresh = {}
+        self.order = []
+        self.reused = 0
+        self.rebuilt_brand = 0
+        self.rebuilt_model = 0
+        self.rebuilt = 0
+    
+    def save(self):
+        with atomic_write(self.path) as f:
+            json.dump({
+                'format': self.FORMAT,
+                'version': self.version,
+                'order': self.order,
+                'output': self.output,
+                'rows': self.fresh,
+            }, f, ensure_ascii=False)
+    
+    def report(self):
+        return {
+            'reused': self.reused,
+            'rebuilt': self.rebuilt,
+            'rebuiltBrand': self.rebuilt_brand,
+            'rebuiltModel': self.rebuilt_model,
+        }
+    
+    def print_summary(self):
+        report = self.report()
+        print(f"\n♻️  Инкрементальная сборка:")
+        print(f"   Из кэша: {report['reused']}")
+        print(f"   Новые/изменённые строки: {report['rebuilt']}")
+        print(f"   Пересчитаны алиасы бренда: {report['rebuiltBrand']}")
+        print(f"   Пересчитаны алиасы модели: {report['rebuiltModel']}")
+
+
+class AliasStats:
+    """
+    Собирает статистику алиасов на лету, пропуская записи дальше по конвейеру
+    """
+    
+    FIELDS = ('brandAliases', 'modelAliases', 'articleAliases')
+    
+    def __init__(self, examples=3):
+        self.examples_limit = examples
+        self.examples = []
+        self.counts = {field: [] for field in self.FIELDS}
+    
+    def track(self, divans):
+        for divan in divans:
+            for field, counts in self.counts.items():
+                counts.append(len(divan[field]))
+            if len(self.examples) < self.examples_limit:
+                self.examples.append(divan)
+            yield divan
+    
+    def report(self):
+        """
+        Суммы алиасов, распределение по товарам и первые записи
+        """
+        return {
+            'totals': {field: sum(counts) for field, counts in self.counts.items()},
+            'perProduct': {field: histogram(counts) for field, counts in self.counts.items()},
+            'examples': [
+                {key: divan[key] for key in ('kod', 'name', 'brand', 'model', 'brandAliases', 'modelAliases')}
+                for divan in self.examples
+            ],
+        }
+
+
+def print_stats(report):
+    totals = report['totals']
     print(f"\n📊 Статистика алиасов:")
-    total_brand_aliases = sum(len(d['brandAliases']) for d in divans)
-    total_model_aliases = sum(len(d['modelAliases']) for d in divans)
-    total_article_aliases = sum(len(d['articleAliases']) for d in divans)
-    print(f"   Всего алиасов брендов: {total_brand_aliases}")
-    print(f"   Всего алиасов моделей: {total_model_aliases}")
-    print(f"   Всего алиасов артикулов: {total_article_aliases}")
+    print(f"   Всего алиасов брендов: {totals['brandAliases']}")
+    print(f"   Всего алиасов моделей: {totals['modelAliases']}")
+    print(f"   Всего алиасов артикулов: {totals['articleAliases']}")
     
     # Примеры
     print(f"\n📝 Примеры (первые 3):")
-    for i, divan in enumerate(divans[:3], 1):
+    for i, divan in enumerate(report['examples'], 1):
         print(f"\n{i}. {divan['name'][:60]}")
         print(f"   Код: {divan['kod']}")
         print(f"   Бренд: {divan['brand']}")
@@ -360,8 +509,260 @@ def parse_excel_to_json(excel_path, output_path):
         if len(divan['modelAliases']) > 8:
             print(f"      ... и еще {len(divan['modelAliases']) - 8} алиасов")
 
+
+def parse_excel_to_json(excel_path, output_path, streaming=True, verbose=True, incremental=False,
+                        compact=False, render=False, diff=False, profile=False, cache=None,
+                        rows=None, divans=None):
+    """
+    Парсит Excel файл и создаёт JSON с алиасами
+
+    streaming=True — потоковый режим: строки читаются и пишутся по одной.
+    streaming=False — прежний режим: полная загрузка книги и json.dump
+    incremental=True — алиасы пересчитываются только для новых и изменённых
+    строк, остальное берётся из кэша рядом с JSON (<output>.cache)
+    compact=True — дополнительно компактный каталог (divans.compact.json)
+    и описания отдельным файлом (divans.descriptions.json)
+    render=True — в каждую запись добавляется готовый ответ (поле response):
+    первый ответ в пределах лимита Алисы, продолжения и краткое описание
+    diff=True — divans.json не переписывается, вместо него пишется журнал
+    изменений относительно текущего файла (divans.changelog.json)
+    profile=True — время и память по этапам и товарам, гистограммы алиасов
+    и профиль cProfile в divans.metrics.json / divans.profile (buildMetrics.py)
+    cache — готовый RowCache (режим наблюдения держит его в памяти между
+    сборками); включает инкрементальный режим
+    rows — строки (код, название, описание), уже прочитанные из книги;
+    divans — уже собранные записи (updateCatalog.py читает книгу один раз
+    и разбирает строки в пуле процессов). С ними книга не читается, с divans
+    не используется и кэш строк
+
+    Каталог заменяется атомарно (временный файл, fsync, переименование)
+    """
+    if verbose:
+        print(f"📖 Читаю файл: {excel_path}")
+    
+    metrics = BuildMetrics('divans').start() if profile else NULL_METRICS
+    if cache is None and incremental:
+        cache = RowCache(output_path + '.cache')
+    if cache is not None:
+        cache.output = {'render': render_version() if render else False}
+    stats = AliasStats()
+    # Записи, собранные в пуле процессов, не проходят через NAME_PARSER,
+    # ALIAS_SERVICE и PHONETIC_ENGINE этого процесса: их сводки пустые
+    built_here = divans is None
+    if built_here:
+        if rows is None:
+            rows = iter_excel_rows(excel_path, streaming)
+        rows = metrics.timed('read', rows)
+        divans = metrics.timed('build', iter_divans(rows, cache, metrics), product=lambda divan: {
+            'id': divan['kod'],
+            'aliases': len(divan['brandAliases']) + len(divan['modelAliases']) + len(divan['articleAliases']),
+        }, exclude=('read',))
+    divans = stats.track(divans)
+    render_stats = RenderStats() if render else None
+    if render:
+        divans = metrics.timed('render', (
+            dict(divan, response=render_stats.track(render_divan(divan))) for divan in divans
+        ))
+    
+    with metrics.stage('write'):
+        if diff:
+            # Кэш не сохраняем: каталог остаётся прежним, и следующий
+            # инкрементальный запуск должен увидеть те же изменения
+            count = write_changelog(divans, output_path, 'divans', 'kod', verbose=verbose)
+        elif cache is not None:
+            # Сначала прогоняем строки через кэш: если ничего не изменилось,
+            # JSON не переписываем
+            divans = list(divans)
+            count = len(divans)
+            if cache.unchanged and os.path.exists(output_path):
+                if verbose:
+                    print(f"✅ Изменений нет, {output_path} не переписан")
+            else:
+                write_json_stream(divans, output_path, 'divans')
+                if verbose:
+                    print(f"✅ Сохранено {count} диванов в {output_path}")
+            cache.save()
+            if verbose:
+                cache.print_summary()
+        elif streaming:
+            count = write_json_stream(divans, output_path, 'divans')
+        else:
+            divans = list(divans)
+            count = len(divans)
+            write_json({'divans': divans}, output_path, ensure_ascii=False, indent=2)
+    
+    alias_report = stats.report()
+    if verbose:
+        if cache is None and not diff:
+            print(f"✅ Сохранено {count} диванов в {output_path}")
+        print_stats(alias_report)
+        if built_here:
+            NAME_PARSER.print_summary()
+            ALIAS_SERVICE.print_summary()
+            PHONETIC_ENGINE.print_report()
+        if render_stats is not None:
+            render_stats.print_summary()
+    
+    if compact and not diff:
+        with metrics.stage('compact'):
+            write_divans_compact(output_path)
+    
+    if metrics.enabled:
+        metrics.section('aliases', alias_report)
+        if built_here:
+            metrics.section('nameParser', NAME_PARSER.report())
+            metrics.section('aliasService', ALIAS_SERVICE.report())
+            metrics.section('phonetic', PHONETIC_ENGINE.report())
+        if cache is not None:
+            metrics.section('rowCache', cache.report())
+        if render_stats is not None:
+            metrics.section('render', render_stats.report())
+        metrics.write(output_path, verbose=verbose)
+    
+    return count
+
+
+def write_divans_compact(output_path):
+    """
+    Компактный каталог из готового divans.json
+    """
+    with open(output_path, 'r', encoding='utf-8') as f:
+        divans = json.load(f)['divans']
+    return write_compact_catalog(
+        divans, 'divans', output_path,
+        list_fields=('brandAliases', 'modelAliases', 'articleAliases'),
+    )
+
+
+def write_divans_index(output_path):
+    """
+    Инвертированный индекс алиасов рядом с divans.json (divans.index.json)
+    """
+    return write_alias_index(
+        output_path, 'divans', 'kod',
+        brand_aliases=lambda divan: divan['brandAliases'] + [divan['brand']],
+        model_aliases=lambda divan: divan['modelAliases'] + [divan['model']],
+    )
+
+
+def write_divans_articles(output_path):
+    """
+    Автомат артикулов, произнесённых по цифрам (divans.articles.json)
+    """
+    return write_article_automaton(output_path, 'divans', 'kod')
+
+
+def write_divans_trigrams(output_path):
+    """
+    Матрица триграмм для ранжированного поиска (divans.trigrams.json)
+    """
+    return write_trigram_matrix(output_path, 'divans', 'kod', divan_texts,
+                                secondary_texts=divan_secondary_texts)
+
+
+def write_divans_keys(output_path):
+    """
+    Каталог с фонетическими ключами вместо списков алиасов (divans.keys.json)
+    """
+    with open(output_path, 'r', encoding='utf-8') as f:
+        divans = json.load(f)['divans']
+    return write_key_catalog(
+        divans, 'divans', PHONETIC_RULES, keys_path_for(output_path),
+        brand_aliases=lambda divan: divan['brandAliases'] + [divan['brand']],
+        model_aliases=lambda divan: divan['modelAliases'] + [divan['model']],
+        drop_fields=('brandAliases', 'modelAliases'),
+    )
+
+
+def divan_category(divan):
+    """
+    Категория дивана для шардирования — тип мебели из названия (диван, кресло, пуф...)
+    """
+    words = divan['name'].split()
+    return words[0].lower() if words else 'other'
+
+
+def write_divans_shards(output_path, shard_dir, workers=None):
+    """
+    Шарды divans.json по бренду и категории + манифест
+    """
+    with open(output_path, 'r', encoding='utf-8') as f:
+        divans = json.load(f)['divans']
+    return write_shards(
+        divans, 'divans', shard_dir,
+        brand_of=lambda divan: divan['brand'] or 'other',
+        category_of=divan_category,
+        brand_aliases_of=lambda divan: divan['brandAliases'],
+        workers=workers,
+    )
+
+
+def compare_ingestion_modes(excel_path):
+    """
+    Строит JSON обоими путями (потоковым и прежним) и сравнивает побайтно
+    """
+    import tempfile
+    import time
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = {}
+        for mode, streaming in (('legacy', False), ('streaming', True)):
+            path = os.path.join(tmp_dir, f'divans.{mode}.json')
+            started = time.perf_counter()
+            parse_excel_to_json(excel_path, path, streaming=streaming, verbose=False)
+            elapsed = time.perf_counter() - started
+            with open(path, 'rb') as f:
+                results[mode] = f.read()
+            print(f"   {mode}: {elapsed:.2f} с, {len(results[mode])} байт")
+    
+    identical = results['legacy'] == results['streaming']
+    if identical:
+        print("✅ Результаты побайтно совпадают")
+    else:
+        print("❌ Результаты различаются")
+    return identical
+
 if __name__ == '__main__':
-    import os
+    import argparse
+    import sys
+    
+    parser = argparse.ArgumentParser(description='Обновление базы данных диванов')
+    parser.add_argument('--legacy', action='store_true',
+                        help='прежний режим чтения (полная загрузка книги)')
+    parser.add_argument('--compare', action='store_true',
+                        help='сравнить потоковый и прежний режим побайтно')
+    parser.add_argument('--incremental', action='store_true',
+                        help='пересчитывать алиасы только для изменённых строк')
+    parser.add_argument('--index', action='store_true',
+                        help='построить инвертированный индекс алиасов (divans.index.json)')
+    parser.add_argument('--compact', action='store_true',
+                        help='компактный каталог с интернированными алиасами (divans.compact.json)')
+    parser.add_argument('--shards', action='store_true',
+                        help='шарды по бренду и категории с манифестом (src/data/shards)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='число процессов для записи шардов')
+    parser.add_argument('--phonetic-keys', action='store_true',
+                        help='каталог с фонетическими ключами вместо алиасов (divans.keys.json)')
+    parser.add_argument('--articles', action='store_true',
+                        help='автомат артикулов, произнесённых по цифрам (divans.articles.json)')
+    parser.add_argument('--trigrams', action='store_true',
+                        help='матрица триграмм для ранжированного поиска top-k (divans.trigrams.json)')
+    parser.add_argument('--diff', action='store_true',
+                        help='не переписывать divans.json, а записать журнал изменений (divans.changelog.json)')
+    parser.add_argument('--render', action='store_true',
+                        help='добавить готовые ответы с разбивкой длинных описаний (поле response)')
+    parser.add_argument('--profile', action='store_true',
+                        help='метрики по этапам и товарам и профиль cProfile (divans.metrics.json, divans.profile)')
+    add_phonetic_arguments(parser)
+    args = parser.parse_args()
+    # Производные файлы строятся из divans.json, который в --diff не меняется
+    if args.diff:
+        derived = [flag for flag, enabled in (('--index', args.index), ('--phonetic-keys', args.phonetic_keys),
+                                              ('--articles', args.articles), ('--trigrams', args.trigrams),
+                                              ('--shards', args.shards)) if enabled]
+        if derived:
+            parser.error(f"--diff нельзя сочетать с {', '.join(derived)}: каталог не переписывается")
+    configure_from_args(PHONETIC_ENGINE, args)
     
     # Определяем пути
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -369,7 +770,22 @@ if __name__ == '__main__':
     excel_path = os.path.join(project_dir, 'Файл для диванов', 'Диваны, крессла, матрасы розница (1).xlsx')
     output_path = os.path.join(project_dir, 'src', 'data', 'divans.json')
     
+    if args.compare:
+        print("🔬 Сравнение режимов чтения\n")
+        sys.exit(0 if compare_ingestion_modes(excel_path) else 1)
+    
     print("🚀 Обновление базы данных диванов\n")
-    parse_excel_to_json(excel_path, output_path)
+    parse_excel_to_json(excel_path, output_path, streaming=not args.legacy,
+                        incremental=args.incremental, compact=args.compact, render=args.render,
+                        diff=args.diff, profile=args.profile)
+    if args.index:
+        write_divans_index(output_path)
+    if args.phonetic_keys:
+        write_divans_keys(output_path)
+    if args.articles:
+        write_divans_articles(output_path)
+    if args.trigrams:
+        write_divans_trigrams(output_path)
+    if args.shards:
+        write_divans_shards(output_path, os.path.join(project_dir, 'src', 'data', 'shards'), args.workers)
     print("\n✨ Готово!")
-
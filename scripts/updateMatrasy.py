@@ -6,6 +6,18 @@
 import json
 import re
 
+from aliasIndex import write_alias_index
+from aliasService import AliasService
+from buildMetrics import NULL_METRICS, BuildMetrics, histogram
+from catalogShards import write_shards
+from catalogWriter import write_changelog, write_json
+from compactCatalog import write_compact_catalog
+from docxDescriptions import ingest_docx_descriptions
+from phoneticKey import keys_path_for, write_key_catalog
+from phoneticVariants import PhoneticEngine, add_phonetic_arguments, configure_from_args
+from responseRender import RenderStats, render_matras
+from trigramMatrix import matras_secondary_texts, matras_texts, write_trigram_matrix
+
 # Фонетические правила замен
 PHONETIC_RULES = [
     ('е', 'э'), ('э', 'е'),  # е/э
@@ -20,6 +32,18 @@ PHONETIC_RULES = [
     ('тт', 'т'), ('т', 'тт'),
 ]
 
+# Варианты брендов (кириллица и латиница) для комбинаций с моделью
+BRAND_VARIANTS = {
+    'lagoma': {
+        'cyrillic': ['лагома', 'лагуна', 'лагона', 'логома', 'лагомо', 'лагоома', 'лагоума', 'лагомма'],
+        'latin': ['lagoma', 'lagooma', 'lagona', 'logoma', 'lagomo', 'lagouma'],
+    },
+    'veluna': {
+        'cyrillic': ['велуна', 'велюна', 'илуна', 'вилуна', 'виллуна', 'вэлуна', 'велуно', 'велюно', 'илуно', 'вилуно', 'виллуно'],
+        'latin': ['veluna', 'veluno', 'veluna', 'iluna', 'iluno', 'viluna', 'villuna', 'viluno', 'villuno'],
+    },
+}
+
 # Специальные транслитерации для моделей
 TRANSLIT_MAP = {
     # Lagoma модели
@@ -44,139 +68,275 @@ TRANSLIT_MAP = {
     'lenwig': ['ленвик'],
 }
 
+PHONETIC_ENGINE = PhoneticEngine(PHONETIC_RULES)
+ALIAS_SERVICE = AliasService(TRANSLIT_MAP, PHONETIC_ENGINE)
+
 def generate_phonetic_variants(word):
     """
     Генерирует фонетические варианты произношения слова
+    (замыкание PHONETIC_RULES с кэшем по токену, см. phoneticVariants.py)
     """
-    variants = set([word])
-    
-    for old, new in PHONETIC_RULES:
-        if old in word:
-            variants.add(word.replace(old, new))
-    
-    return variants
+    return PHONETIC_ENGINE.variants(word)
 
 def generate_model_aliases_enhanced(model_name, brand_name):
     """
     Генерирует расширенные алиасы для модели с фонетическими вариантами
+    (общий сервис с LRU-кэшем по модели, см. aliasService.py)
     """
-    aliases = set()
-    model_lower = model_name.lower().strip()
-    brand_lower = brand_name.lower().strip()
-    
-    # Добавляем оригинал
-    aliases.add(model_lower)
-    
-    # Варианты бренда
-    brand_variants = []
-    brand_variants_latin = []
-    
-    if brand_lower == 'lagoma':
-        brand_variants = ['лагома', 'лагуна', 'лагона', 'логома', 'лагомо', 'лагоома', 'лагоума', 'лагомма']
-        brand_variants_latin = ['lagoma', 'lagooma', 'lagona', 'logoma', 'lagomo', 'lagouma']
-    elif brand_lower == 'veluna':
-        brand_variants = ['велуна', 'велюна', 'илуна', 'вилуна', 'виллуна', 'вэлуна', 'велуно', 'велюно', 'илуно', 'вилуно', 'виллуно']
-        brand_variants_latin = ['veluna', 'veluno', 'veluna', 'iluna', 'iluno', 'viluna', 'villuna', 'viluno', 'villuno']
-    
-    # Фонетические варианты модели
-    for variant in generate_phonetic_variants(model_lower):
-        aliases.add(variant)
-    
-    # Специальные транслитерации
-    if model_lower in TRANSLIT_MAP:
-        for translit in TRANSLIT_MAP[model_lower]:
-            aliases.add(translit)
-            # Фонетические варианты транслитерации
-            for phonetic in generate_phonetic_variants(translit):
-                aliases.add(phonetic)
-    
-    # Ищем латинский ключ для кириллического слова
-    for lat_key, cyr_variants in TRANSLIT_MAP.items():
-        if model_lower in cyr_variants:
-            aliases.add(lat_key)
-    
-    # Комбинации с брендом (кириллица)
-    for brand_var in brand_variants:
-        aliases.add(f"{brand_var} {model_lower}")
-        
-        # С транслитерациями
-        if model_lower in TRANSLIT_MAP:
-            for translit in TRANSLIT_MAP[model_lower]:
-                aliases.add(f"{brand_var} {translit}")
-    
-    # Латинские комбинации с брендом
-    for brand_lat in brand_variants_latin:
-        aliases.add(f"{brand_lat} {model_lower}")
-        
-        # С транслитерациями
-        if model_lower in TRANSLIT_MAP:
-            for translit in TRANSLIT_MAP[model_lower]:
-                # Только латинские транслитерации
-                if any(c in 'abcdefghijklmnopqrstuvwxyz' for c in translit):
-                    aliases.add(f"{brand_lat} {translit}")
-    
-    # Базовые латинские комбинации
-    aliases.add(f"{brand_lower} {model_lower}")
-    
-    # Убираем слишком короткие алиасы
-    aliases = {a for a in aliases if len(a) >= 3}
-    
-    return sorted(list(aliases))
+    return ALIAS_SERVICE.matras_aliases(model_name, brand_name, BRAND_VARIANTS)
 
-def update_matrasy_json(input_path, output_path):
+def update_matrasy_json(input_path, output_path, compact=False, docx_dir=None, workers=None,
+                        render=False, diff=False, profile=False, verbose=True, data=None):
     """
     Обновляет JSON файл с матрасами, добавляя фонетические алиасы
+
+    compact=True — дополнительно компактный каталог (matrasy.compact.json)
+    и описания отдельным файлом (matrasy.descriptions.json)
+    docx_dir — папка с описаниями .docx: текст попадает в description
+    записи с тем же id (кэш рядом с JSON, <output>.docx.cache)
+    render=True — в каждую запись добавляется готовый ответ (поле response)
+    diff=True — matrasy.json не переписывается, пишется журнал изменений
+    (matrasy.changelog.json)
+    profile=True — время и память по этапам и матрасам, гистограммы алиасов
+    и профиль cProfile в matrasy.metrics.json / matrasy.profile (buildMetrics.py)
+    data — уже собранный каталог {'matrasy': [...]} (updateCatalog.py
+    собирает его из листа «Матрасы»); тогда input_path не читается
+
+    Файл заменяется атомарно: вход и выход обычно один и тот же файл.
+    Возвращает число матрасов
     """
-    print(f"📖 Читаю файл: {input_path}")
+    if verbose and data is None:
+        print(f"📖 Читаю файл: {input_path}")
     
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    metrics = BuildMetrics('matrasy').start() if profile else NULL_METRICS
+    if data is None:
+        with metrics.stage('read'):
+            with open(input_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+    
+    if docx_dir:
+        with metrics.stage('docx'):
+            merge_docx_descriptions(data['matrasy'], docx_dir, output_path + '.docx.cache', workers, verbose)
     
     updated_count = 0
-    total_aliases_before = 0
-    total_aliases_after = 0
+    aliases_before = []
     
-    for matras in data['matrasy']:
-        brand = matras['brand']
-        model = matras['model']
-        
-        # Сохраняем старые алиасы для статистики
-        old_aliases = matras.get('aliases', [])
-        total_aliases_before += len(old_aliases)
-        
-        # Генерируем новые расширенные алиасы
-        new_aliases = generate_model_aliases_enhanced(model, brand)
-        
-        # Объединяем со старыми (на случай если там есть уникальные)
-        combined_aliases = list(set(old_aliases + new_aliases))
-        combined_aliases.sort()
-        
-        matras['aliases'] = combined_aliases
-        total_aliases_after += len(combined_aliases)
-        updated_count += 1
+    with metrics.stage('aliases'):
+        for matras in data['matrasy']:
+            with metrics.product(matras['id']) as item:
+                brand = matras['brand']
+                model = matras['model']
+                
+                # Сохраняем старые алиасы для статистики
+                old_aliases = matras.get('aliases', [])
+                aliases_before.append(len(old_aliases))
+                
+                # Генерируем новые расширенные алиасы
+                new_aliases = generate_model_aliases_enhanced(model, brand)
+                
+                # Объединяем со старыми (на случай если там есть уникальные)
+                combined_aliases = list(set(old_aliases + new_aliases))
+                combined_aliases.sort()
+                
+                matras['aliases'] = combined_aliases
+                item['aliases'] = len(combined_aliases)
+                updated_count += 1
+    
+    # Готовые ответы пересчитываются при каждом запуске: без --render
+    # устаревшее поле response убирается
+    render_stats = RenderStats() if render else None
+    with metrics.stage('render'):
+        for matras in data['matrasy']:
+            matras.pop('response', None)
+            if render:
+                matras['response'] = render_stats.track(render_matras(matras))
     
     # Сохраняем обновлённый JSON
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with metrics.stage('write'):
+        if diff:
+            write_changelog(data['matrasy'], output_path, 'matrasy', 'id', verbose=verbose)
+        else:
+            write_json(data, output_path, ensure_ascii=False, indent=2)
     
-    print(f"✅ Обновлено {updated_count} матрасов")
+    alias_report = matras_alias_report(data['matrasy'], aliases_before)
+    if verbose:
+        print(f"✅ Обновлено {updated_count} матрасов")
+        print_alias_report(alias_report)
+        
+        ALIAS_SERVICE.print_summary()
+        PHONETIC_ENGINE.print_report()
+        if render_stats is not None:
+            render_stats.print_summary()
+    
+    if compact and not diff:
+        with metrics.stage('compact'):
+            write_compact_catalog(data['matrasy'], 'matrasy', output_path, list_fields=('aliases', 'features'))
+    
+    if metrics.enabled:
+        metrics.section('aliases', alias_report)
+        metrics.section('aliasService', ALIAS_SERVICE.report())
+        metrics.section('phonetic', PHONETIC_ENGINE.report())
+        if render_stats is not None:
+            metrics.section('render', render_stats.report())
+        metrics.write(output_path, verbose=verbose)
+    
+    return updated_count
+
+def matras_alias_report(matrasy, aliases_before, examples=3):
+    """
+    Алиасы до и после обновления, распределение по матрасам и первые записи
+    """
+    aliases_after = [len(matras['aliases']) for matras in matrasy]
+    return {
+        'before': sum(aliases_before),
+        'after': sum(aliases_after),
+        'perProduct': {
+            'before': histogram(aliases_before),
+            'after': histogram(aliases_after),
+        },
+        'examples': [
+            {key: matras[key] for key in ('id', 'brand', 'model', 'aliases')}
+            for matras in matrasy[:examples]
+        ],
+    }
+
+def print_alias_report(report):
+    before = report['before']
+    after = report['after']
     print(f"\n📊 Статистика алиасов:")
-    print(f"   Было: {total_aliases_before}")
-    print(f"   Стало: {total_aliases_after}")
-    print(f"   Прирост: +{total_aliases_after - total_aliases_before} ({int((total_aliases_after / total_aliases_before - 1) * 100)}%)")
+    print(f"   Было: {before}")
+    print(f"   Стало: {after}")
+    print(f"   Прирост: +{after - before} ({int((after / before - 1) * 100)}%)")
     
     # Примеры
     print(f"\n📝 Примеры (первые 3):")
-    for i, matras in enumerate(data['matrasy'][:3], 1):
+    for i, matras in enumerate(report['examples'], 1):
         print(f"\n{i}. {matras['brand']} {matras['model']}")
         print(f"   Алиасов: {len(matras['aliases'])}")
         print(f"   Примеры: {', '.join(matras['aliases'][:10])}")
         if len(matras['aliases']) > 10:
             print(f"   ... и еще {len(matras['aliases']) - 10} алиасов")
 
+def merge_docx_descriptions(matrasy, docx_dir, cache_path, workers=None, verbose=True):
+    """
+    Подставляет описания из .docx в записи с совпадающим id
+    """
+    descriptions = ingest_docx_descriptions(docx_dir, cache_path, workers, verbose)
+    known_ids = {matras['id'] for matras in matrasy}
+    
+    changed = 0
+    for matras in matrasy:
+        text = descriptions.get(matras['id'])
+        if text and text != matras.get('description'):
+            matras['description'] = text
+            changed += 1
+    
+    if verbose:
+        print(f"   Обновлено описаний: {changed}")
+        for docx_matras_id in sorted(set(descriptions) - known_ids):
+            print(f"   ⚠️  Нет матраса с id '{docx_matras_id}'")
+
+def matras_brand_aliases(matras):
+    """
+    Алиасы бренда матраса для индекса: название бренда и его варианты
+    """
+    brand_lower = matras['brand'].lower().strip()
+    variants = BRAND_VARIANTS.get(brand_lower, {})
+    return [brand_lower] + variants.get('cyrillic', []) + variants.get('latin', [])
+
+def write_matrasy_index(output_path):
+    """
+    Инвертированный индекс алиасов рядом с matrasy.json (matrasy.index.json)
+    """
+    return write_alias_index(
+        output_path, 'matrasy', 'id',
+        brand_aliases=matras_brand_aliases,
+        model_aliases=lambda matras: matras['aliases'] + [matras['model']],
+    )
+
+def write_matrasy_trigrams(output_path):
+    """
+    Матрица триграмм для ранжированного поиска (matrasy.trigrams.json)
+    """
+    return write_trigram_matrix(output_path, 'matrasy', 'id', matras_texts, name_field='fullName',
+                                secondary_texts=matras_secondary_texts)
+
+def matras_model_aliases(matras):
+    """
+    Алиасы модели матраса без префикса бренда ("велуна лаома" → "лаома"):
+    бренд и так сопоставляется по своим ключам
+    """
+    brand_words = set(matras_brand_aliases(matras))
+    aliases = set([matras['model'].lower()])
+    for alias in matras['aliases']:
+        words = alias.split()
+        if len(words) > 1 and words[0] in brand_words:
+            words = words[1:]
+        aliases.add(' '.join(words))
+    return sorted(aliases)
+
+def write_matrasy_keys(output_path):
+    """
+    Каталог с фонетическими ключами вместо списков алиасов (matrasy.keys.json)
+    """
+    with open(output_path, 'r', encoding='utf-8') as f:
+        matrasy = json.load(f)['matrasy']
+    return write_key_catalog(
+        matrasy, 'matrasy', PHONETIC_RULES, keys_path_for(output_path),
+        brand_aliases=matras_brand_aliases,
+        model_aliases=matras_model_aliases,
+        drop_fields=('aliases',),
+    )
+
+def write_matrasy_shards(output_path, shard_dir, workers=None):
+    """
+    Шарды matrasy.json по бренду + манифест
+    """
+    with open(output_path, 'r', encoding='utf-8') as f:
+        matrasy = json.load(f)['matrasy']
+    return write_shards(
+        matrasy, 'matrasy', shard_dir,
+        brand_of=lambda matras: matras['brand'],
+        category_of=lambda matras: 'матрас',
+        brand_aliases_of=matras_brand_aliases,
+        workers=workers,
+    )
+
 if __name__ == '__main__':
+    import argparse
     import os
     
+    parser = argparse.ArgumentParser(description='Обновление алиасов матрасов')
+    parser.add_argument('--index', action='store_true',
+                        help='построить инвертированный индекс алиасов (matrasy.index.json)')
+    parser.add_argument('--compact', action='store_true',
+                        help='компактный каталог с интернированными алиасами (matrasy.compact.json)')
+    parser.add_argument('--shards', action='store_true',
+                        help='шарды по бренду с манифестом (src/data/shards)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='число процессов для записи шардов и разбора .docx')
+    parser.add_argument('--docx', action='store_true',
+                        help="подтянуть описания из папки 'Описание матрасов'")
+    parser.add_argument('--diff', action='store_true',
+                        help='не переписывать matrasy.json, а записать журнал изменений (matrasy.changelog.json)')
+    parser.add_argument('--render', action='store_true',
+                        help='добавить готовые ответы с разбивкой длинных описаний (поле response)')
+    parser.add_argument('--phonetic-keys', action='store_true',
+                        help='каталог с фонетическими ключами вместо алиасов (matrasy.keys.json)')
+    parser.add_argument('--trigrams', action='store_true',
+                        help='матрица триграмм для ранжированного поиска top-k (matrasy.trigrams.json)')
+    parser.add_argument('--profile', action='store_true',
+                        help='метрики по этапам и матрасам и профиль cProfile (matrasy.metrics.json, matrasy.profile)')
+    add_phonetic_arguments(parser)
+    args = parser.parse_args()
+    # Производные файлы строятся из matrasy.json, который в --diff не меняется
+    if args.diff:
+        derived = [flag for flag, enabled in (('--index', args.index), ('--phonetic-keys', args.phonetic_keys),
+                                              ('--trigrams', args.trigrams), ('--shards', args.shards)) if enabled]
+        if derived:
+            parser.error(f"--diff нельзя сочетать с {', '.join(derived)}: каталог не переписывается")
+    configure_from_args(PHONETIC_ENGINE, args)
+    
     # Определяем пути
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_dir = os.path.dirname(script_dir)
@@ -184,6 +344,15 @@ if __name__ == '__main__':
     output_path = input_path  # Перезаписываем тот же файл
     
     print("🚀 Обновление алиасов матрасов\n")
-    update_matrasy_json(input_path, output_path)
+    docx_dir = os.path.join(project_dir, 'Описание матрасов') if args.docx else None
+    update_matrasy_json(input_path, output_path, compact=args.compact, docx_dir=docx_dir,
+                        workers=args.workers, render=args.render, diff=args.diff, profile=args.profile)
+    if args.index:
+        write_matrasy_index(output_path)
+    if args.phonetic_keys:
+        write_matrasy_keys(output_path)
+    if args.trigrams:
+        write_matrasy_trigrams(output_path)
+    if args.shards:
+        write_matrasy_shards(output_path, os.path.join(project_dir, 'src', 'data', 'shards'), args.workers)
     print("\n✨ Готово!")
-
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Режим наблюдения: каталоги пересобираются сами, когда меняются исходники
+
+Контент-менеджер правит книгу Excel и должен помнить про
+python3 scripts/updateDivans.py, а каждый запуск заново импортирует
+openpyxl и собирает всё с нуля. Этот процесс работает постоянно и следит за:
+
+- книгой Excel  → divans.json (инкрементальная сборка);
+- папкой «Описание матрасов» и matrasy.json → matrasy.json.
+
+Изменения ищутся опросом времени изменения и размера файлов (без внешних
+зависимостей). Серия сохранений подряд схлопывается в одну пересборку:
+сборка начинается, когда файлы не менялись --debounce секунд.
+
+Между сборками в памяти остаются:
+- RowCache с готовыми записями всех строк — пересчитываются только
+  изменённые строки, файл кэша заново не читается;
+- кэши разбора названий, фонетических вариантов и алиасов моделей
+  (NAME_PARSER, PHONETIC_ENGINE, ALIAS_SERVICE);
+- импортированный openpyxl.
+
+Время каждой пересборки печатается в лог. Собственная запись matrasy.json
+новой пересборки не вызывает.
+"""
+
+import os
+import time
+import traceback
+
+import updateDivans
+import updateMatrasy
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 1.0
+
+
+def file_signature(path):
+    """
+    (время изменения, размер) файла или None, если его нет
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def folder_signature(folder, suffix='.docx'):
+    """
+    Подписи файлов папки; временные файлы Word (~$…) и скрытые не считаются
+    """
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return None
+    return tuple(sorted(
+        (name, file_signature(os.path.join(folder, name)))
+        for name in names
+        if name.endswith(suffix) and not name.startswith(('~$', '.'))
+    ))
+
+
+def log(message):
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", flush=True)
+
+
+class CatalogWatcher:
+    """
+    Наблюдение за исходниками каталогов и пересборка с тёплыми кэшами
+
+    excel_path   — книга диванов
+    divans_path  — divans.json (кэш строк — <divans_path>.cache)
+    matrasy_path — matrasy.json (вход и выход)
+    docx_dir     — папка описаний матрасов или None
+    """
+
+    def __init__(self, excel_path, divans_path, matrasy_path, docx_dir=None,
+                 interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE, workers=None):
+        self.excel_path = excel_path
+        self.divans_path = divans_path
+        self.matrasy_path = matrasy_path
+        self.docx_dir = docx_dir
+        self.interval = interval
+        self.debounce = debounce
+        self.workers = workers
+        self.row_cache = None
+        self.seen = self.snapshot()
+        self.pending = {}
+        self.rebuilds = 0
+
+    def snapshot(self):
+        """
+        Текущие подписи исходников каждого каталога
+        """
+        return {
+            'divans': file_signature(self.excel_path),
+            'matrasy': (file_signature(self.matrasy_path),
+                        folder_signature(self.docx_dir) if self.docx_dir else None),
+        }
+
+    def rebuild_divans(self):
+        if self.row_cache is None:
+            self.row_cache = updateDivans.RowCache(self.divans_path + '.cache')
+        else:
+            self.row_cache.next_build()
+        count = updateDivans.parse_excel_to_json(self.excel_path, self.divans_path, verbose=False,
+                                                 cache=self.row_cache)
+        report = self.row_cache.report()
+        changed = report['rebuilt'] + report['rebuiltBrand'] + report['rebuiltModel']
+        return f"{count} диванов, пересчитано строк: {changed}, из кэша: {report['reused']}"
+
+    def rebuild_matrasy(self):
+        count = updateMatrasy.update_matrasy_json(self.matrasy_path, self.matrasy_path, docx_dir=self.docx_dir,
+                                                  workers=self.workers, verbose=False)
+        return f"{count} матрасов"
+
+    def rebuild(self, target):
+        """
+        Пересобирает каталог и пишет в лог время. Ошибка (например, книга
+        сохранена не до конца) не останавливает наблюдение
+        """
+        build = {'divans': self.rebuild_divans, 'matrasy': self.rebuild_matrasy}[target]
+        started = time.perf_counter()
+        try:
+            summary = build()
+        except Exception as error:
+            log(f"❌ {target}: {error.__class__.__name__}: {error}")
+            traceback.print_exc()
+            # Кэш строк мог остаться на середине сборки — начнём с файла
+            if target == 'divans':
+                self.row_cache = None
+            return False
+        finally:
+            # Своя запись matrasy.json — не новое изменение
+            if target == 'matrasy':
+                self.seen['matrasy'] = (file_signature(self.matrasy_path), self.seen['matrasy'][1])
+        self.rebuilds += 1
+        log(f"🔁 {target}: {(time.perf_counter() - started) * 1000:.0f} мс ({summary})")
+        return True
+
+    def poll(self):
+        """
+        Один опрос: отмечает изменившиеся исходники и пересобирает те,
+        что не менялись debounce секунд. Возвращает пересобранные каталоги
+        """
+        now = time.monotonic()
+        current = self.snapshot()
+        for target, signature in current.items():
+            if signature != self.seen[target]:
+                if target not in self.pending:
+                    log(f"✏️  {target}: исходники изменились")
+                self.seen[target] = signature
+                self.pending[target] = now
+
+        ready = [target for target, changed_at in self.pending.items() if now - changed_at >= self.debounce]
+        for target in ready:
+            del self.pending[target]
+            self.rebuild(target)
+        return ready
+
+    def run(self, warm=True):
+        """
+        Наблюдение до Ctrl+C. warm=True — сначала сборка диванов, чтобы
+        импорты и кэши прогрелись до первой правки
+        """
+        log(f"👀 Слежу: {self.excel_path}")
+        log(f"👀 Слежу: {self.matrasy_path}")
+        if self.docx_dir:
+            log(f"👀 Слежу: {self.docx_dir}")
+        if warm:
+            self.rebuild('divans')
+        try:
+            while True:
+                time.sleep(self.interval)
+                self.poll()
+        except KeyboardInterrupt:
+            log(f"👋 Остановлено, пересборок: {self.rebuilds}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Пересборка каталогов при изменении исходников')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help='период опроса файлов, секунд')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help='сколько секунд файлы должны не меняться перед пересборкой')
+    parser.add_argument('--no-docx', action='store_true',
+                        help="не следить за папкой 'Описание матрасов'")
+    parser.add_argument('--workers', type=int, default=None,
+                        help='число процессов для разбора .docx')
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_dir = os.path.dirname(script_dir)
+    excel_path = os.path.join(project_dir, 'Файл для диванов', 'Диваны, крессла, матрасы розница (1).xlsx')
+    data_dir = os.path.join(project_dir, 'src', 'data')
+    docx_dir = None if args.no_docx else os.path.join(project_dir, 'Описание матрасов')
+
+    print("🚀 Режим наблюдения за каталогами (Ctrl+C — выход)\n")
+    watcher = CatalogWatcher(excel_path, os.path.join(data_dir, 'divans.json'),
+                             os.path.join(data_dir, 'matrasy.json'), docx_dir=docx_dir,
+                             interval=args.interval, debounce=args.debounce, workers=args.workers)
+    watcher.run()
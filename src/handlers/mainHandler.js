@@ -1,14 +1,20 @@
 const { generateResponse, extractIntent } = require('../utils/responseGenerator');
 const content = require('../config/content');
 const { generateArticleResponse, convertWordsToDigits } = require('../utils/articleSearch');
-const { generateMatrasResponse } = require('../utils/matrasSearch');
-const { generateDivanResponse } = require('../utils/divanSearch');
+const { generateMatrasResponse, getMatrasContinuation } = require('../utils/matrasSearch');
+const { generateDivanResponse, getDivanContinuation } = require('../utils/divanSearch');
 const { 
   getWelcomeMessage, 
   getPromotionsMessage,
   getPersonalizedContent 
 } = require('../utils/deviceManager');
 
+// Продолжения длинных описаний по каталогам (state.session.continuation.catalog)
+const CONTINUATIONS = {
+  divans: getDivanContinuation,
+  matrasy: getMatrasContinuation
+};
+
 // Состояния сессии
 const SESSION_STATES = {
   START: 'start',
@@ -61,6 +67,9 @@ async function handleRequest(body) {
     case 'goodbye':
       return generateGoodbyeResponse();
     
+    case 'continue_reading':
+      return handleContinueReading(body);
+    
     default:
       return handleDefaultResponse(request.command, body);
   }
@@ -190,7 +199,7 @@ function handleDivanSearch(command, body) {
     return generateResponse(result.response + ' ' + getActiveReminder(), false);
   }
   
-  return generateResponse(result.response, false);
+  return generateResponse(result.response, false, continuationState(result.continuation));
 }
 
 function handleMatrasSearch(command, body) {
@@ -207,7 +216,27 @@ function handleMatrasSearch(command, body) {
     return generateResponse(result.response + ' ' + getActiveReminder(), false);
   }
   
-  return generateResponse(result.response, false);
+  return generateResponse(result.response, false, continuationState(result.continuation));
+}
+
+// Следующая часть длинного описания: что отдавать, помним в состоянии сессии
+// (Алиса возвращает session_state в state.session следующего запроса)
+function handleContinueReading(body) {
+  const state = body.state && body.state.session && body.state.session.continuation;
+  const getSegments = state && CONTINUATIONS[state.catalog];
+  const segments = getSegments ? getSegments(state.id) : [];
+  const segment = state ? segments[state.next] : undefined;
+  
+  if (!segment) {
+    return generateResponse("Больше рассказать нечего. Назовите модель или код товара." + getActiveReminder(), false);
+  }
+  
+  const next = { ...state, next: state.next + 1 };
+  return generateResponse(segment, false, continuationState(next.next < segments.length ? next : null));
+}
+
+function continuationState(continuation) {
+  return continuation ? { sessionState: { continuation } } : {};
 }
 
 // Обработка поиска по артикулу (с зональной фильтрацией)
@@ -0,0 +1,113 @@
+const crypto = require('crypto');
+const fs = require('fs');
+const path = require('path');
+
+const DATA_DIR = path.join(__dirname, '..', 'data');
+const COMPACT_FORMAT = 2;
+
+/**
+ * Загрузка каталога с учётом компактного формата (scripts/compactCatalog.py)
+ *
+ * Если рядом с divans.json лежит divans.compact.json, собранный именно из
+ * этого divans.json (сверяется SHA-256 из "source"), а файл описаний
+ * divans.descriptions.json совпадает с "textsSha256", читается компактный
+ * каталог: алиасы хранятся в нём один раз, а описания разбираются при первом
+ * обращении к полю. Иначе — обычный divans.json. Результат в обоих случаях —
+ * { divans: [...] }.
+ */
+function loadCatalog(collection, dataDir = DATA_DIR) {
+  const jsonPath = path.join(dataDir, `${collection}.json`);
+  const compactPath = path.join(dataDir, `${collection}.compact.json`);
+  const jsonRaw = fs.readFileSync(jsonPath);
+
+  if (fs.existsSync(compactPath)) {
+    try {
+      const catalog = JSON.parse(fs.readFileSync(compactPath, 'utf8'));
+      const textsPath = path.join(dataDir, String(catalog.texts));
+
+      if (catalog.format !== COMPACT_FORMAT || catalog.collection !== collection) {
+        console.warn(`⚠️ Неподдерживаемый компактный каталог ${compactPath}, читаю ${jsonPath}`);
+      } else if (!catalog.source || sha256(jsonRaw) !== catalog.source.sha256) {
+        console.warn(`⚠️ ${compactPath} собран не из текущего ${jsonPath}, читаю ${jsonPath}`);
+      } else if (sha256(fs.readFileSync(textsPath)) !== catalog.textsSha256) {
+        console.warn(`⚠️ ${textsPath} не совпадает с ${compactPath}, читаю ${jsonPath}`);
+      } else {
+        console.log(`📦 Компактный каталог: ${compactPath}`);
+        return expandCompactCatalog(catalog, textsPath, () => JSON.parse(jsonRaw.toString('utf8'))[collection]);
+      }
+    } catch (error) {
+      console.warn(`⚠️ Ошибка чтения ${compactPath}, читаю ${jsonPath}:`, error.message);
+    }
+  }
+
+  return JSON.parse(jsonRaw.toString('utf8'));
+}
+
+function sha256(raw) {
+  return crypto.createHash('sha256').update(raw).digest('hex');
+}
+
+/**
+ * Восстанавливает записи прежнего формата (expand_compact_catalog).
+ * Наборы алиасов разворачиваются один раз и общие для всех записей.
+ *
+ * Файл описаний читается при первом обращении и ещё раз сверяется с
+ * "textsSha256": если его подменили после старта, описания берутся из
+ * записей loadFallback() (обычный каталог в том же порядке)
+ */
+function expandCompactCatalog(catalog, textsPath, loadFallback) {
+  const listFields = new Set(catalog.listFields);
+  const textFields = new Set(catalog.textFields);
+  const aliasSets = catalog.aliasSets.map(set => set.map(position => catalog.strings[position]));
+
+  let texts = null;
+  let fallback = null;
+  const readText = (position, field, value) => {
+    if (!texts && !fallback) {
+      try {
+        const raw = fs.readFileSync(textsPath);
+        if (sha256(raw) !== catalog.textsSha256) {
+          throw new Error('SHA-256 не совпадает с компактным каталогом');
+        }
+        texts = JSON.parse(raw.toString('utf8')).texts;
+      } catch (error) {
+        if (!loadFallback) {
+          throw new Error(`Описания ${textsPath} недоступны: ${error.message}`);
+        }
+        console.warn(`⚠️ Описания ${textsPath} недоступны (${error.message}), беру из обычного каталога`);
+        fallback = loadFallback();
+      }
+    }
+    return texts ? texts[value] : fallback[position][field];
+  };
+
+  const records = catalog.records.map((item, position) => {
+    const record = {};
+    for (const [field, value] of Object.entries(item)) {
+      if (listFields.has(field) && Number.isInteger(value)) {
+        record[field] = aliasSets[value];
+      } else if (textFields.has(field) && Number.isInteger(value)) {
+        // Описание читается из файла текстов при первом обращении
+        Object.defineProperty(record, field, {
+          enumerable: true,
+          configurable: true,
+          get() {
+            const text = readText(position, field, value);
+            Object.defineProperty(record, field, { value: text, enumerable: true, writable: true });
+            return text;
+          }
+        });
+      } else {
+        record[field] = value;
+      }
+    }
+    return record;
+  });
+
+  return { [catalog.collection]: records };
+}
+
+module.exports = {
+  loadCatalog,
+  expandCompactCatalog
+};
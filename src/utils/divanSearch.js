@@ -1,4 +1,6 @@
-const divansData = require('../data/divans.json');
+const { loadCatalog } = require('./catalogLoader');
+
+const divansData = loadCatalog('divans');
 
 /**
  * Транслитерация латиницы в кириллицу для поиска
@@ -330,6 +332,20 @@ function generateDivanResponse(query) {
  * Форматирование ответа о диване
  */
 function formatDivanResponse(divan) {
+  // Готовый ответ, собранный при сборке каталога (updateDivans.py --render):
+  // описание уже разбито по предложениям и укладывается в лимит
+  if (divan.response && divan.response.text) {
+    return {
+      found: true,
+      response: divan.response.text,
+      divan: divan,
+      // Остальные части описания отдаются по «дальше» (getDivanContinuation)
+      continuation: divan.response.continue && divan.response.continue.length > 0
+        ? { catalog: 'divans', id: String(divan.kod), next: 0 }
+        : null
+    };
+  }
+  
   let response = `🛋️ ${divan.name}\n\n`;
   response += `Код товара: ${divan.kod}\n\n`;
   
@@ -359,6 +375,14 @@ function formatDivanResponse(divan) {
   };
 }
 
+/**
+ * Части готового ответа после первой (response.continue) для дивана с кодом kod
+ */
+function getDivanContinuation(kod) {
+  const divan = divansData.divans.find(d => String(d.kod) === String(kod));
+  return (divan && divan.response && divan.response.continue) || [];
+}
+
 /**
  * Получить все диваны
  */
@@ -370,6 +394,7 @@ module.exports = {
   findDivanByKod,
   findDivanByBrandModel,
   generateDivanResponse,
+  getDivanContinuation,
   getAllDivans
 };
 
@@ -1,4 +1,6 @@
-const matrasData = require('../data/matrasy.json');
+const { loadCatalog } = require('./catalogLoader');
+
+const matrasData = loadCatalog('matrasy');
 
 /**
  * Поиск матраса по названию модели
@@ -124,6 +126,19 @@ function generateMatrasResponse(query) {
     };
   }
   
+  // Готовый ответ, собранный при сборке каталога (updateMatrasy.py --render)
+  if (matras.response && matras.response.text) {
+    return {
+      found: true,
+      response: matras.response.text,
+      matras: matras,
+      // Остальные части описания отдаются по «дальше» (getMatrasContinuation)
+      continuation: matras.response.continue && matras.response.continue.length > 0
+        ? { catalog: 'matrasy', id: matras.id, next: 0 }
+        : null
+    };
+  }
+  
   let response = `🛏️ ${matras.fullName}\n\n`;
   response += `${matras.description}\n\n`;
   
@@ -164,6 +179,14 @@ function generateMatrasResponse(query) {
   };
 }
 
+/**
+ * Части готового ответа после первой (response.continue) для матраса с id
+ */
+function getMatrasContinuation(id) {
+  const matras = matrasData.matrasy.find(m => m.id === id);
+  return (matras && matras.response && matras.response.continue) || [];
+}
+
 /**
  * Получить список всех матрасов
  */
@@ -183,6 +206,7 @@ function getMatrasyByBrand(brand) {
 module.exports = {
   findMatrasByName,
   generateMatrasResponse,
+  getMatrasContinuation,
   getAllMatrasy,
   getMatrasyByBrand
 };
@@ -33,7 +33,9 @@ function generateResponse(text, endSession = false, additionalData = {}) {
   // Это максимальное значение, которое поддерживает Яндекс.Диалоги
   if (!endSession) {
     response.session_state = {
-      timeout: 3600
+      timeout: 3600,
+      // Состояние для следующей реплики (например, продолжение описания)
+      ...(additionalData.sessionState || {})
     };
   }
 
@@ -56,6 +58,11 @@ function extractIntent(command) {
   
   // Ключевые слова для определения интентов (только нужные команды)
   const intents = {
+    // Следующая часть длинного описания (готовые ответы, updateDivans.py --render)
+    continue_reading: [
+      'дальше', 'продолжи', 'продолжай', 'продолжение'
+    ],
+    
     divan_search: [
       'диван', 'диваны', 'кресло', 'мебель', 'софа',
       'veluna', 'elva', 'rivalli', 'мебельград', 'mio tesoro', 'мио тесоро',
@@ -0,0 +1,9 @@
+"""
+Тесты скриптов сборки каталога (scripts/): модули импортируются напрямую
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                'scripts'))
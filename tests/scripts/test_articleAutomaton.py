@@ -0,0 +1,47 @@
+import pytest
+
+from articleAutomaton import ArticleMatcher, build_article_automaton
+
+IDS = ['10091617', '10077273', '10077142', '10077145', '8001']
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return ArticleMatcher(build_article_automaton([{'kod': kod} for kod in IDS], 'divans'))
+
+
+@pytest.mark.parametrize('query, digits, ids', [
+    ('код 10091617', '10091617', ['10091617']),
+    ('100 916 17', '10091617', ['10091617']),
+    ('артикул 10077145 и ещё', '10077145', ['10077145']),
+    ('один ноль ноль девять один шесть один семь', '10091617', ['10091617']),
+    ('код восемь нуль ноль единица', '8001', ['8001']),
+    # Фальстарт: настоящий код находится по ссылкам неудачи
+    ('один ноль ноль девять один ноль ноль девять один шесть один семь', '10091617', ['10091617']),
+])
+def test_match_exact(matcher, query, digits, ids):
+    assert matcher.match(query) == {'digits': digits, 'exact': True, 'ids': ids}
+
+
+def test_match_prefix_returns_all_codes_in_catalog_order(matcher):
+    assert matcher.match('код один ноль ноль семь семь') == {
+        'digits': '10077', 'exact': False, 'ids': ['10077273', '10077142', '10077145'],
+    }
+
+
+def test_match_prefix_respects_limit(matcher):
+    assert matcher.match('один ноль ноль семь семь', limit=2)['ids'] == ['10077273', '10077142']
+
+
+@pytest.mark.parametrize('query', ['расскажи про диван', 'один ноль', 'десять', 'семерка ноль ноль один'])
+def test_match_nothing(matcher, query):
+    assert matcher.match(query) is None
+
+
+def test_spoken_digits(matcher):
+    assert matcher.spoken_digits('код один нуль 5 единица') == '1051'
+
+
+def test_rejects_other_format():
+    with pytest.raises(ValueError):
+        ArticleMatcher({'format': 1, 'ids': [], 'words': [], 'codes': []})
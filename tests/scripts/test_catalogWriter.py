@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from catalogWriter import (apply_changelog, changelog_path_for, diff_records, json_chunks,
+                           write_changelog, write_json_stream)
+
+BASE = [
+    {'kod': '1', 'name': 'Диван ELVA Аспен', 'brandAliases': ['elva', 'элва'], 'description': 'Мягкий'},
+    {'kod': '2', 'name': 'Диван VELUNA Майами', 'brandAliases': ['veluna'], 'description': None},
+    {'kod': '3', 'name': 'Пуф "Кубо"', 'brandAliases': [], 'description': 'Квадратный\nпуф'},
+]
+
+
+def dumped(records, key='divans'):
+    return json.dumps({key: records}, ensure_ascii=False, indent=2)
+
+
+@pytest.mark.parametrize('records', [
+    [],
+    BASE[:1],
+    BASE,
+    [{'kod': '4', 'nested': {'list': [1, 2.5, None], 'empty': {}, 'emptyList': []}, 'flag': True}],
+])
+def test_json_chunks_matches_json_dumps(records):
+    assert ''.join(json_chunks(iter(records), 'divans')) == dumped(records)
+
+
+def test_write_json_stream_matches_json_dumps(tmp_path):
+    path = tmp_path / 'divans.json'
+    assert write_json_stream(iter(BASE), str(path), 'divans') == len(BASE)
+    assert path.read_text(encoding='utf-8') == dumped(BASE)
+
+
+def updated_records():
+    """
+    Новая сборка: запись 2 удалена, 1 изменена (поле убрано, порядок полей
+    другой), 5 добавлена, порядок строк поменялся
+    """
+    changed = {'description': 'Очень мягкий', 'kod': '1', 'name': 'Диван ELVA Аспен',
+               'brandAliases': ['elva', 'элва', 'эльва']}
+    added = {'kod': '5', 'name': 'Кресло Rivalli Бильбао', 'brandAliases': ['rivalli'], 'description': 'Новое'}
+    return [BASE[2], added, changed]
+
+
+def test_diff_records_describes_changes():
+    changelog = diff_records(BASE, iter(updated_records()), 'divans', 'kod')
+
+    assert changelog['removed'] == ['2']
+    assert [record['kod'] for record in changelog['added']] == ['5']
+    [change] = changelog['changed']
+    assert change['id'] == '1'
+    assert change['set'] == {'description': 'Очень мягкий', 'brandAliases': ['elva', 'элва', 'эльва']}
+    assert change['unset'] == []
+    assert change['keys'] == ['description', 'kod', 'name', 'brandAliases']
+    assert changelog['order'] == ['3', '5', '1']
+
+
+def test_diff_records_rejects_duplicate_ids():
+    with pytest.raises(ValueError):
+        diff_records(BASE, iter(BASE + BASE[:1]), 'divans', 'kod')
+
+
+@pytest.mark.parametrize('new_records', [updated_records(), BASE, [], BASE[::-1]])
+def test_changelog_round_trip(tmp_path, new_records):
+    base_path = tmp_path / 'divans.json'
+    write_json_stream(BASE, str(base_path), 'divans')
+
+    write_changelog(iter(new_records), str(base_path), 'divans', 'kod', verbose=False)
+    # Сам каталог в режиме журнала не переписывается
+    assert base_path.read_text(encoding='utf-8') == dumped(BASE)
+
+    output_path = tmp_path / 'applied.json'
+    count = apply_changelog(str(base_path), changelog_path_for(str(base_path)), str(output_path))
+    assert count == len(new_records)
+    assert output_path.read_text(encoding='utf-8') == dumped(new_records)
+
+
+def test_changelog_from_missing_base(tmp_path):
+    base_path = tmp_path / 'divans.json'
+    write_changelog(iter(BASE), str(base_path), 'divans', 'kod', verbose=False)
+
+    apply_changelog(str(base_path), changelog_path_for(str(base_path)))
+    assert base_path.read_text(encoding='utf-8') == dumped(BASE)
+
+
+def test_apply_changelog_rejects_other_base(tmp_path):
+    base_path = tmp_path / 'divans.json'
+    write_json_stream(BASE, str(base_path), 'divans')
+    write_changelog(iter(updated_records()), str(base_path), 'divans', 'kod', verbose=False)
+
+    # Каталог поменялся после записи журнала
+    write_json_stream(BASE[:2], str(base_path), 'divans')
+    with pytest.raises(ValueError, match='не совпадает с исходной сборкой'):
+        apply_changelog(str(base_path), changelog_path_for(str(base_path)))
+    assert base_path.read_text(encoding='utf-8') == dumped(BASE[:2])
+
+
+def test_apply_changelog_rejects_target_mismatch(tmp_path):
+    base_path = tmp_path / 'divans.json'
+    write_json_stream(BASE, str(base_path), 'divans')
+    write_changelog(iter(updated_records()), str(base_path), 'divans', 'kod', verbose=False)
+
+    changelog_path = changelog_path_for(str(base_path))
+    with open(changelog_path, 'r', encoding='utf-8') as f:
+        changelog = json.load(f)
+    changelog['added'][0]['description'] = 'Подменено'
+    with open(changelog_path, 'w', encoding='utf-8') as f:
+        json.dump(changelog, f, ensure_ascii=False)
+
+    with pytest.raises(ValueError, match='не совпадает с целевой сборкой'):
+        apply_changelog(str(base_path), changelog_path)
+    assert base_path.read_text(encoding='utf-8') == dumped(BASE)
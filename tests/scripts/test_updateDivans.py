@@ -0,0 +1,97 @@
+import pytest
+
+import updateDivans
+from updateDivans import RowCache
+
+ROWS = [
+    ('10091617', 'Диван ELVA Аспен (Diagonal 694, опора черная)', 'Прямой диван'),
+    ('10091638', 'Пуф ELVA Аспен квадратный (Fortis 420, опора черная)', None),
+    ('10077273', 'Диван VELUNA Майами (Beverly Sage)', '<p>Угловой &amp; мягкий</p>'),
+]
+
+
+def build(path, rows):
+    cache = RowCache(str(path))
+    records = [cache.build(*row) for row in rows]
+    return cache, records
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    path = tmp_path / 'divans.json.cache'
+    cache, _ = build(path, ROWS)
+    cache.save()
+    return path
+
+
+def test_first_build_rebuilds_every_row(tmp_path):
+    cache, records = build(tmp_path / 'divans.json.cache', ROWS)
+    assert cache.report() == {'reused': 0, 'rebuilt': 3, 'rebuiltBrand': 0, 'rebuiltModel': 0}
+    assert not cache.unchanged
+    assert records == [updateDivans.build_divan(*row) for row in ROWS]
+
+
+def test_unchanged_rows_come_from_cache(cache_path):
+    cache, records = build(cache_path, ROWS)
+    assert cache.report() == {'reused': 3, 'rebuilt': 0, 'rebuiltBrand': 0, 'rebuiltModel': 0}
+    assert cache.unchanged
+    assert records == [updateDivans.build_divan(*row) for row in ROWS]
+
+
+def test_changed_row_is_rebuilt(cache_path):
+    rows = [ROWS[0], (ROWS[1][0], ROWS[1][1], 'Новое описание'), ROWS[2]]
+    cache, records = build(cache_path, rows)
+    assert cache.report() == {'reused': 2, 'rebuilt': 1, 'rebuiltBrand': 0, 'rebuiltModel': 0}
+    assert not cache.unchanged
+    assert records[1]['description'] == 'Новое описание'
+
+
+def test_reordered_rows_rewrite_catalog(cache_path):
+    cache, _ = build(cache_path, ROWS[::-1])
+    assert cache.rebuilt == 0
+    assert not cache.unchanged
+
+
+def test_output_settings_rewrite_catalog(cache_path):
+    cache = RowCache(str(cache_path))
+    cache.output = {'render': 'другая версия'}
+    for row in ROWS:
+        cache.build(*row)
+    assert cache.reused == 3
+    assert not cache.unchanged
+
+
+def test_brand_aliases_change_rebuilds_only_that_brand(cache_path, monkeypatch):
+    monkeypatch.setitem(updateDivans.BRAND_ALIASES, 'ELVA',
+                        updateDivans.BRAND_ALIASES['ELVA'] + ['эльвас'])
+    cache, records = build(cache_path, ROWS)
+    assert cache.report() == {'reused': 1, 'rebuilt': 0, 'rebuiltBrand': 2, 'rebuiltModel': 0}
+    assert 'эльвас' in records[0]['brandAliases']
+
+
+def test_translit_change_rebuilds_only_that_model(cache_path, monkeypatch):
+    monkeypatch.setitem(updateDivans.TRANSLIT_MAP, 'майами', ['маями'])
+    cache, _ = build(cache_path, ROWS)
+    assert cache.report() == {'reused': 2, 'rebuilt': 0, 'rebuiltBrand': 0, 'rebuiltModel': 1}
+
+
+def test_generator_change_invalidates_whole_cache(cache_path, monkeypatch):
+    monkeypatch.setattr(updateDivans, 'generator_version', lambda: 'другая версия')
+    cache, _ = build(cache_path, ROWS)
+    assert cache.report() == {'reused': 0, 'rebuilt': 3, 'rebuiltBrand': 0, 'rebuiltModel': 0}
+
+
+def test_corrupt_cache_is_ignored(tmp_path):
+    path = tmp_path / 'divans.json.cache'
+    path.write_text('{"format": 1, "rows": ', encoding='utf-8')
+    cache, _ = build(path, ROWS)
+    assert cache.rebuilt == 3
+
+
+def test_next_build_keeps_fresh_rows_in_memory(tmp_path):
+    cache, _ = build(tmp_path / 'divans.json.cache', ROWS)
+    cache.next_build()
+    for row in ROWS:
+        cache.build(*row)
+    assert cache.reused == 3
+    assert cache.unchanged